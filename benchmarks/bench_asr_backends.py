@@ -0,0 +1,60 @@
+import argparse
+import time
+from pathlib import Path
+from scripts.asr_batching import BatchedTranscriber, SAMPLE_RATE
+from scripts.audio_stream import decode_audio
+from scripts.error_rate import fast_wer
+from scripts.retrieve_subtitled_videos import load_model
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".m4a", ".webm", ".opus")
+
+
+def transcribe_all(model, waveforms, batch_size):
+    """Transcripts of every waveform and the seconds the model took."""
+    transcriber = BatchedTranscriber(model, batch_size=batch_size)
+    for key, waveform in waveforms.items():
+        transcriber.add(key, waveform)
+    start = time.perf_counter()
+    results = transcriber.flush()
+    elapsed = time.perf_counter() - start
+    return {key: " ".join(t for t in texts if t) for key, texts in results.items()}, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Real-time factor and transcript drift of the onnx (int8) ASR backend against NeMo.")
+    parser.add_argument("--fixtures", type=str, required=True, help="Directory of audio files.")
+    parser.add_argument("--onnx", type=str, required=True, help="Model directory written by 'python -m scripts.asr_backends'.")
+    parser.add_argument("--model", type=str, default=None, help="NeMo model the export came from; without it the fp32 ONNX model is the reference.")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads for onnxruntime.")
+    parser.add_argument("--batch_size", type=int, default=8)
+    args = parser.parse_args()
+
+    audio_files = sorted(p for p in Path(args.fixtures).iterdir() if p.suffix in AUDIO_EXTENSIONS)
+    if not audio_files:
+        print(f"❌ No audio files in {args.fixtures}")
+        return
+    waveforms = {p.name: decode_audio(str(p)) for p in audio_files}
+    audio_seconds = sum(len(w) for w in waveforms.values()) / SAMPLE_RATE
+    print(f"{len(waveforms)} files, {audio_seconds:.0f} s of audio")
+
+    from scripts.asr_backends import OnnxCtcModel
+
+    backends = [("nemo", lambda: load_model(args.model))] if args.model else []
+    backends += [
+        ("onnx fp32", lambda: OnnxCtcModel(args.onnx, threads=args.threads, quantized=False)),
+        ("onnx int8", lambda: OnnxCtcModel(args.onnx, threads=args.threads)),
+    ]
+    reference = None
+    for name, load in backends:
+        transcripts, elapsed = transcribe_all(load(), waveforms, args.batch_size)
+        line = f"{name:<10}: RTF {elapsed / audio_seconds:.4f}"
+        if reference is None:
+            reference = transcripts
+        else:
+            drift = [fast_wer(reference[k], transcripts[k])[0] for k in waveforms if reference[k].strip()]
+            line += f", WER vs. {backends[0][0]}: mean {sum(drift) / len(drift):.2%}, max {max(drift):.2%}" if drift else ""
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
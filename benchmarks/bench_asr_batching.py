@@ -0,0 +1,68 @@
+import argparse
+import time
+import numpy as np
+from scripts.asr_batching import BatchedTranscriber, SAMPLE_RATE
+from scripts.retrieve_subtitled_videos import load_audio, load_model, transcribe_chunk
+
+
+def load_waveforms(audio_files, synthetic_seconds, num_synthetic):
+    if audio_files:
+        return {fn: load_audio(fn)[0] for fn in audio_files}
+    # Low-level noise stands in for speech when no fixture audio is given.
+    rng = np.random.default_rng(0)
+    return {f"synthetic_{i}": (rng.standard_normal(int(synthetic_seconds * SAMPLE_RATE)) * 0.01).astype("float32")
+            for i in range(num_synthetic)}
+
+
+def sequential_loop(model, waveforms, chunk_size=30 * SAMPLE_RATE):
+    """The per-window loop of the original transcribe_audio."""
+    results = {}
+    for key, waveform in waveforms.items():
+        texts = []
+        for start in range(0, len(waveform), chunk_size):
+            end = min(len(waveform), start + chunk_size)
+            if end - start < 512:
+                continue
+            texts.append(transcribe_chunk(waveform[start:end], model))
+        results[key] = texts
+    return results
+
+
+def batched(model, waveforms, batch_size):
+    transcriber = BatchedTranscriber(model, batch_size=batch_size)
+    for key, waveform in waveforms.items():
+        transcriber.add(key, waveform)
+    return transcriber.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of per-window ASR against cross-video batched ASR.")
+    parser.add_argument("--model", type=str, default="stt_en_conformer_ctc_small", help="Path to local .nemo model or pretrained model name (a small CPU-friendly CTC model is enough).")
+    parser.add_argument("--audio", type=str, nargs="*", default=[], help="Fixture audio files; synthetic audio is used if omitted.")
+    parser.add_argument("--synthetic_seconds", type=float, default=95.0, help="Length of each synthetic clip.")
+    parser.add_argument("--num_synthetic", type=int, default=4, help="Number of synthetic clips.")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[4, 8, 16], help="Window batch sizes to try.")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    model.eval()
+    waveforms = load_waveforms(args.audio, args.synthetic_seconds, args.num_synthetic)
+    audio_seconds = sum(len(w) for w in waveforms.values()) / SAMPLE_RATE
+    print(f"{len(waveforms)} clips, {audio_seconds:.1f} s of audio")
+
+    start = time.perf_counter()
+    expected = sequential_loop(model, waveforms)
+    elapsed = time.perf_counter() - start
+    print(f"{'loop (batch_size=1)':<22} {audio_seconds / elapsed:>8.1f} audio-s/s")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        result = batched(model, waveforms, batch_size)
+        elapsed = time.perf_counter() - start
+        same = sum(a == b for key in expected for a, b in zip(expected[key], result[key]))
+        total = sum(len(v) for v in expected.values())
+        print(f"{f'batched (batch_size={batch_size})':<22} {audio_seconds / elapsed:>8.1f} audio-s/s  {same}/{total} windows identical")
+
+
+if __name__ == "__main__":
+    main()
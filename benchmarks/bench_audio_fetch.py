@@ -0,0 +1,153 @@
+import argparse
+import io
+import random
+import shutil
+import tempfile
+import threading
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import yt_dlp
+from scripts.audio_fetch import RemoteAudio, read_spans, smallest_audio_selector
+
+# (format_id, ext, acodec, vcodec, abr or tbr) of a typical YouTube format list
+FAKE_FORMATS = [
+    ("139", "m4a", "mp4a.40.5", "none", 48),
+    ("249", "webm", "opus", "none", 50),
+    ("250", "webm", "opus", "none", 70),
+    ("140", "m4a", "mp4a.40.2", "none", 129),
+    ("251", "webm", "opus", "none", 135),
+    ("18", "mp4", "mp4a.40.2", "avc1.42001E", 500),
+]
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves in-memory files with HTTP Range support and counts the bytes sent."""
+    protocol_version = "HTTP/1.1"
+    files = {}
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        body = self.files.get(self.path.split("?")[0])
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start, end = 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            first, _, last = range_header[6:].split(",")[0].partition("-")
+            start = int(first) if first else max(len(body) - int(last), 0)
+            end = min(int(last), len(body) - 1) if first and last else len(body) - 1
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+        try:
+            self.wfile.write(body[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg closes the connection once it has read what it needs
+            pass
+        with self.lock:
+            RangeHandler.bytes_sent += end - start + 1
+
+
+def start_range_server(files):
+    RangeHandler.files = files
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fake_info(base_url, duration):
+    formats = []
+    for format_id, ext, acodec, vcodec, bitrate in FAKE_FORMATS:
+        size = int(bitrate * 125 * duration)
+        fmt = {"format_id": format_id, "ext": ext, "acodec": acodec, "vcodec": vcodec, "url": f"{base_url}/{format_id}.{ext}",
+               "protocol": "http", "filesize": size, "tbr": bitrate}
+        if vcodec == "none":
+            fmt.update(abr=bitrate, asr=48000 if acodec == "opus" else 44100)
+        else:
+            fmt.update(width=640, height=360)
+        formats.append(fmt)
+    return {"id": "fakevideo00", "title": "fake", "duration": duration, "formats": formats,
+            "webpage_url": f"{base_url}/watch", "extractor": "generic", "extractor_key": "Generic"}
+
+
+def download_bytes(info, fmt, outdir):
+    before = RangeHandler.bytes_sent
+    ydl_opts = {"format": fmt, "outtmpl": f"{outdir}/%(format_id)s.%(ext)s", "quiet": True, "no_warnings": True, "noprogress": True}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        result = ydl.process_ie_result(dict(info), download=True)
+    return result["format_id"], RangeHandler.bytes_sent - before
+
+
+def synthetic_wav(duration, sample_rate=16000):
+    samples = (np.random.default_rng(0).standard_normal(int(duration * sample_rate)) * 3000).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes transferred per video for full, smallest-format and time-range audio fetching.")
+    parser.add_argument("--duration", type=float, default=1200.0, help="Video length in seconds.")
+    parser.add_argument("--spans", type=int, default=8, help="Sampled 30 s windows fetched in range mode.")
+    args = parser.parse_args()
+
+    files = {}
+    for format_id, ext, _, _, bitrate in FAKE_FORMATS:
+        files[f"/{format_id}.{ext}"] = b"\0" * int(bitrate * 125 * args.duration)
+    files["/audio.wav"] = synthetic_wav(args.duration)
+    server, base_url = start_range_server(files)
+    info = fake_info(base_url, args.duration)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, fmt in [("bestaudio/best", "bestaudio/best"), ("smallest adequate", smallest_audio_selector())]:
+                format_id, sent = download_bytes(info, fmt, tmpdir)
+                print(f"{name:<18} format {format_id:>4}: {sent / 1e6:8.2f} MB")
+
+        if shutil.which("ffmpeg") is None:
+            print("Range fetching skipped: ffmpeg is not installed.")
+            return
+        rng = random.Random(0)
+        starts = sorted(rng.uniform(0, args.duration - 30) for _ in range(args.spans))
+        before = RangeHandler.bytes_sent
+        source = RemoteAudio(f"{base_url}/audio.wav")
+        samples = read_spans(source, [(start, start + 30) for start in starts])
+        sent = RangeHandler.bytes_sent - before
+        total = len(files["/audio.wav"])
+        print(f"{args.spans} x 30 s ranges of a {total / 1e6:.2f} MB WAV: {sent / 1e6:.2f} MB "
+              f"({sum(len(s) for s in samples) / 16000:.0f} s decoded, {sent / total:.1%} of the file)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import time
+from pathlib import Path
+from scripts.make_search_words import clean_line, clean_lines, clean_lines_parallel
+
+FIXTURE = Path(__file__).parent / "fixtures" / "titles.txt"
+
+
+def load_titles(repeat):
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        titles = [line.rstrip("\n") for line in f]
+    # Suffix each copy so the fixture is not trivially cacheable.
+    return [f"{t} {i}" if i else t for i in range(repeat) for t in titles]
+
+
+def timed(name, fn, titles):
+    start = time.perf_counter()
+    result = fn(titles)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {len(titles) / elapsed:>12,.0f} titles/sec")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clean_line against the batch cleaning engine.")
+    parser.add_argument("--repeat", type=int, default=4000, help="How many times to repeat the fixture.")
+    parser.add_argument("--lang", type=str, default="fa", help="language code passed to the cleaners")
+    parser.add_argument("--processes", type=int, default=None, help="Number of processes for the parallel run.")
+    args = parser.parse_args()
+
+    titles = load_titles(args.repeat)
+    print(f"{len(titles)} titles, lang={args.lang}")
+    expected = timed("clean_line", lambda ts: [clean_line(t, lang=args.lang) for t in ts], titles)
+    batched = timed("clean_lines", lambda ts: clean_lines(ts, lang=args.lang), titles)
+    parallel = timed("clean_lines_parallel", lambda ts: clean_lines_parallel(ts, lang=args.lang, processes=args.processes), titles)
+    assert batched == expected and parallel == expected, "batch output differs from clean_line"
+
+
+if __name__ == "__main__":
+    main()
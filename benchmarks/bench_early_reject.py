@@ -0,0 +1,105 @@
+import argparse
+import random
+from pathlib import Path
+from scripts.early_reject import group_cues, sequential_verify
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".m4a", ".webm", ".opus")
+
+
+def decode_fixture(audio_file, subtitle_file, model, normalizer, batch_size):
+    """Decode every window of a fixture once; returns per-window scores and durations."""
+    from scripts.asr_batching import BatchedTranscriber
+    from scripts.retrieve_subtitled_videos import clean_subtitle_text, load_audio, parse_subtitle_cues, window_errors
+
+    cues = parse_subtitle_cues(str(subtitle_file))
+    windows = group_cues(cues)
+    waveform, sample_rate = load_audio(str(audio_file))
+    transcriber = BatchedTranscriber(model, batch_size=batch_size)
+    for w, window in enumerate(windows):
+        for idx in window:
+            start, end, _ = cues[idx]
+            transcriber.add((w, idx), waveform[int(start * sample_rate):int(end * sample_rate)])
+    transcriptions = transcriber.flush()
+
+    scores, durations = [], []
+    for w, window in enumerate(windows):
+        text = ' '.join(' '.join(transcriptions.get((w, idx), [])) for idx in window).strip()
+        hypothesis = normalizer.normalize(text).strip() if text else ''
+        reference = clean_subtitle_text(' '.join(cues[idx][2] for idx in window), normalizer)
+        scores.append(window_errors(reference, hypothesis))
+        durations.append(sum(cues[idx][1] - cues[idx][0] for idx in window))
+    return scores, durations
+
+
+def synthetic_videos(count, seed=0):
+    """Videos whose windows share a true WER/CER, spread around typical thresholds."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        true_wer = rng.choice([rng.uniform(0.02, 0.25), rng.uniform(0.25, 0.45), rng.uniform(0.45, 1.0)])
+        true_cer = true_wer * rng.uniform(0.4, 0.8)
+        scores, durations = [], []
+        for _ in range(rng.randint(5, 120)):
+            words = rng.randint(20, 90)
+            chars = words * 5
+            word_errors = sum(rng.random() < true_wer for _ in range(words))
+            char_errors = sum(rng.random() < true_cer for _ in range(chars))
+            scores.append((word_errors, words, char_errors, chars))
+            durations.append(words / 2.5)
+        yield scores, durations
+
+
+def compare(videos, min_wer, min_cer, min_windows, step):
+    agree = total = 0
+    decoded_seconds = total_seconds = 0.0
+    for n, (scores, durations) in enumerate(videos):
+        full = sequential_verify(len(scores), lambda batch: [scores[w] for w in batch], min_wer, min_cer,
+                                 min_windows=len(scores))
+        decoded = []
+
+        def score_windows(batch):
+            decoded.extend(batch)
+            return [scores[w] for w in batch]
+
+        result = sequential_verify(len(scores), score_windows, min_wer, min_cer, min_windows=min_windows, step=step, seed=n)
+        agree += result["accepted"] == full["accepted"]
+        total += 1
+        decoded_seconds += sum(durations[w] for w in decoded)
+        total_seconds += sum(durations)
+    return agree, total, decoded_seconds, total_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saved ASR compute and agreement of sequential verification against full decoding.")
+    parser.add_argument("--fixtures", type=str, default=None, help="Directory of <id>.<audio ext> + <id>.vtt pairs; synthetic videos are used if omitted.")
+    parser.add_argument("--model", type=str, default="stt_en_conformer_ctc_small", help="ASR model for --fixtures.")
+    parser.add_argument("--lang", type=str, default="en", help="Normalizer language for --fixtures.")
+    parser.add_argument("--num_synthetic", type=int, default=500, help="Number of synthetic videos.")
+    parser.add_argument("--min_wer", type=float, default=0.3, help="Maximum word error rate.")
+    parser.add_argument("--min_cer", type=float, default=0.2, help="Maximum character error rate.")
+    parser.add_argument("--min_windows", type=int, default=4, help="Windows decoded before the first decision.")
+    parser.add_argument("--step", type=int, default=4, help="Windows decoded per following round.")
+    parser.add_argument("--batch_size", type=int, default=8, help="Windows per ASR model call.")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        from scripts.normalizer import TextNormalizer
+        from scripts.retrieve_subtitled_videos import load_model
+
+        model = load_model(args.model)
+        normalizer = TextNormalizer(lang=args.lang)
+        videos = []
+        for subtitle_file in sorted(Path(args.fixtures).glob("*.vtt")):
+            audio_file = next((p for p in subtitle_file.parent.glob(f"{subtitle_file.stem}.*") if p.suffix in AUDIO_EXTENSIONS), None)
+            if audio_file:
+                videos.append(decode_fixture(audio_file, subtitle_file, model, normalizer, args.batch_size))
+    else:
+        videos = list(synthetic_videos(args.num_synthetic))
+
+    agree, total, decoded_seconds, total_seconds = compare(videos, args.min_wer, args.min_cer, args.min_windows, args.step)
+    print(f"{total} videos, thresholds wer < {args.min_wer}, cer < {args.min_cer}")
+    print(f"Agreement with full decoding: {agree}/{total} ({agree / max(total, 1):.1%})")
+    print(f"Audio decoded: {decoded_seconds:.0f}/{total_seconds:.0f} s ({1 - decoded_seconds / max(total_seconds, 1e-9):.1%} ASR compute saved)")
+
+
+if __name__ == "__main__":
+    main()
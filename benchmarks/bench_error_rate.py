@@ -0,0 +1,85 @@
+import argparse
+import random
+import time
+import tracemalloc
+import scripts.error_rate as error_rate
+from scripts.error_rate import fast_cer, fast_wer
+
+
+def make_vocabulary(rng, size=3000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(2, 9))) for _ in range(size)]
+
+
+def corrupt(rng, words, vocabulary, rate):
+    """Copy of `words` with roughly `rate` of them substituted, deleted or inserted."""
+    out = []
+    for word in words:
+        roll = rng.random()
+        if roll < rate / 3:
+            out.append(rng.choice(vocabulary))
+        elif roll < 2 * rate / 3:
+            continue
+        elif roll < rate:
+            out.extend([word, rng.choice(vocabulary)])
+        else:
+            out.append(word)
+    return out
+
+
+def measure(score, pairs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for reference, hypothesis in pairs:
+        score(reference, hypothesis)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(pairs), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WER/CER scoring time and memory: jiwer vs. the threshold-bounded engine.")
+    parser.add_argument("--words", type=int, default=10000, help="Words per reference transcript.")
+    parser.add_argument("--pairs", type=int, default=5, help="Transcript pairs per case.")
+    parser.add_argument("--min_wer", type=float, default=0.05)
+    parser.add_argument("--min_cer", type=float, default=0.03)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    cases = {}
+    for name, rate in [("accepted (1% errors)", 0.01), ("rejected (30% errors)", 0.30)]:
+        pairs = []
+        for _ in range(args.pairs):
+            words = [rng.choice(vocabulary) for _ in range(args.words)]
+            pairs.append((" ".join(words), " ".join(corrupt(rng, words, vocabulary, rate))))
+        cases[name] = pairs
+
+    scorers = []
+    try:
+        from jiwer import cer, wer
+        scorers.append(("jiwer wer+cer", lambda r, h: (wer(r, h), cer(r, h))))
+    except ImportError:
+        print("❕ jiwer is not installed, skipping it")
+    backends = [False] + ([True] if error_rate.RAPIDFUZZ_AVAILABLE else [])
+    for use_rapidfuzz in backends:
+        label = "rapidfuzz" if use_rapidfuzz else "bit-parallel"
+        scorers.append((f"exact ({label})", use_rapidfuzz, lambda r, h: (fast_wer(r, h), fast_cer(r, h))))
+        scorers.append((f"bounded ({label})", use_rapidfuzz,
+                        lambda r, h: (fast_wer(r, h, args.min_wer), fast_cer(r, h, args.min_cer))))
+
+    available = error_rate.RAPIDFUZZ_AVAILABLE
+    for case, pairs in cases.items():
+        print(f"{case}, {args.words} words:")
+        for scorer in scorers:
+            name, score = scorer[0], scorer[-1]
+            if len(scorer) == 3:
+                error_rate.RAPIDFUZZ_AVAILABLE = scorer[1]
+            seconds, peak = measure(score, pairs)
+            error_rate.RAPIDFUZZ_AVAILABLE = available
+            print(f"  {name:<24}: {seconds * 1000:9.1f} ms/video, peak {peak / 1024 ** 2:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
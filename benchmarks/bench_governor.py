@@ -0,0 +1,150 @@
+import argparse
+import collections
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from benchmarks.stub_youtube import StubHandler, start_stub
+from scripts.governor import BOT_MESSAGES, BOTS, THROTTLED, CircuitOpenError, RequestGovernor, classify
+
+
+class ThrottlingHandler(StubHandler):
+    """
+    Watch pages from a server with a fixed capacity.
+
+    Requests above `capacity` per second get HTTP 429. Clients that keep
+    going after `abuse_limit` throttles within a second are shown the bot
+    check on every request for `ban_seconds`.
+    """
+
+    capacity = 20
+    abuse_limit = 10
+    ban_seconds = 3.0
+    lock = threading.Lock()
+    served = collections.deque()
+    throttled = collections.deque()
+    banned_until = 0.0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            now = time.monotonic()
+            for times in (cls.served, cls.throttled):
+                while times and times[0] < now - 1:
+                    times.popleft()
+            if now < cls.banned_until:
+                status = "bot"
+            elif len(cls.served) >= cls.capacity:
+                cls.throttled.append(now)
+                if len(cls.throttled) > cls.abuse_limit:
+                    cls.banned_until = now + cls.ban_seconds
+                status = "throttle"
+            else:
+                cls.served.append(now)
+                status = "ok"
+        if self.latency:
+            time.sleep(self.latency)
+        if status == "throttle":
+            self.send_body(b"Too Many Requests", status=429, content_type="text/plain")
+        elif status == "bot":
+            self.send_body(f"ERROR: [youtube] {BOT_MESSAGES[0]}".encode("utf-8"))
+        else:
+            self.send_body(b"<html>watch page</html>")
+
+
+def fetch_page(base_url, videoid):
+    """A stand-in for extract_info: raises like yt-dlp on throttles and bot checks."""
+    with urllib.request.urlopen(f"{base_url}/watch?v={videoid}", timeout=30) as response:
+        body = response.read().decode("utf-8")
+    if BOT_MESSAGES[0] in body:
+        raise RuntimeError(body)
+    return body
+
+
+def run_client(base_url, videoids, threads, governor=None, wait_sec=0.2):
+    """
+    Fetch every video with `threads` workers, like the retrieve scripts do.
+
+    Without a governor each worker sleeps `wait_sec` after a request, a
+    throttled video is lost and a bot check stops the run (the old exit(1)).
+    """
+    todo = queue.Queue()
+    for videoid in videoids:
+        todo.put(videoid)
+    counts = collections.Counter()
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            try:
+                videoid = todo.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if governor:
+                    governor.call(fetch_page, base_url, videoid)
+                else:
+                    fetch_page(base_url, videoid)
+                    time.sleep(wait_sec)
+                counts["done"] += 1
+            except CircuitOpenError:
+                stop.set()
+            except (urllib.error.URLError, RuntimeError) as e:
+                outcome = classify(e)
+                counts[outcome] += 1
+                if outcome == "bot":
+                    stop.set()
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return counts, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed sleeps vs. the adaptive request governor against a local stub that throttles and bot-checks.")
+    parser.add_argument("--videos", type=int, default=600)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=20, help="Requests per second the stub serves before answering 429.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated server latency in seconds.")
+    parser.add_argument("--ban_seconds", type=float, default=3.0, help="How long the stub bot-checks an abusive client.")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    handler = type("ThrottlingHandler", (ThrottlingHandler,), {"capacity": args.capacity, "ban_seconds": args.ban_seconds})
+    base_url = f"http://127.0.0.1:{args.port}"
+    videoids = [f"video{i:06d}" for i in range(args.videos)]
+    print(f"{args.videos} videos, {args.threads} threads, stub capacity {args.capacity} requests/s")
+    print(f"{'client':<22} {'done':>6} {'items/s':>8} {'throttled':>10} {'lost':>6} {'bot checks':>11}  result")
+
+    for wait_sec in (0.2, 1.0):
+        stub = start_stub(args.port, args.latency, handler)
+        try:
+            counts, elapsed = run_client(base_url, videoids, args.threads, wait_sec=wait_sec)
+        finally:
+            stub.terminate()
+            stub.join()
+        result = "stopped by bot check" if counts["bot"] else "finished"
+        lost = counts["throttle"] + counts["error"]
+        print(f"{f'fixed sleep {wait_sec} s':<22} {counts['done']:>6} {counts['done'] / elapsed:>8.1f} "
+              f"{counts['throttle']:>10} {lost:>6} {counts['bot']:>11}  {result}")
+
+    stub = start_stub(args.port, args.latency, handler)
+    governor = RequestGovernor(rate=args.capacity / 4, increase=1.0, cooldown=args.ban_seconds + 1, max_trips=5)
+    try:
+        counts, elapsed = run_client(base_url, videoids, args.threads, governor=governor)
+    finally:
+        stub.terminate()
+        stub.join()
+    s = governor.state
+    result = "breaker open" if counts["done"] < args.videos else "finished"
+    print(f"{'governor':<22} {counts['done']:>6} {counts['done'] / elapsed:>8.1f} "
+          f"{int(s[THROTTLED]):>10} {counts['error']:>6} {int(s[BOTS]):>11}  {result}, final rate {governor.rate:.1f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.stub_youtube import fake_video_ids
+from scripts.info_cache import InfoCache, cached_extract_info
+
+LANGS = [f"l{i:03d}" for i in range(150)]
+
+
+def fake_info(video_id):
+    """Info dict shaped like a YouTube one: metadata, formats and auto captions in every translation language."""
+    return {
+        "id": video_id, "title": f"title of {video_id}", "channel": "channel", "channel_id": "UC" + video_id * 2,
+        "duration": random.randint(60, 3600), "language": "en", "categories": ["Education"],
+        "formats": [{"format_id": str(i), "url": f"https://rr1.example/videoplayback?id={video_id}&itag={i}&expire=1"} for i in range(30)],
+        "thumbnails": [{"url": f"https://i.example/vi/{video_id}/{i}.jpg"} for i in range(40)],
+        "automatic_captions": {
+            lang: [{"ext": ext, "url": f"https://www.youtube.com/api/timedtext?v={video_id}&lang={lang}&fmt={ext}&expire=1"}
+                   for ext in ("json3", "srv1", "srv2", "srv3", "ttml", "srt", "vtt")]
+            for lang in LANGS
+        },
+        "subtitles": {},
+    }
+
+
+def stub_extractor(latency, calls):
+    def extract(video_url):
+        calls.append(video_url)
+        time.sleep(latency)
+        return fake_info(video_url.rsplit("=", 1)[1])
+    return extract
+
+
+def run_pass(name, video_ids, extract, cache, calls):
+    cache.hits = cache.misses = 0
+    calls.clear()
+    start = time.perf_counter()
+    for video_id in video_ids:
+        cached_extract_info(video_id, extract, cache)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32}: {cache.report()}, {len(calls)} extract calls, {elapsed / len(video_ids) * 1000:.2f} ms/video")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Info cache hit rate and lookup cost with a stubbed extractor.")
+    parser.add_argument("--videos", type=int, default=2000, help="Number of video IDs.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated extract_info latency in seconds.")
+    args = parser.parse_args()
+
+    video_ids = fake_video_ids("info cache", args.videos)
+    calls = []
+    extract = stub_extractor(args.latency, calls)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fn_cache = Path(tmpdir) / "info.sqlite"
+        with InfoCache(fn_cache) as cache:
+            run_pass("cold (retrieve_metadata)", video_ids, extract, cache, calls)
+            run_pass("warm (retrieve_subtitled_videos)", video_ids, extract, cache, calls)
+            size = cache.conn.execute("SELECT SUM(size) FROM info").fetchone()[0]
+            print(f"{size / len(video_ids) / 1024:.1f} KB per cached video (compressed)")
+
+        with InfoCache(fn_cache, ttl_seconds=0) as cache:
+            run_pass("expired (ttl 0)", video_ids[:200], extract, cache, calls)
+
+        max_bytes = size // 4
+        with InfoCache(fn_cache, max_bytes=max_bytes, evict_every=1) as cache:
+            cache.put("trigger", fake_info("trigger"))
+            kept = cache.conn.execute("SELECT COUNT(*), SUM(size) FROM info").fetchone()
+            print(f"evicted to {kept[1] / 1024 ** 2:.2f} MB (limit {max_bytes / 1024 ** 2:.2f} MB), {kept[0]} videos kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import glob
+import sys
+import time
+from scripts.normalizer import TextNormalizer
+from scripts.retrieve_subtitled_videos import parse_subtitle_cues, strip_annotations
+
+
+def load_videos(pattern):
+    """Per subtitle file, its whole text and its cue texts, cleaned like the WER/CER references."""
+    videos = []
+    for fn in sorted(glob.glob(pattern)):
+        cues = parse_subtitle_cues(fn)
+        videos.append((strip_annotations(cues.text()), [strip_annotations(text) for text in cues.texts]))
+    return videos
+
+
+def run(normalize_video, videos):
+    start = time.perf_counter()
+    results = [normalize_video(texts) for texts in videos]
+    return results, (time.perf_counter() - start) / len(videos)
+
+
+def bench_lang(lang, pattern, workers):
+    """Time normalize, normalize_batch and normalize_batch with split_sentences; returns how many normalize_batch results differ from normalize."""
+    videos = load_videos(pattern)
+    if not videos:
+        sys.exit(f"❌ No subtitle files match {pattern}")
+    print(f"{lang}: {len(videos)} videos")
+
+    mismatches = 0
+    # --asr_mode full normalizes one whole text per video, --asr_mode cues every cue on its own
+    for workload, texts in (("whole text", [[whole] for whole, _ in videos]), ("cues", [cues for _, cues in videos])):
+        print(f"  {workload} ({sum(map(len, texts))} texts)")
+        normalizer = TextNormalizer(lang)
+        expected, whole = run(lambda video: [normalizer.normalize(text) for text in video], texts)
+        print(f"    {'normalize':<32}: {whole * 1000:9.1f} ms/video")
+
+        for name, split in (("normalize_batch", False), ("normalize_batch, split_sentences", True)):
+            batcher = TextNormalizer(lang, workers=workers, split_sentences=split)
+            batched, per_video = run(batcher.normalize_batch, texts)
+            batcher.close()
+            differ = sum(a != b for want, got in zip(expected, batched) for a, b in zip(want, got))
+            print(f"    {name:<32}: {per_video * 1000:9.1f} ms/video, {whole / per_video:.1f}x, "
+                  f"{batcher.hits}/{batcher.hits + batcher.misses} from the cache, {differ} texts differ from normalize")
+            if not split:
+                # The default is the scoring path and must match normalize exactly
+                mismatches += differ
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-video normalization time: TextNormalizer.normalize vs. normalize_batch, for both backends.")
+    parser.add_argument("--en", type=str, help="Glob of English subtitle files (NeMo), e.g. 'sub/en/*.vtt'.")
+    parser.add_argument("--fa", type=str, help="Glob of Farsi subtitle files (ParsNorm), e.g. 'sub/fa/*.vtt'.")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for normalize_batch.")
+    args = parser.parse_args()
+    if not (args.en or args.fa):
+        parser.error("give subtitles for at least one backend with --en and/or --fa")
+
+    mismatches = 0
+    for lang, pattern in (("en", args.en), ("fa", args.fa)):
+        if pattern:
+            mismatches += bench_lang(lang, pattern, args.workers)
+    if mismatches:
+        print(f"❌ normalize_batch differs from normalize for {mismatches} texts")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
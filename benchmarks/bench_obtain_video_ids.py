@@ -0,0 +1,60 @@
+import argparse
+import csv
+import resource
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.stub_youtube import start_stub
+from scripts.obtain_video_ids import obtain_video_id, async_obtain_video_id
+
+
+def read_pairs(fn):
+    with open(fn, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return header, sorted(tuple(row) for row in reader)
+
+
+def peak_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the process pool and async engines of obtain_video_ids against a local stub.")
+    parser.add_argument("--words", type=int, default=2000, help="Number of search words.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated server latency in seconds.")
+    parser.add_argument("--processes", type=int, default=8, help="Processes for the pool engine.")
+    parser.add_argument("--concurrency", type=int, default=200, help="In-flight queries for the async engine.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    stub = start_stub(args.port, args.latency)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn_word = Path(tmpdir) / "words.txt"
+            fn_word.write_text("".join(f"word {i}\n" for i in range(args.words)), encoding="utf-8")
+
+            start = time.perf_counter()
+            fn_async = async_obtain_video_id(fn_word, Path(tmpdir) / "async", args.concurrency, base_url)
+            async_elapsed = time.perf_counter() - start
+            async_rss = peak_rss_mb(resource.RUSAGE_SELF)
+
+            start = time.perf_counter()
+            fn_pool = obtain_video_id(fn_word, Path(tmpdir) / "pool", args.processes, base_url)
+            pool_elapsed = time.perf_counter() - start
+            pool_rss = peak_rss_mb(resource.RUSAGE_CHILDREN) * args.processes
+
+            same = read_pairs(fn_async) == read_pairs(fn_pool)
+    finally:
+        stub.terminate()
+
+    print(f"{'engine':<8} {'words/sec':>10} {'peak RSS (MB)':>14}")
+    print(f"{'pool':<8} {args.words / pool_elapsed:>10.1f} {pool_rss:>14.1f}  (largest worker x {args.processes})")
+    print(f"{'async':<8} {args.words / async_elapsed:>10.1f} {async_rss:>14.1f}")
+    print(f"Identical CSV rows: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import random
+import re
+import string
+import time
+from scripts.text_stats import text_stats
+
+SAMPLES = {
+    "en": "Welcome back to the channel, today we look at 3 recipes! Ready? Let's start: first, the dough.",
+    "fa": "سلام به کانال ما خوش آمدید، امروز ۳ دستور پخت داریم! آماده‌اید؟ شروع کنیم: اول خمیر.",
+}
+
+
+def legacy_stats(text, lang):
+    """The prefilter statistics as computed before text_stats: one loop and two regex scans."""
+    english_chars = sum(1 for char in text if char in string.ascii_letters)
+    common = r'[؟،]' if lang == 'fa' else r'[,?]'
+    other = r'[!؛:]' if lang == 'fa' else r'[.:;!]'
+    return english_chars / len(text), len(re.findall(common, text)), len(re.findall(other, text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefilter text statistics: per-character loop + regexes vs. one vectorised pass.")
+    parser.add_argument("--lang", type=str, default="fa", choices=sorted(SAMPLES))
+    parser.add_argument("--lines", type=int, default=2000, help="Subtitle lines per video.")
+    parser.add_argument("--videos", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = SAMPLES[args.lang].split()
+    videos = []
+    for _ in range(args.videos):
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(4, 12))) for _ in range(args.lines)]
+        videos.append((" ".join(lines), lines))
+    chars = sum(len(text) for text, _ in videos)
+
+    start = time.perf_counter()
+    legacy = [legacy_stats(text, args.lang) for text, _ in videos]
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    stats = [text_stats(text, args.lang, lines) for text, lines in videos]
+    seconds = time.perf_counter() - start
+
+    same = all(abs(s["ascii_ratio"] - r) < 1e-12 and s["common_punct"] == c and s["other_punct"] == o
+               for s, (r, c, o) in zip(stats, legacy))
+    print(f"{chars / len(videos):,.0f} characters per video")
+    print(f"{'loop + regexes':<16}: {legacy_seconds / len(videos) * 1000:7.2f} ms/video")
+    print(f"{'text_stats':<16}: {seconds / len(videos) * 1000:7.2f} ms/video (also script, digit and repeated-line ratios)")
+    print(f"Speedup: {legacy_seconds / seconds:.1f}x, same ratio and punctuation counts: {same}")
+
+
+if __name__ == "__main__":
+    main()
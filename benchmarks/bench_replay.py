@@ -0,0 +1,483 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import wave
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+import numpy as np
+from benchmarks.stub_youtube import StubHandler, fake_video_ids, start_stub
+from scripts.asr_backends import Hypothesis
+from scripts.asr_batching import SAMPLE_RATE
+from scripts.result_sink import read_column
+from scripts.ydl_pool import YDL_POOL
+import scripts.obtain_video_ids as obtain_video_ids
+import scripts.retrieve_metadata as retrieve_metadata
+import scripts.retrieve_subtitled_videos as retrieve_subtitled_videos
+
+WORDS = ("speech", "language", "people", "really", "think", "world", "because", "little", "school", "water",
+         "music", "story", "today", "question", "answer", "number", "change", "learn", "house", "family",
+         "friend", "morning", "evening", "city", "market", "river", "mountain", "teacher", "student", "history")
+
+
+def make_sentence(rng, words=WORDS):
+    clauses = [" ".join(rng.choice(words) for _ in range(rng.randint(2, 5))) for _ in range(rng.randint(1, 3))]
+    return ", ".join(clauses).capitalize() + rng.choice((".", "?", ".", "!"))
+
+
+def srt_time(seconds, sep=","):
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}".replace(".", sep)
+
+
+def make_captions(rng, seconds, kind):
+    """The same cues as SRT and WebVTT text; 'digits' captions are mostly numbers (rejected by the text filter)."""
+    srt, vtt = [], ["WEBVTT", ""]
+    start, index = 0.0, 1
+    while start + 1 < seconds:
+        end = min(seconds, start + rng.uniform(2.0, 4.0))
+        text = " ".join(str(rng.randint(0, 9999)) for _ in range(6)) + "." if kind == "digits" else make_sentence(rng)
+        srt += [str(index), f"{srt_time(start)} --> {srt_time(end)}", text, ""]
+        vtt += [f"{srt_time(start, '.')} --> {srt_time(end, '.')}", text, ""]
+        start, index = end, index + 1
+    return "\n".join(srt), "\n".join(vtt)
+
+
+def write_clip(path, seconds, rng):
+    """A mono 16 kHz clip of tones in noise, standing in for speech."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = 0.05 * rng.standard_normal(len(t))
+    for freq in rng.uniform(150, 3000, size=4):
+        signal += 0.1 * np.sin(2 * np.pi * freq * t) * (np.sin(2 * np.pi * rng.uniform(0.5, 3) * t) > 0)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def make_fixtures(fixture_dir, words, lang="en", clips=4, clip_seconds=20.0, seed=0):
+    """
+    Write replay fixtures for every video the stub's search returns for `words`.
+
+    Layout (recorded fixtures in the same layout replay the same way):
+        search/<quoted word>.html   optional search result pages; generated when missing
+        info/<video_id>.json        yt-dlp info dicts; caption URLs are paths on the stub
+                                    and `_replay_audio` names the clip of the video
+        captions/<file>             SRT/WebVTT caption files
+        audio/<file>                audio clips
+
+    Most videos have captions in `lang` that pass the prefilter; the rest have
+    no captions in `lang`, another video language or captions made of numbers,
+    so every branch of the pipeline is exercised.
+    """
+    fixture_dir = Path(fixture_dir)
+    for name in ("info", "captions", "audio"):
+        (fixture_dir / name).mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    for k in range(clips):
+        write_clip(fixture_dir / "audio" / f"clip_{k}.wav", clip_seconds, np_rng)
+
+    video_ids = sorted({videoid for word in words for videoid in fake_video_ids(word)})
+    for videoid in video_ids:
+        kind = rng.choices(("good", "no_captions", "other_language", "digits"), weights=(6, 2, 1, 1))[0]
+        srt, vtt = make_captions(rng, clip_seconds, kind)
+        (fixture_dir / "captions" / f"{videoid}.{lang}.srt").write_text(srt, encoding="utf-8")
+        (fixture_dir / "captions" / f"{videoid}.{lang}.vtt").write_text(vtt, encoding="utf-8")
+        tracks = [{"ext": ext, "url": f"/captions/{videoid}.{lang}.{ext}"} for ext in ("vtt", "srt")]
+        caption_lang = "de" if kind == "no_captions" else lang
+        info = {
+            "id": videoid,
+            "title": make_sentence(rng),
+            "channel": f"channel {videoid[:3]}",
+            "channel_id": f"UC{videoid}",
+            "channel_url": f"https://www.youtube.com/channel/UC{videoid}",
+            "channel_follower_count": rng.randint(0, 100000),
+            "upload_date": f"20{rng.randint(10, 25)}0{rng.randint(1, 9)}1{rng.randint(0, 9)}",
+            "uploader_id": f"@{videoid}",
+            "uploader_url": f"https://www.youtube.com/@{videoid}",
+            "duration": int(clip_seconds),
+            "view_count": rng.randint(0, 10 ** 6),
+            "like_count": rng.randint(0, 10 ** 4),
+            "categories": [rng.choice(("Education", "People & Blogs", "Entertainment"))],
+            "language": "de" if kind == "other_language" else lang,
+            "subtitles": {caption_lang: tracks},
+            "automatic_captions": {caption_lang: tracks},
+            "_replay_audio": f"clip_{rng.randrange(clips)}.wav",
+        }
+        (fixture_dir / "info" / f"{videoid}.json").write_text(json.dumps(info), encoding="utf-8")
+    return video_ids
+
+
+class ReplayHandler(StubHandler):
+    """The search stub, plus caption and audio files from the fixture directory."""
+
+    fixture_dir = None
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path == "/results":
+            query = parse_qs(url.query).get("search_query", [""])[0]
+            recorded = Path(self.fixture_dir) / "search" / f"{quote(query, safe='')}.html"
+            if recorded.exists():
+                return self.send_body(recorded.read_bytes())
+            return StubHandler.do_GET(self)
+        folder, _, name = url.path.strip("/").partition("/")
+        path = Path(self.fixture_dir) / folder / name
+        if folder in ("captions", "audio") and "/" not in name and path.exists():
+            return self.send_body(path.read_bytes(), content_type="application/octet-stream")
+        self.send_body(b"not found", status=404, content_type="text/plain")
+
+
+class ReplayYoutubeDL:
+    """
+    yt-dlp stand-in that answers extract_info from fixture info dicts.
+
+    Installed as the factory of YDL_POOL, so every extraction, audio download,
+    caption fetch and URL lookup of the pipeline goes through it unchanged. Caption and
+    audio URLs point at the stub server; downloads copy the video's clip.
+    """
+
+    fixture_dir = None
+    base_url = None
+    latency = 0.0
+
+    def __init__(self, params):
+        self.params = params
+
+    def extract_info(self, url, download=False):
+        if self.latency:
+            time.sleep(self.latency)
+        videoid = parse_qs(urlparse(url).query)["v"][0]
+        path = Path(self.fixture_dir) / "info" / f"{videoid}.json"
+        if not path.exists():
+            raise RuntimeError(f"ERROR: [youtube] {videoid}: Video unavailable")
+        info = json.loads(path.read_text(encoding="utf-8"))
+        for captions in (info.get("subtitles", {}), info.get("automatic_captions", {})):
+            for tracks in captions.values():
+                for track in tracks:
+                    track["url"] = self.base_url + track["url"]
+        clip = info.pop("_replay_audio")
+        info.update(ext=Path(clip).suffix[1:], url=f"{self.base_url}/audio/{clip}", http_headers={})
+        if download:
+            target = Path(self.prepare_filename(info))
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(Path(self.fixture_dir) / "audio" / clip, target)
+        return info
+
+    def urlopen(self, url):
+        return urllib.request.urlopen(url, timeout=30)
+
+    def prepare_filename(self, info):
+        return self.params.get("outtmpl", "%(id)s.%(ext)s") % {"id": info["id"], "ext": info["ext"]}
+
+    def close(self):
+        pass
+
+
+class StandInASR:
+    """
+    Tiny CPU stand-in for the ASR model with NeMo's `transcribe(audio, batch_size, verbose)` API.
+
+    Every window goes through a real framed FFT, so the cost grows with the
+    audio like a model's would, and yields `words_per_second` words picked
+    from the spectrum. The transcripts do not match the captions.
+    """
+
+    def __init__(self, words_per_second=2.5):
+        self.words_per_second = words_per_second
+
+    def transcribe(self, audio, batch_size=8, verbose=False):
+        hypotheses = []
+        for waveform in audio:
+            waveform = np.asarray(waveform, dtype=np.float32)
+            if len(waveform) < 400:
+                hypotheses.append(Hypothesis(""))
+                continue
+            frames = np.lib.stride_tricks.sliding_window_view(waveform, 400)[::160]
+            peaks = np.abs(np.fft.rfft(frames * np.hanning(400), axis=-1)).argmax(axis=-1)
+            count = max(1, round(len(waveform) / SAMPLE_RATE * self.words_per_second))
+            hypotheses.append(Hypothesis(" ".join(WORDS[p % len(WORDS)] for p in peaks[::max(1, len(peaks) // count)][:count])))
+        return hypotheses
+
+
+class StandInNormalizer:
+    """Lowercases and drops punctuation; has the normalize_batch API of TextNormalizer without NeMo or ParsNorm."""
+
+    hits = 0
+    misses = 0
+
+    def normalize(self, text):
+        return re.sub(r"[^\w\s]", "", text.lower())
+
+    def normalize_batch(self, texts):
+        return [self.normalize(text) for text in texts]
+
+    def close(self):
+        pass
+
+
+class StageTimer:
+    """Wall-clock latency samples per stage, from wrapped module functions."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                # Failed calls are counted, not timed: a stage that only fails has no throughput
+                with self.lock:
+                    self.failures[stage] += 1
+                raise
+            with self.lock:
+                self.samples[stage].append(time.perf_counter() - start)
+            return result
+        return timed
+
+    def patch(self, module, stages):
+        """Replace `module.<name>` with a timed wrapper for each (stage, name) pair."""
+        for stage, name in stages:
+            setattr(module, name, self.wrap(stage, getattr(module, name)))
+
+    def summary(self):
+        """Per stage: successful and failed calls, and latency percentiles of the successful ones."""
+        summary = {}
+        for stage in dict.fromkeys([*self.samples, *self.failures]):
+            times = self.samples.get(stage, [])
+            summary[stage] = {"count": len(times), "failed": self.failures.get(stage, 0)}
+            if times:
+                summary[stage].update(p50_ms=float(np.percentile(times, 50) * 1000), p95_ms=float(np.percentile(times, 95) * 1000),
+                                      items_per_sec=len(times) / sum(times))
+        return summary
+
+
+def install_replay(fixture_dir, base_url, extract_latency):
+    ReplayYoutubeDL.fixture_dir = str(fixture_dir)
+    ReplayYoutubeDL.base_url = base_url
+    ReplayYoutubeDL.latency = extract_latency
+    YDL_POOL.factory = ReplayYoutubeDL
+
+
+def run_isolated(workdir, func, *args):
+    """
+    Run `func` in a forked child process inside `workdir`.
+
+    Returns its result with the peak RSS of the child and of its largest
+    worker process (MB), so each phase is measured on its own.
+    """
+    results = multiprocessing.Queue()
+
+    def child():
+        os.chdir(workdir)
+        try:
+            result = func(*args)
+        except BaseException as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        # ru_maxrss is in kilobytes on Linux
+        results.put((result, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                     resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024))
+
+    process = multiprocessing.Process(target=child)
+    process.start()
+    result, rss, workers_rss = results.get()
+    process.join()
+    if "error" in result:
+        raise RuntimeError(f"{func.__name__} failed: {result['error']}")
+    return result, rss, workers_rss
+
+
+def count_video_errors():
+    """Count the videos retrieve_subtitled_videos reports as failed in this process; returns the live counter."""
+    failed = {"videos": 0}
+    report = retrieve_subtitled_videos.report_video_error
+
+    def counted(videoid, e):
+        failed["videos"] += 1
+        return report(videoid, e)
+    retrieve_subtitled_videos.report_video_error = counted
+    return failed
+
+
+def lang_kwargs(lang):
+    """fetch_and_prefilter's keyword arguments, at retrieve_subtitle_exists' defaults."""
+    return dict(lang=lang, no_english=False, english=False, max_lang_ratio=0.5, min_lang_ratio=0.5,
+                min_duration=10, min_punct=5, use_auto=True)
+
+
+def run_stages(words, video_ids, lang, base_url, model, normalizer):
+    """Every stage on its own, one item at a time; returns per-stage latencies and items/sec, and the failed videos."""
+    failed = count_video_errors()
+    timer = StageTimer()
+    timer.patch(obtain_video_ids, [("search", "process_word")])
+    timer.patch(retrieve_metadata, [("info", "get_video_info")])
+    timer.patch(retrieve_subtitled_videos, [("captions", "download_captions"), ("prefilter", "fetch_and_prefilter"),
+                                            ("audio", "acquire_audio"), ("asr", "transcribe_videos"),
+                                            ("score", "score_transcription")])
+    for word in words:
+        obtain_video_ids.process_word(word, base_url=base_url)
+    for videoid in video_ids:
+        retrieve_metadata.get_video_info(videoid)
+    for videoid in video_ids:
+        retrieve_subtitled_videos.process_video(videoid=videoid, query_phrase="", model=model, normalizer=normalizer,
+                                                min_wer=0.8, min_cer=0.2, use_asr=True, **lang_kwargs(lang))
+    return {"stages": timer.summary(), "failed": failed["videos"]}
+
+
+def run_obtain(fn_word, processes, base_url):
+    start = time.perf_counter()
+    fn_videoid = obtain_video_ids.obtain_video_id(fn_word, "videoid", processes, base_url)
+    return {"seconds": time.perf_counter() - start, "csv": str(Path(fn_videoid).resolve())}
+
+
+def run_metadata(fn_videoid, processes):
+    sys.argv = ["retrieve_metadata", "--input_csv", fn_videoid, "--output_csv", "metadata/metadata.csv",
+                "--num_workers", str(processes), "--rate", "1000", "--max_rate", "1000"]
+    start = time.perf_counter()
+    retrieve_metadata.main()
+    return {"seconds": time.perf_counter() - start}
+
+
+def run_retrieve(fn_videoid, lang, model, normalizer, pipeline):
+    failed = count_video_errors()
+    start = time.perf_counter()
+    retrieve_subtitled_videos.retrieve_subtitle_exists(lang, fn_videoid, model, normalizer, outdir="sub", wait_sec=0,
+                                                       pipeline=pipeline)
+    return {"seconds": time.perf_counter() - start, "failed": failed["videos"]}
+
+
+def count_rows(fn_csv):
+    with open(fn_csv, "r", encoding="utf-8") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def print_comparison(results, baseline):
+    print(f"\nChange vs. {baseline['path']} (higher items/sec is better; lower p95 and peak RSS are better)")
+    for section, key in (("stages", "items_per_sec"), ("stages", "p95_ms"), ("end_to_end", "items_per_sec"), ("end_to_end", "peak_rss_mb")):
+        for name, values in results[section].items():
+            old = baseline[section].get(name, {}).get(key)
+            if old and key in values:
+                print(f"  {section}/{name} {key}: {old:.2f} -> {values[key]:.2f} ({values[key] / old - 1:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the pipeline offline against fixtures and a local fake YouTube; "
+                                                 "reports items/sec, per-stage p50/p95 latency and peak RSS.")
+    parser.add_argument("--words", type=int, default=10, help="Search words; the stub returns 20 videos for each.")
+    parser.add_argument("--stage_videos", type=int, default=50, help="Videos for the per-stage measurements.")
+    parser.add_argument("--fixtures", type=str, default=None, help="Fixture directory (see make_fixtures); generated in a temporary directory if not given.")
+    parser.add_argument("--lang", type=str, default="en")
+    parser.add_argument("--clip_seconds", type=float, default=20.0, help="Length of the generated audio clips.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated latency of the stub server in seconds.")
+    parser.add_argument("--extract_latency", type=float, default=0.05, help="Simulated latency of each extract_info call in seconds.")
+    parser.add_argument("--processes", type=int, default=4, help="Processes for obtain_video_ids and retrieve_metadata.")
+    parser.add_argument("--pipeline", action="store_true", help="Run retrieve_subtitle_exists with the staged pipeline.")
+    parser.add_argument("--real_normalizer", action="store_true", help="Use TextNormalizer (needs NeMo or ParsNorm) instead of the stand-in.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--save", type=str, default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=str, default=None, help="JSON file of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    # Without a decoder every video fails in the audio stage and the ASR numbers are meaningless
+    if not shutil.which("ffmpeg") and importlib.util.find_spec("librosa") is None:
+        sys.exit("❌ Decoding the audio clips needs ffmpeg on PATH (or librosa).")
+
+    # The fake extractor is installed in this process and must reach every worker the scripts start
+    multiprocessing.set_start_method("fork", force=True)
+    words = [f"{WORDS[i % len(WORDS)]} {i}" for i in range(args.words)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        fixture_dir = Path(args.fixtures) if args.fixtures else tmpdir / "fixtures"
+        if args.fixtures:
+            video_ids = sorted(p.stem for p in (fixture_dir / "info").glob("*.json"))
+        else:
+            video_ids = make_fixtures(fixture_dir, words, lang=args.lang, clip_seconds=args.clip_seconds, seed=args.seed)
+        fn_word = tmpdir / "words.txt"
+        fn_word.write_text("".join(w + "\n" for w in words), encoding="utf-8")
+
+        base_url = f"http://127.0.0.1:{args.port}"
+        handler = type("ReplayHandler", (ReplayHandler,), {"fixture_dir": str(fixture_dir)})
+        stub = start_stub(args.port, args.latency, handler)
+        install_replay(fixture_dir, base_url, args.extract_latency)
+        model = StandInASR()
+        if args.real_normalizer:
+            from scripts.normalizer import TextNormalizer
+            normalizer = TextNormalizer(args.lang)
+        else:
+            normalizer = StandInNormalizer()
+        pipeline = dict(caption_workers=4, audio_workers=2, score_workers=1, queue_size=8, asr_videos=4) if args.pipeline else None
+
+        try:
+            print(f"Replaying {len(words)} words and {len(video_ids)} videos from {fixture_dir}")
+            workdirs = {name: tmpdir / name for name in ("stages", "obtain", "metadata", "retrieve")}
+            for workdir in workdirs.values():
+                workdir.mkdir()
+
+            result, _, _ = run_isolated(workdirs["stages"], run_stages, words, video_ids[:args.stage_videos], args.lang,
+                                        base_url, model, normalizer)
+            stages, failed = result["stages"], {"stages": result["failed"]}
+            end_to_end = {}
+            obtain, rss, workers_rss = run_isolated(workdirs["obtain"], run_obtain, fn_word, args.processes, base_url)
+            end_to_end["obtain_video_ids"] = {"items": len(words), "seconds": obtain["seconds"], "peak_rss_mb": rss, "worker_rss_mb": workers_rss}
+            fn_videoid = obtain["csv"]
+            found = len(read_column(fn_videoid, "video_id"))
+            result, rss, workers_rss = run_isolated(workdirs["metadata"], run_metadata, fn_videoid, args.processes)
+            end_to_end["retrieve_metadata"] = {"items": found, "seconds": result["seconds"], "peak_rss_mb": rss, "worker_rss_mb": workers_rss}
+            result, rss, workers_rss = run_isolated(workdirs["retrieve"], run_retrieve, fn_videoid, args.lang, model, normalizer, pipeline)
+            end_to_end["retrieve_subtitle_exists"] = {"items": count_rows(workdirs["retrieve"] / "sub" / f"{Path(fn_videoid).stem}.csv"),
+                                                      "seconds": result["seconds"], "peak_rss_mb": rss, "worker_rss_mb": workers_rss}
+            failed["retrieve_subtitle_exists"] = result["failed"]
+        finally:
+            stub.terminate()
+
+    for values in end_to_end.values():
+        values["items_per_sec"] = values["items"] / values["seconds"]
+
+    print(f"\n{'stage':<12} {'count':>6} {'failed':>7} {'items/sec':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for stage, values in stages.items():
+        if values["count"]:
+            print(f"{stage:<12} {values['count']:>6} {values['failed']:>7} {values['items_per_sec']:>10.1f} {values['p50_ms']:>9.1f} {values['p95_ms']:>9.1f}")
+        else:
+            print(f"{stage:<12} {values['count']:>6} {values['failed']:>7}  ❌ no successful items")
+    print("(captions is part of prefilter; audio, asr and score only run for videos that pass the prefilter)")
+    print(f"\n{'script':<26} {'items':>6} {'items/sec':>10} {'peak RSS MB':>12} {'worker RSS MB':>14}")
+    for script, values in end_to_end.items():
+        print(f"{script:<26} {values['items']:>6} {values['items_per_sec']:>10.1f} {values['peak_rss_mb']:>12.1f} {values['worker_rss_mb']:>14.1f}")
+
+    results = {"config": vars(args), "stages": stages, "end_to_end": end_to_end, "failed_videos": failed}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(results, {**json.load(f), "path": args.compare})
+    if any(failed.values()):
+        sys.exit(f"❌ Videos failed ({', '.join(f'{name}: {n}' for name, n in failed.items() if n)}); "
+                 f"the numbers above are not comparable and were not saved.")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
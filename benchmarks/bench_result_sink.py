@@ -0,0 +1,70 @@
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+from scripts.result_sink import CsvResultSink, read_column
+from scripts.retrieve_subtitled_videos import FIELDNAMES
+
+
+def fake_entry(i):
+    entry = {name: f"{name}-{i}" for name in FIELDNAMES}
+    entry["videoid"] = f"vid{i:08d}"
+    entry["categories"] = ["Education"]
+    return entry
+
+
+def rewrite_every_batch(fn, rows, batch_size, report_every):
+    """The old pattern: keep every entry and rewrite the whole CSV every batch."""
+    entries = []
+    timings = []
+    start = time.perf_counter()
+    for i in range(rows):
+        entries.append(fake_entry(i))
+        if len(entries) % batch_size == 0:
+            with open(fn, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+                writer.writeheader()
+                writer.writerows(entries)
+        if (i + 1) % report_every == 0:
+            timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+    return timings
+
+
+def append_with_sink(fn, rows, batch_size, report_every):
+    timings = []
+    start = time.perf_counter()
+    with CsvResultSink(fn, FIELDNAMES, batch_size=batch_size, resume=False) as sink:
+        for i in range(rows):
+            sink.write(fake_entry(i))
+            if (i + 1) % report_every == 0:
+                timings.append(time.perf_counter() - start)
+                start = time.perf_counter()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-row cost of full CSV rewrites against the append-only result sink.")
+    parser.add_argument("--rows", type=int, default=20000, help="Number of rows to write.")
+    parser.add_argument("--batch_size", type=int, default=50, help="Rows per write.")
+    parser.add_argument("--report_every", type=int, default=5000, help="Rows per reported interval.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rewrite = rewrite_every_batch(Path(tmpdir) / "rewrite.csv", args.rows, args.batch_size, args.report_every)
+        fn_sink = Path(tmpdir) / "sink.csv"
+        append = append_with_sink(fn_sink, args.rows, args.batch_size, args.report_every)
+
+        start = time.perf_counter()
+        ids = read_column(fn_sink, "videoid")
+        resume_elapsed = time.perf_counter() - start
+
+    print(f"{'rows':>10} {'rewrite us/row':>16} {'sink us/row':>14}")
+    for n, (a, b) in enumerate(zip(rewrite, append), start=1):
+        print(f"{n * args.report_every:>10} {a / args.report_every * 1e6:>16.1f} {b / args.report_every * 1e6:>14.1f}")
+    print(f"Resume read {len(ids)} IDs in {resume_elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
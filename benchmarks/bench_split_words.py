@@ -0,0 +1,80 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from scripts.split_words import split_words
+
+
+def split_in_memory(txt_path, num_splits, output_dir):
+    """The old split_words: read every line, shuffle in memory and write contiguous slices."""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(txt_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    random.shuffle(lines)
+    split_size, extra = divmod(len(lines), num_splits)
+    start = 0
+    for i in range(num_splits):
+        end = start + split_size + (1 if i < extra else 0)
+        with open(os.path.join(output_dir, f"split_{i+1:04d}.txt"), "w", encoding="utf-8") as f:
+            f.writelines(lines[start:end])
+        start = end
+
+
+def measure(split, txt_path, num_splits, output_dir, **kwargs):
+    """Seconds and peak traced memory (MB) of one split; tracing slows it down, so it is timed separately."""
+    start = time.perf_counter()
+    split(txt_path, num_splits, output_dir, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    split(txt_path, num_splits, output_dir, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def shard_assignment(output_dir):
+    shards = {}
+    for fn in sorted(Path(output_dir).glob("split_*.txt")):
+        for line in fn.read_text(encoding="utf-8").splitlines():
+            shards[line] = fn.name
+    return shards
+
+
+def kept_share(before, after):
+    return sum(after.get(line) == shard for line, shard in before.items()) / len(before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory shuffle split vs. stable hash sharding with an external shuffle.")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Number of words in the list.")
+    parser.add_argument("--num_splits", type=int, default=16)
+    parser.add_argument("--max_lines_in_memory", type=int, default=100_000, help="Buffer of the streaming splitter.")
+    parser.add_argument("--growth", type=float, default=0.1, help="Share of words added to the list for the stability check.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        words = [f"word {i} {random.random():.6f}" for i in range(args.lines)]
+        grown = words + [f"new word {i}" for i in range(int(args.lines * args.growth))]
+        random.shuffle(grown)
+        (tmpdir / "words.txt").write_text("".join(w + "\n" for w in words), encoding="utf-8")
+        (tmpdir / "grown.txt").write_text("".join(w + "\n" for w in grown), encoding="utf-8")
+        del words, grown
+
+        print(f"{args.lines} lines, {args.num_splits} splits, list grown by {args.growth:.0%} for the stability check")
+        print(f"{'splitter':<10} {'seconds':>8} {'peak MB':>8} {'lines kept in their shard':>26}")
+        for name, split, kwargs in (
+            ("shuffle", split_in_memory, {}),
+            ("stable", split_words, {"max_lines_in_memory": args.max_lines_in_memory}),
+        ):
+            elapsed, peak = measure(split, tmpdir / "words.txt", args.num_splits, tmpdir / name / "before", **kwargs)
+            split(tmpdir / "grown.txt", args.num_splits, tmpdir / name / "after", **kwargs)
+            kept = kept_share(shard_assignment(tmpdir / name / "before"), shard_assignment(tmpdir / name / "after"))
+            print(f"{name:<10} {elapsed:>8.2f} {peak:>8.1f} {kept:>26.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import time
+from pathlib import Path
+import numpy as np
+from scripts.vad import SAMPLE_RATE, vad_chunks
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".m4a", ".webm", ".opus")
+CHUNK_SIZE = 30 * SAMPLE_RATE
+
+
+def synthetic_audio(seconds, seed=0):
+    """Speech-like bursts between pauses of 0.1-3 s, with a 20 s silence every ten bursts; returns (waveform, speech mask)."""
+    rng = np.random.default_rng(seed)
+    parts, speech = [], []
+    total = 0
+    i = 0
+    while total < seconds * SAMPLE_RATE:
+        pause = int((20.0 if i % 10 == 0 else rng.uniform(0.1, 3.0)) * SAMPLE_RATE)
+        parts.append(rng.standard_normal(pause) * 0.001)
+        speech.append(np.zeros(pause, dtype=bool))
+        n = int(rng.uniform(0.5, 6.0) * SAMPLE_RATE)
+        envelope = 1 + np.sin(np.arange(n) / 800)
+        parts.append(rng.standard_normal(n) * 0.1 * envelope)
+        speech.append(np.ones(n, dtype=bool))
+        total += pause + n
+        i += 1
+    return np.concatenate(parts).astype("float32"), np.concatenate(speech)
+
+
+def fixed_chunks(waveform):
+    return [(start / SAMPLE_RATE, waveform[start:start + CHUNK_SIZE]) for start in range(0, len(waveform), CHUNK_SIZE)]
+
+
+def stream(waveform):
+    return (waveform[start:start + CHUNK_SIZE] for start in range(0, len(waveform), CHUNK_SIZE))
+
+
+def cut_stats(chunks, speech):
+    """Seconds decoded, share of speech covered, and chunk edges that fall inside speech."""
+    covered = np.zeros(len(speech), dtype=bool)
+    edges = set()
+    for start, samples in chunks:
+        begin = int(start * SAMPLE_RATE)
+        covered[begin:begin + len(samples)] = True
+        edges.update((begin, begin + len(samples)))
+    inside = sum(int(speech[edge]) for edge in edges if 0 < edge < len(speech))
+    return sum(len(s) for _, s in chunks) / SAMPLE_RATE, covered[speech].mean(), inside
+
+
+def simulate(seconds):
+    waveform, speech = synthetic_audio(seconds)
+    for name, make_chunks in [("fixed 30 s", fixed_chunks), ("vad", lambda w: list(vad_chunks(stream(w))))]:
+        start = time.perf_counter()
+        chunks = make_chunks(waveform)
+        elapsed = time.perf_counter() - start
+        decoded, coverage, inside = cut_stats(chunks, speech)
+        print(f"{name:<10}: {decoded:7.0f}/{len(waveform) / SAMPLE_RATE:.0f} s decoded, {coverage:.2%} of speech kept, "
+              f"{inside} cuts inside speech, {len(chunks)} chunks, {elapsed:.2f} s")
+
+
+def compare_fixtures(fixtures, model_name, lang, min_wer, min_cer, batch_size):
+    from jiwer import cer, wer
+    from scripts.normalizer import TextNormalizer
+    from scripts.retrieve_subtitled_videos import extract_subtitle_text, load_model, transcribe_audio
+    from scripts.audio_stream import decode_audio
+
+    model = load_model(model_name)
+    normalizer = TextNormalizer(lang=lang)
+    totals = {False: [0.0, 0], True: [0.0, 0]}
+    count = 0
+    for subtitle_file in sorted(Path(fixtures).glob("*.vtt")):
+        audio_file = next((p for p in subtitle_file.parent.glob(f"{subtitle_file.stem}.*") if p.suffix in AUDIO_EXTENSIONS), None)
+        if audio_file is None:
+            continue
+        count += 1
+        reference = extract_subtitle_text(str(subtitle_file), normalizer)
+        waveform = decode_audio(str(audio_file))
+        for vad in (False, True):
+            hypothesis = transcribe_audio(str(audio_file), model, normalizer, batch_size=batch_size, vad=vad)
+            rejected = not (wer(reference, hypothesis) < min_wer and cer(reference, hypothesis) < min_cer)
+            decoded = sum(len(c) for _, c in vad_chunks(stream(waveform))) if vad else len(waveform)
+            totals[vad][0] += decoded / SAMPLE_RATE
+            totals[vad][1] += rejected
+    for vad, (decoded, rejected) in totals.items():
+        print(f"{'vad' if vad else 'fixed 30 s':<10}: {decoded:.0f} s decoded, {rejected}/{count} videos rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed 30 s windows vs. VAD chunks: audio decoded, cuts inside speech and rejections.")
+    parser.add_argument("--fixtures", type=str, default=None, help="Directory of <id>.<audio ext> + <id>.vtt pairs; synthetic audio is used if omitted.")
+    parser.add_argument("--model", type=str, default="stt_en_conformer_ctc_small", help="ASR model for --fixtures.")
+    parser.add_argument("--lang", type=str, default="en", help="Normalizer language for --fixtures.")
+    parser.add_argument("--seconds", type=float, default=3600.0, help="Length of the synthetic audio.")
+    parser.add_argument("--min_wer", type=float, default=0.3, help="Maximum word error rate.")
+    parser.add_argument("--min_cer", type=float, default=0.2, help="Maximum character error rate.")
+    parser.add_argument("--batch_size", type=int, default=8, help="Windows per ASR model call.")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        compare_fixtures(args.fixtures, args.model, args.lang, args.min_wer, args.min_cer, args.batch_size)
+    else:
+        simulate(args.seconds)
+
+
+if __name__ == "__main__":
+    main()
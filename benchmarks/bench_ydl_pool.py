@@ -0,0 +1,70 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+from benchmarks.stub_youtube import fake_video_ids
+from scripts.ydl_pool import YdlPool
+
+
+class StubIE(InfoExtractor):
+    """Offline extractor: answers stub:<video_id> URLs with a canned info dict."""
+    IE_NAME = "stub"
+    _VALID_URL = r"stub:(?P<id>[\w-]{11})"
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {"id": video_id, "title": f"title of {video_id}", "url": f"http://127.0.0.1/{video_id}.m4a", "ext": "m4a",
+                "duration": 60, "automatic_captions": {}, "subtitles": {}}
+
+
+def stub_factory(ydl_opts):
+    ydl = yt_dlp.YoutubeDL(ydl_opts)
+    ydl.add_info_extractor(StubIE())
+    return ydl
+
+
+def write_cookie_file(fn, count):
+    lines = ["# Netscape HTTP Cookie File"]
+    lines += [f".youtube.com\tTRUE\t/\tTRUE\t2147483647\tCOOKIE{i}\t{'v' * 40}" for i in range(count)]
+    fn.write_text("\n".join(lines) + "\n")
+
+
+def per_call(video_ids, ydl_opts):
+    for video_id in video_ids:
+        with stub_factory(ydl_opts) as ydl:
+            ydl.extract_info(f"stub:{video_id}", download=False, ie_key="Stub")
+
+
+def pooled(video_ids, ydl_opts):
+    pool = YdlPool(factory=stub_factory)
+    for video_id in video_ids:
+        with pool.client(ydl_opts) as ydl:
+            ydl.extract_info(f"stub:{video_id}", download=False, ie_key="Stub")
+    pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-video overhead of building a YoutubeDL per call vs. a pooled client, with an offline extractor.")
+    parser.add_argument("--videos", type=int, default=500, help="Number of video IDs.")
+    parser.add_argument("--cookies", type=int, default=50, help="Cookies in the cookie file.")
+    args = parser.parse_args()
+
+    video_ids = fake_video_ids("ydl pool", args.videos)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fn_cookies = Path(tmpdir) / "cookies.txt"
+        write_cookie_file(fn_cookies, args.cookies)
+        ydl_opts = {"skip_download": True, "cookiefile": str(fn_cookies), "quiet": True, "no_warnings": True}
+
+        results = {}
+        for name, run in [("new YoutubeDL per video", per_call), ("pooled client", pooled)]:
+            start = time.perf_counter()
+            run(video_ids, ydl_opts)
+            results[name] = (time.perf_counter() - start) / len(video_ids)
+            print(f"{name:<24}: {results[name] * 1000:.2f} ms/video")
+        print(f"Speedup: {results['new YoutubeDL per video'] / results['pooled client']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import hashlib
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process
+from urllib.parse import parse_qs, urlparse
+
+VIDEOS_PER_QUERY = 20
+
+
+def fake_video_ids(query, count=VIDEOS_PER_QUERY):
+    """Deterministic 11-character video IDs for a search query."""
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    ids = []
+    for i in range(count):
+        digest = hashlib.sha1(f"{query}/{i}".encode("utf-8")).digest()
+        ids.append("".join(alphabet[b % 64] for b in digest[:11]))
+    return ids
+
+
+def search_result_html(query):
+    items = ",".join(
+        f'{{"videoRenderer":{{"videoId":"{videoid}","title":{{"runs":[{{"text":"{query} {i}"}}]}}}}}}'
+        for i, videoid in enumerate(fake_video_ids(query))
+    )
+    return f'<html><script>var ytInitialData = {{"contents":[{items}]}};</script></html>'.encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, status=200, content_type="text/html; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path == "/results":
+            query = parse_qs(url.query).get("search_query", [""])[0]
+            self.send_body(search_result_html(query))
+        else:
+            self.send_body(b"not found", status=404, content_type="text/plain")
+
+
+def serve(port, latency=0.0, handler=StubHandler):
+    handler = type(handler.__name__, (handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+
+def start_stub(port, latency=0.0, handler=StubHandler):
+    """Run the stub in its own process so it does not compete with the client for the GIL."""
+    process = Process(target=serve, args=(port, latency, handler), daemon=True)
+    process.start()
+    time.sleep(0.5)
+    return process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub that serves canned YouTube search results.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated server latency in seconds.")
+    args = parser.parse_args()
+    print(f"Serving fake YouTube search on http://127.0.0.1:{args.port}")
+    serve(args.port, args.latency)
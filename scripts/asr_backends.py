@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Same shape as NeMo's hypotheses, so callers read `.text` from every backend
+Hypothesis = namedtuple("Hypothesis", ["text"])
+
+BACKENDS = ("nemo", "onnx")
+
+# Preprocessor settings of NeMo's AudioToMelSpectrogramPreprocessor used when an export has no preprocessor.json
+DEFAULT_PREPROCESSOR = {
+    "sample_rate": 16000,
+    "window_size": 0.025,
+    "window_stride": 0.01,
+    "n_fft": 512,
+    "features": 80,
+    "preemph": 0.97,
+    "normalize": "per_feature",
+    "log_zero_guard_value": 2 ** -24,
+    "lowfreq": 0,
+    "highfreq": None,
+}
+
+
+def load_nemo_model(model_path):
+    from nemo.collections.asr.models import ASRModel
+
+    if os.path.exists(model_path):
+        return ASRModel.restore_from(restore_path=model_path)
+    return ASRModel.from_pretrained(model_path)
+
+
+def load_backend(backend, model_path, threads=None):
+    """
+    Load an ASR model with NeMo's `transcribe(audio, batch_size, verbose)` API.
+
+    Args:
+        backend (str): 'nemo' for a .nemo file or pretrained name, 'onnx' for a directory made by `export`.
+        model_path (str): Model to load.
+        threads (int): CPU threads for the 'onnx' backend; None lets onnxruntime decide.
+    """
+    if backend == "nemo":
+        return load_nemo_model(model_path)
+    if backend == "onnx":
+        return OnnxCtcModel(model_path, threads=threads)
+    raise ValueError(f"Unknown ASR backend '{backend}'. Available backends: {', '.join(BACKENDS)}.")
+
+
+def _hz_to_mel(freqs):
+    # Slaney mel scale, as librosa.filters.mel(htk=False) and NeMo use it
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mels = freqs / (200.0 / 3)
+    log_region = freqs >= 1000.0
+    mels[log_region] = 15.0 + np.log(freqs[log_region] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+
+def _mel_to_hz(mels):
+    mels = np.asarray(mels, dtype=np.float64)
+    freqs = mels * (200.0 / 3)
+    log_region = mels >= 15.0
+    freqs[log_region] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log_region] - 15.0))
+    return freqs
+
+
+def mel_filterbank(sample_rate, n_fft, n_mels, fmin=0.0, fmax=None):
+    """Slaney-normalized mel filterbank of shape (n_mels, n_fft // 2 + 1), equal to librosa's."""
+    fmax = fmax or sample_rate / 2
+    fft_freqs = np.linspace(0, sample_rate / 2, n_fft // 2 + 1)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel([fmin])[0], _hz_to_mel([fmax])[0], n_mels + 2))
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, None]
+    return weights.astype(np.float32)
+
+
+class LogMelFeatures:
+    """
+    NumPy port of NeMo's inference-time log-mel preprocessor (no dither, no padding to a multiple).
+
+    Attributes:
+        config (dict): Preprocessor settings, see DEFAULT_PREPROCESSOR.
+    """
+
+    def __init__(self, config=None):
+        self.config = {**DEFAULT_PREPROCESSOR, **(config or {})}
+        sample_rate = self.config["sample_rate"]
+        self.n_fft = self.config["n_fft"]
+        self.win_length = int(self.config["window_size"] * sample_rate)
+        self.hop_length = int(self.config["window_stride"] * sample_rate)
+        window = np.hanning(self.win_length).astype(np.float32)
+        left = (self.n_fft - self.win_length) // 2
+        self.window = np.pad(window, (left, self.n_fft - self.win_length - left))
+        self.filterbank = mel_filterbank(sample_rate, self.n_fft, self.config["features"],
+                                         self.config["lowfreq"] or 0.0, self.config["highfreq"])
+
+    def __call__(self, waveform):
+        """Log-mel features of shape (features, frames) for one float32 waveform."""
+        x = np.asarray(waveform, dtype=np.float32)
+        if self.config["preemph"]:
+            x = np.concatenate([x[:1], x[1:] - self.config["preemph"] * x[:-1]])
+        x = np.pad(x, self.n_fft // 2)
+        frames = np.lib.stride_tricks.sliding_window_view(x, self.n_fft)[::self.hop_length]
+        power = np.abs(np.fft.rfft(frames * self.window, axis=-1)) ** 2
+        features = np.log(self.filterbank @ power.T.astype(np.float32) + self.config["log_zero_guard_value"])
+        if self.config["normalize"] == "per_feature" and features.shape[1] > 1:
+            mean = features.mean(axis=1, keepdims=True)
+            std = features.std(axis=1, ddof=1, keepdims=True)
+            features = (features - mean) / (std + 1e-5)
+        return features.astype(np.float32)
+
+
+def ctc_greedy_decode(logprobs, vocabulary):
+    """Best path of a (frames, tokens) CTC output, with repeats collapsed and blanks (the last index) dropped."""
+    best = logprobs.argmax(axis=-1)
+    blank = len(vocabulary)
+    pieces, previous = [], None
+    for token in best:
+        if token != previous and token != blank:
+            pieces.append(vocabulary[token])
+        previous = token
+    return "".join(pieces).replace("▁", " ").strip()
+
+
+class OnnxCtcModel:
+    """
+    CTC model exported from NeMo and run with onnxruntime on the CPU.
+
+    On CPU-only workers full-precision PyTorch inference is the main cost once
+    the audio is downloaded. `export` writes the model as ONNX together with an
+    int8 dynamically quantized copy, its vocabulary and preprocessor settings.
+    This class computes the same log-mel features as NeMo in NumPy, runs the
+    (quantized) graph with a fixed number of threads and decodes greedily, so
+    transcripts match the NeMo path up to quantization error.
+
+    Attributes:
+        model_dir (Path): Directory written by `export`.
+        threads (int): Intra-op threads of the onnxruntime session.
+    """
+
+    def __init__(self, model_dir, threads=None, quantized=True):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("The onnx ASR backend needs onnxruntime. Please install it with: pip install onnxruntime")
+        self.model_dir = Path(model_dir)
+        self.threads = threads
+        model_file = self.model_dir / "model.int8.onnx"
+        if not quantized or not model_file.exists():
+            model_file = self.model_dir / "model.onnx"
+        with open(self.model_dir / "vocab.json", "r", encoding="utf-8") as f:
+            self.vocabulary = json.load(f)
+        preprocessor = self.model_dir / "preprocessor.json"
+        config = json.loads(preprocessor.read_text(encoding="utf-8")) if preprocessor.exists() else None
+        self.features = LogMelFeatures(config)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def transcribe(self, audio, batch_size=8, verbose=False):
+        hypotheses = []
+        for start in range(0, len(audio), batch_size):
+            hypotheses.extend(self._transcribe_batch(audio[start:start + batch_size]))
+        return hypotheses
+
+    def _transcribe_batch(self, waveforms):
+        if not waveforms:
+            return []
+        features = [self.features(w) for w in waveforms]
+        lengths = np.array([f.shape[1] for f in features], dtype=np.int64)
+        batch = np.zeros((len(features), features[0].shape[0], lengths.max()), dtype=np.float32)
+        for i, f in enumerate(features):
+            batch[i, :, :f.shape[1]] = f
+        logprobs = self.session.run(None, dict(zip(self.input_names, (batch, lengths))))[0]
+        # The graph only returns log-probs; valid output frames scale with the input length
+        valid = np.ceil(lengths * logprobs.shape[1] / lengths.max()).astype(int)
+        return [Hypothesis(ctc_greedy_decode(logprobs[i, :valid[i]], self.vocabulary)) for i in range(len(features))]
+
+
+def export(model_path, out_dir, quantize=True):
+    """
+    Export a NeMo CTC (or hybrid RNNT/CTC) model for the onnx backend.
+
+    Writes model.onnx, model.int8.onnx (weights quantized to int8 with
+    onnxruntime's dynamic quantization), vocab.json and preprocessor.json.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model = load_nemo_model(model_path)
+    model.eval()
+    decoder = model.decoder
+    if hasattr(model, "ctc_decoder"):
+        # Hybrid models: export their CTC head
+        model.set_export_config({"decoder_type": "ctc"})
+        decoder = model.ctc_decoder
+    model.export(str(out_dir / "model.onnx"))
+
+    with open(out_dir / "vocab.json", "w", encoding="utf-8") as f:
+        json.dump(list(decoder.vocabulary), f, ensure_ascii=False)
+    preprocessor = {key: model.cfg.preprocessor.get(key, value) for key, value in DEFAULT_PREPROCESSOR.items()}
+    with open(out_dir / "preprocessor.json", "w", encoding="utf-8") as f:
+        json.dump(preprocessor, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(out_dir / "model.onnx"), str(out_dir / "model.int8.onnx"), weight_type=QuantType.QInt8)
+    print(f"❕ Exported {model_path} to {out_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a NeMo CTC model for the onnx ASR backend.")
+    parser.add_argument("--model", type=str, required=True, help="Path to local .nemo model or Hugging Face model name")
+    parser.add_argument("--out_dir", type=str, required=True, help="Directory to write the ONNX model to.")
+    parser.add_argument("--no_quantize", action="store_true", help="Skip the int8 copy.")
+    args = parser.parse_args()
+    export(args.model, args.out_dir, quantize=not args.no_quantize)
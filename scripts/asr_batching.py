@@ -0,0 +1,60 @@
+SAMPLE_RATE = 16000
+
+
+class BatchedTranscriber:
+    """
+    Transcribe fixed-size audio windows from one or many videos in batches.
+
+    Windows are cut exactly like the sequential loop used to (30 s windows,
+    tails shorter than `min_samples` dropped). On flush they are sorted by
+    length so each batch needs as little padding as possible, sent to the
+    model `batch_size` at a time, and the texts are put back in window order
+    for every video.
+
+    Attributes:
+        model: An ASR model with NeMo's `transcribe(audio, batch_size, verbose)` API.
+        batch_size (int): Number of windows per model call.
+        chunk_size (int): Window length in samples.
+        min_samples (int): Windows shorter than this are skipped.
+    """
+
+    def __init__(self, model, batch_size=8, chunk_size=30 * SAMPLE_RATE, min_samples=512):
+        self.model = model
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.min_samples = min_samples
+        self.windows = []  # (key, window index, samples)
+        self.counts = {}
+
+    def add(self, key, waveform):
+        """Queue the windows of one waveform under `key`."""
+        count = self.counts.setdefault(key, 0)
+        for start in range(0, len(waveform), self.chunk_size):
+            end = min(len(waveform), start + self.chunk_size)
+            if end - start < self.min_samples:
+                continue
+            self.windows.append((key, count, waveform[start:end]))
+            count += 1
+        self.counts[key] = count
+
+    @property
+    def pending_samples(self):
+        return sum(len(w) for _, _, w in self.windows)
+
+    def flush(self):
+        """
+        Transcribe every queued window.
+
+        Returns:
+            dict: key -> list of window transcriptions in time order.
+        """
+        windows = sorted(self.windows, key=lambda w: len(w[2]), reverse=True)
+        results = {key: [None] * count for key, count in self.counts.items()}
+        for i in range(0, len(windows), self.batch_size):
+            batch = windows[i:i + self.batch_size]
+            hypotheses = self.model.transcribe([w for _, _, w in batch], batch_size=len(batch), verbose=False)
+            for (key, idx, _), hypothesis in zip(batch, hypotheses):
+                results[key][idx] = hypothesis.text if hasattr(hypothesis, "text") else hypothesis
+        self.windows = []
+        self.counts = {}
+        return results
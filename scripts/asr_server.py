@@ -0,0 +1,252 @@
+import argparse
+import http.client
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import numpy as np
+from scripts.asr_backends import BACKENDS, Hypothesis
+
+DEFAULT_PORT = 8765
+
+
+def encode_windows(windows):
+    """Serialize audio windows as one float32 body plus the window lengths."""
+    windows = [np.asarray(w, dtype=np.float32) for w in windows]
+    lengths = ",".join(str(len(w)) for w in windows)
+    return lengths, b"".join(w.tobytes() for w in windows)
+
+
+def decode_windows(lengths, body):
+    samples = np.frombuffer(body, dtype=np.float32)
+    sizes = [int(n) for n in lengths.split(",")] if lengths else []
+    if sum(sizes) != len(samples):
+        raise ValueError(f"window lengths add up to {sum(sizes)} samples, body has {len(samples)}")
+    return np.split(samples, np.cumsum(sizes)[:-1]) if sizes else []
+
+
+class _Job:
+    def __init__(self, windows):
+        self.windows = windows
+        self.texts = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ASRServer:
+    """
+    One resident ASR model shared by every pipeline process on the machine.
+
+    Importing NeMo and restoring a model takes longer than processing dozens
+    of videos, and every shard used to hold its own copy in RAM. The server
+    loads the model once and answers `POST /transcribe` requests from any
+    number of local clients (see RemoteASRModel). A single model thread
+    gathers the windows of all waiting requests, waiting up to `max_wait`
+    seconds for a batch to fill, sorts them by length and runs them
+    `batch_size` at a time. `GET /status` reports the queue depth.
+
+    Attributes:
+        model: An ASR model with NeMo's `transcribe(audio, batch_size, verbose)` API.
+        batch_size (int): Windows per model call.
+        max_wait (float): Seconds to wait for more requests before running a partial batch.
+        windows_done (int): Windows transcribed so far.
+        batches_done (int): Model calls made so far.
+    """
+
+    def __init__(self, model, batch_size=16, max_wait=0.05):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.jobs = queue.Queue()
+        self.windows_done = 0
+        self.batches_done = 0
+        self.started = time.time()
+        self.thread = threading.Thread(target=self._run, name="asr-model", daemon=True)
+        self.thread.start()
+
+    def submit(self, windows):
+        """Queue windows for transcription and wait for their texts."""
+        job = _Job(windows)
+        self.jobs.put(job)
+        job.done.wait()
+        if job.error:
+            raise job.error
+        return job.texts
+
+    def status(self):
+        return {
+            "queue_depth": self.jobs.qsize(),
+            "windows_done": self.windows_done,
+            "batches_done": self.batches_done,
+            "uptime_seconds": round(time.time() - self.started, 1),
+        }
+
+    def _gather(self):
+        jobs = [self.jobs.get()]
+        pending = len(jobs[0].windows)
+        deadline = time.monotonic() + self.max_wait
+        while pending < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                job = self.jobs.get(timeout=timeout)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            pending += len(job.windows)
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._gather()
+            windows = [(j, i, w) for j, job in enumerate(jobs) for i, w in enumerate(job.windows)]
+            windows.sort(key=lambda w: len(w[2]), reverse=True)
+            for job in jobs:
+                job.texts = [None] * len(job.windows)
+            try:
+                for start in range(0, len(windows), self.batch_size):
+                    batch = windows[start:start + self.batch_size]
+                    hypotheses = self.model.transcribe([w for _, _, w in batch], batch_size=len(batch), verbose=False)
+                    for (j, i, _), hypothesis in zip(batch, hypotheses):
+                        jobs[j].texts[i] = hypothesis.text if hasattr(hypothesis, "text") else hypothesis
+                    self.batches_done += 1
+                    self.windows_done += len(batch)
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+            for job in jobs:
+                job.done.set()
+
+
+def make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/status":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, server.status())
+
+        def do_POST(self):
+            if self.path != "/transcribe":
+                return self._reply(404, {"error": "not found"})
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                windows = decode_windows(self.headers.get("X-Window-Samples", ""), body)
+            except ValueError as e:
+                return self._reply(400, {"error": str(e)})
+            try:
+                texts = server.submit(windows) if windows else []
+            except Exception as e:
+                return self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+            self._reply(200, {"texts": texts})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class RemoteASRModel:
+    """
+    Client for an ASRServer with the `transcribe(audio, batch_size, verbose)` API of a NeMo model.
+
+    Pass it wherever the pipeline expects a model. Each thread keeps its own
+    keep-alive connection to the server.
+
+    Attributes:
+        url (str): Base URL of the server, e.g. http://127.0.0.1:8765.
+        timeout (float): Seconds to wait for a response.
+    """
+
+    def __init__(self, url, timeout=600):
+        self.url = url
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or DEFAULT_PORT
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _request(self, method, path, body=None, headers=None):
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            if conn is None:
+                conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"ASR server error {response.status}: {payload.get('error')}")
+        return payload
+
+    def transcribe(self, audio, batch_size=None, verbose=False):
+        lengths, body = encode_windows(audio)
+        payload = self._request("POST", "/transcribe", body=body, headers={
+            "Content-Type": "application/octet-stream", "X-Window-Samples": lengths,
+        })
+        return [Hypothesis(text) for text in payload["texts"]]
+
+    def status(self):
+        return self._request("GET", "/status")
+
+
+def serve(model, host="127.0.0.1", port=DEFAULT_PORT, batch_size=16, max_wait=0.05):
+    """Run an ASRServer for `model` until interrupted."""
+    server = ASRServer(model, batch_size=batch_size, max_wait=max_wait)
+    httpd = ThreadingHTTPServer((host, port), make_handler(server))
+    httpd.daemon_threads = True
+    print(f"❕ ASR server listening on http://{host}:{httpd.server_port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep one ASR model loaded and serve transcription requests from local pipeline processes.")
+    parser.add_argument("--model", type=str, help="Path to local .nemo model or Hugging Face model name")
+    parser.add_argument("--asr_backend", type=str, choices=BACKENDS, default="nemo", help="Backend that runs --model (see scripts.asr_backends).")
+    parser.add_argument("--asr_threads", type=int, default=None, help="CPU threads for the onnx backend.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on; keep it local.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch_size", type=int, default=16, help="Windows per model call, across all clients.")
+    parser.add_argument("--max_wait_ms", type=float, default=50, help="How long to wait for more requests before running a partial batch.")
+    parser.add_argument("--status", type=str, default=None, help="Print the status of the server at this URL and exit.")
+    args = parser.parse_args()
+
+    if args.status:
+        print(json.dumps(RemoteASRModel(args.status).status()))
+        return
+    if not args.model:
+        parser.error("--model is required to start a server.")
+
+    from scripts.retrieve_subtitled_videos import load_model
+
+    model = load_model(args.model, backend=args.asr_backend, threads=args.asr_threads)
+    serve(model, host=args.host, port=args.port, batch_size=args.batch_size, max_wait=args.max_wait_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from functools import lru_cache
+from scripts.audio_stream import SAMPLE_RATE, decode_audio
+
+# Opus/AAC at this bitrate is transparent for 16 kHz mono ASR
+MIN_ASR_ABR = 48
+
+
+def audio_only_formats(formats):
+    return [f for f in formats if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none") and f.get("url")]
+
+
+def estimated_size(fmt, duration=None):
+    """Bytes a format will take: the reported size, else bitrate x duration, else bitrate alone for ranking."""
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if size:
+        return size
+    abr = fmt.get("abr") or fmt.get("tbr") or 0
+    return abr * 125 * (duration or 1)
+
+
+def select_audio_format(formats, min_abr=MIN_ASR_ABR, duration=None):
+    """
+    Pick the smallest audio-only format that is still good enough for 16 kHz ASR.
+
+    A format qualifies if its bitrate is at least `min_abr` kbps and its sample
+    rate (when known) is at least 16 kHz. If nothing qualifies, the audio-only
+    format with the highest bitrate is used instead.
+
+    Args:
+        formats (list): yt-dlp format dicts.
+        min_abr (float): Lowest acceptable audio bitrate in kbps.
+        duration (float): Video duration, used to estimate sizes that are not reported.
+
+    Returns:
+        dict: The chosen format, or None if there is no audio-only format.
+    """
+    candidates = audio_only_formats(formats)
+    if not candidates:
+        return None
+    adequate = [
+        f for f in candidates
+        if (f.get("abr") or f.get("tbr") or 0) >= min_abr and (f.get("asr") or SAMPLE_RATE) >= SAMPLE_RATE
+    ]
+    if adequate:
+        return min(adequate, key=lambda f: (estimated_size(f, duration), f.get("abr") or f.get("tbr") or 0))
+    return max(candidates, key=lambda f: f.get("abr") or f.get("tbr") or 0)
+
+
+@lru_cache(maxsize=None)
+def smallest_audio_selector(min_abr=MIN_ASR_ABR):
+    """
+    yt-dlp `format` callable that downloads the format picked by select_audio_format.
+
+    The same callable is returned for the same `min_abr`, so pooled clients
+    built with it are reused.
+    """
+    def selector(ctx):
+        fmt = select_audio_format(ctx["formats"], min_abr)
+        if fmt is None:
+            # No audio-only formats: fall back to the best combined one, like 'bestaudio/best'
+            fmt = ctx["formats"][-1]
+        yield fmt
+    return selector
+
+
+def merge_spans(spans, max_gap=2.0):
+    """
+    Merge (start, end) spans that are less than `max_gap` seconds apart.
+
+    Returns:
+        list: (start, end, span indices) ranges in time order.
+    """
+    ranges = []
+    for idx in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+        start, end = spans[idx]
+        if ranges and start - ranges[-1][1] < max_gap:
+            ranges[-1][1] = max(ranges[-1][1], end)
+            ranges[-1][2].append(idx)
+        else:
+            ranges.append([start, end, [idx]])
+    return [tuple(r) for r in ranges]
+
+
+class LocalAudio:
+    """A downloaded audio file, decoded once on first use and sliced in memory."""
+
+    def __init__(self, file_path, sample_rate=SAMPLE_RATE):
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.waveform = None
+
+    def read(self, start, end):
+        if self.waveform is None:
+            self.waveform = decode_audio(self.file_path, sample_rate=self.sample_rate)
+        return self.waveform[int(start * self.sample_rate):int(end * self.sample_rate)]
+
+
+class RemoteAudio:
+    """
+    An audio stream that is never downloaded in full.
+
+    Every read decodes one time range straight from the media URL; ffmpeg
+    seeks with HTTP Range requests, so only the bytes around that range are
+    transferred.
+
+    Attributes:
+        url (str): Direct media URL of the chosen format.
+        http_headers (dict): Headers yt-dlp requires for the URL.
+        seconds_fetched (float): Total audio fetched so far.
+    """
+
+    def __init__(self, url, http_headers=None, sample_rate=SAMPLE_RATE):
+        self.url = url
+        self.http_headers = http_headers
+        self.sample_rate = sample_rate
+        self.seconds_fetched = 0.0
+
+    def read(self, start, end):
+        self.seconds_fetched += end - start
+        return decode_audio(self.url, sample_rate=self.sample_rate, start=start, duration=end - start,
+                            http_headers=self.http_headers)
+
+
+def open_audio(audio):
+    """Wrap a downloaded file path in LocalAudio; audio sources are returned as they are."""
+    return audio if hasattr(audio, "read") else LocalAudio(audio)
+
+
+def read_spans(source, spans, max_gap=2.0):
+    """
+    Read the samples of every (start, end) span from an audio source.
+
+    Nearby spans are merged into one read, so a remote source makes one request
+    per group of cues instead of one per cue.
+
+    Returns:
+        list: One float32 array per span, in the order of `spans`.
+    """
+    samples = [None] * len(spans)
+    rate = getattr(source, "sample_rate", SAMPLE_RATE)
+    for start, end, indices in merge_spans(spans, max_gap):
+        waveform = source.read(start, end)
+        for idx in indices:
+            span_start, span_end = spans[idx]
+            samples[idx] = waveform[int((span_start - start) * rate):int((span_end - start) * rate)]
+    return samples
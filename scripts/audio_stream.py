@@ -0,0 +1,100 @@
+import shutil
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def ffmpeg_command(file_path, sample_rate=SAMPLE_RATE, ffmpeg="ffmpeg", start=None, duration=None, http_headers=None):
+    """
+    ffmpeg call that decodes any container to mono float32 PCM at `sample_rate` on stdout.
+
+    `file_path` may also be an HTTP URL. With `start`/`duration` only that time
+    range is decoded; on a URL ffmpeg seeks with Range requests, so only the
+    bytes around the range are transferred.
+    """
+    command = [ffmpeg, "-nostdin", "-loglevel", "error"]
+    if http_headers:
+        command += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in http_headers.items())]
+    if start:
+        command += ["-ss", f"{start:.3f}"]
+    if duration is not None:
+        command += ["-t", f"{duration:.3f}"]
+    return command + ["-i", str(file_path), "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "-"]
+
+
+def _read_frame(stream, frame_bytes):
+    buf = bytearray(frame_bytes)
+    view = memoryview(buf)
+    filled = 0
+    while filled < frame_bytes:
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    # Drop a trailing partial sample, if any
+    filled -= filled % 4
+    return buf[:filled] if filled < frame_bytes else buf
+
+
+def stream_audio(file_path, frame_size=30 * SAMPLE_RATE, sample_rate=SAMPLE_RATE, ffmpeg="ffmpeg", start=None, duration=None, http_headers=None):
+    """
+    Decode and resample an audio file incrementally, yielding float32 frames.
+
+    ffmpeg decodes in its own process and writes mono PCM at `sample_rate` to
+    a pipe, which is read one frame at a time. Only one frame is held in
+    memory, however long the video is, and the caller can start transcribing
+    the first frame while ffmpeg is still decoding the rest. Closing the
+    generator early stops ffmpeg.
+
+    If ffmpeg is not installed, the whole file is loaded with librosa and
+    then cut into frames, which gives the same frames without the memory
+    savings.
+
+    Args:
+        file_path (str): Audio or video file in any format ffmpeg can read.
+        frame_size (int): Samples per frame; the last frame may be shorter.
+        sample_rate (int): Output sample rate.
+        ffmpeg (str): Name or path of the ffmpeg executable.
+        start (float): Offset in seconds to start decoding from.
+        duration (float): Seconds to decode; the rest of the file if None.
+        http_headers (dict): Headers for an HTTP `file_path`.
+
+    Yields:
+        numpy.ndarray: float32 frames of `frame_size` samples.
+    """
+    if shutil.which(ffmpeg) is None:
+        import librosa
+
+        waveform, _ = librosa.load(file_path, sr=sample_rate, mono=True, offset=start or 0.0, duration=duration)
+        waveform = waveform.astype("float32")
+        for start in range(0, len(waveform), frame_size):
+            yield waveform[start:start + frame_size]
+        return
+
+    command = ffmpeg_command(file_path, sample_rate, ffmpeg, start=start, duration=duration, http_headers=http_headers)
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = _read_frame(proc.stdout, frame_size * 4)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype="<f4")
+            if len(data) < frame_size * 4:
+                break
+        returncode = proc.wait()
+        if returncode != 0:
+            error = proc.stderr.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode {file_path}: {error}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def decode_audio(file_path, sample_rate=SAMPLE_RATE, **kwargs):
+    """Decode a whole file (or one time range of it, see stream_audio) into a single float32 array."""
+    frames = list(stream_audio(file_path, sample_rate=sample_rate, **kwargs))
+    return np.concatenate(frames) if frames else np.zeros(0, dtype="float32")
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import re
+import requests
+from pathlib import Path
+from tqdm import tqdm
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB chunks
+HASH_ALGORITHMS = {32: "md5", 40: "sha1", 64: "sha256"}
+
+
+class ChecksumMismatchError(Exception):
+    pass
+
+
+def load_meta(fn_meta):
+    if fn_meta.exists():
+        with open(fn_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_meta(fn_meta, meta):
+    tmp = fn_meta.with_name(fn_meta.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, fn_meta)
+
+
+def validators(response):
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def fetch_published_checksum(checksum_url, filename, session=None):
+    """
+    Look up the checksum of `filename` in a Wikimedia style `<hash>  <name>` list.
+
+    Dump lists name files with their date (enwiki-20240601-...) while the
+    `latest` directory uses `latest` instead, so both spellings are matched.
+    Returns None if the list is unavailable or does not mention the file.
+    """
+    try:
+        response = (session or requests).get(checksum_url, timeout=60)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"❕ Could not fetch checksums from {checksum_url}: {e}")
+        return None
+
+    for line in response.text.splitlines():
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        digest, name = parts
+        if name == filename or re.sub(r"-\d{8}-", "-latest-", name) == filename:
+            return digest.lower()
+    return None
+
+
+def file_digest(fn, algorithm):
+    h = hashlib.new(algorithm)
+    with open(fn, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def verify_checksum(fn, expected):
+    if expected is None:
+        return True
+    algorithm = HASH_ALGORITHMS.get(len(expected))
+    if algorithm is None:
+        print(f"❕ Unknown checksum format {expected}, skipping verification.")
+        return True
+    return file_digest(fn, algorithm) == expected
+
+
+def fetch_dump(url, fn, checksum_url=None, retries=5, session=None):
+    """
+    Download `url` to `fn`, resuming partial transfers and skipping unchanged files.
+
+    Data is written to `<fn>.part` and only moved to `fn` once it is complete
+    and matches the published checksum, so an existing `fn` is always a full
+    download. The ETag/Last-Modified of the completed file is kept in
+    `<fn>.meta.json` and sent back as a conditional request, so an unchanged
+    dump is never downloaded twice. An interrupted transfer is resumed with an
+    HTTP Range request guarded by If-Range.
+
+    Args:
+        url (str): URL of the file to download.
+        fn (str or Path): Destination path.
+        checksum_url (str): Optional URL of a checksum list to verify against.
+        retries (int): Number of times a dropped connection is resumed.
+        session (requests.Session): Optional session to reuse connections.
+
+    Returns:
+        Path: The destination path.
+
+    Raises:
+        ChecksumMismatchError: If the download does not match the published checksum.
+    """
+    fn = Path(fn)
+    fn.parent.mkdir(parents=True, exist_ok=True)
+    fn_part = fn.with_name(fn.name + ".part")
+    fn_meta = fn.with_name(fn.name + ".meta.json")
+    fn_part_meta = fn.with_name(fn.name + ".part.json")
+    session = session or requests.Session()
+
+    meta = load_meta(fn_meta) if fn.exists() else {}
+    if fn.exists() and not meta and checksum_url:
+        # Downloaded before validators were recorded: adopt it if it is intact.
+        expected = fetch_published_checksum(checksum_url, fn.name, session=session)
+        if expected and verify_checksum(fn, expected):
+            save_meta(fn_meta, validators(session.head(url, allow_redirects=True, timeout=60)))
+            return fn
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    for attempt in range(retries + 1):
+        part_meta = load_meta(fn_part_meta) if fn_part.exists() else {}
+        offset = fn_part.stat().st_size if part_meta else 0
+        request_headers = dict(headers)
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            if_range = part_meta.get("etag") or part_meta.get("last_modified")
+            if if_range:
+                request_headers["If-Range"] = if_range
+
+        try:
+            with session.get(url, headers=request_headers, stream=True, timeout=60) as response:
+                if response.status_code == 304:
+                    print(f"❕ {fn.name} is up to date, skipping download.")
+                    return fn
+                if response.status_code == 416 and offset:
+                    # The partial file already holds the whole body.
+                    break
+                response.raise_for_status()
+
+                if response.status_code == 206:
+                    mode = "ab"
+                    total_size = offset + int(response.headers.get("content-length", 0))
+                else:
+                    # Server ignored the range or the file changed: start over.
+                    mode = "wb"
+                    offset = 0
+                    total_size = int(response.headers.get("content-length", 0))
+                    save_meta(fn_part_meta, validators(response))
+
+                with open(fn_part, mode) as f, tqdm(
+                    total=total_size, initial=offset, unit='B', unit_scale=True, desc="Downloading"
+                ) as pbar:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:  # filter out keep-alive new chunks
+                            f.write(chunk)
+                            pbar.update(len(chunk))
+
+                if total_size and fn_part.stat().st_size < total_size:
+                    raise requests.ConnectionError("connection closed before the download completed")
+                break
+        # A read stall raises Timeout (ReadTimeout), which is not a ConnectionError
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if attempt == retries:
+                raise
+            print(f"❕ Download interrupted ({e}), resuming...")
+
+    if checksum_url:
+        expected = fetch_published_checksum(checksum_url, fn.name, session=session)
+        if not verify_checksum(fn_part, expected):
+            fn_part.unlink()
+            fn_part_meta.unlink(missing_ok=True)
+            raise ChecksumMismatchError(f"{url} does not match the published checksum {expected}")
+
+    part_meta = load_meta(fn_part_meta)
+    os.replace(fn_part, fn)
+    save_meta(fn_meta, part_meta)
+    fn_part_meta.unlink(missing_ok=True)
+    return fn
@@ -0,0 +1,108 @@
+import math
+import random
+
+
+def group_cues(cues, max_seconds=30.0):
+    """Group consecutive (start, end, text) cues into windows spanning at most `max_seconds`."""
+    windows = []
+    current = []
+    for idx, (start, end, _) in enumerate(cues):
+        if current and end - cues[current[0]][0] > max_seconds:
+            windows.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        windows.append(current)
+    return windows
+
+
+class RatioEstimate:
+    """
+    Running estimate of an error rate (total errors / total reference length)
+    from a random sample of windows, with a normal-approximation confidence
+    interval that includes the finite population correction. Once every
+    window has been sampled the interval collapses to the exact value.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.lengths = []
+
+    def add(self, errors, length):
+        self.errors.append(errors)
+        self.lengths.append(length)
+
+    def bounds(self, population, z=1.96):
+        """Return (estimate, lower bound, upper bound)."""
+        k = len(self.errors)
+        total_length = sum(self.lengths)
+        if total_length == 0:
+            return 0.0, 0.0, math.inf
+        rate = sum(self.errors) / total_length
+        if k >= population:
+            return rate, rate, rate
+        if k < 2:
+            return rate, 0.0, math.inf
+        mean_length = total_length / k
+        residual_var = sum((e - rate * n) ** 2 for e, n in zip(self.errors, self.lengths)) / (k - 1)
+        var = (1 - k / population) * residual_var / (k * mean_length ** 2)
+        margin = z * math.sqrt(var)
+        return rate, max(rate - margin, 0.0), rate + margin
+
+
+def sequential_verify(num_windows, score_windows, min_wer, min_cer, z=1.96, min_windows=4, step=4, seed=0):
+    """
+    Decide whether a video passes `wer < min_wer and cer < min_cer` from as few windows as possible.
+
+    Windows are decoded in a random order, `step` at a time. After every step
+    the WER and CER confidence intervals are compared with the thresholds:
+    the video is rejected as soon as either lower bound reaches its
+    threshold, and accepted as soon as both upper bounds are below. Only an
+    ambiguous result makes it decode more windows; in the worst case every
+    window is decoded and the decision is exact.
+
+    Args:
+        num_windows (int): Number of windows in the video.
+        score_windows (callable): Takes a list of window indices and returns one
+            (word_errors, ref_words, char_errors, ref_chars) tuple per window.
+        min_wer (float): Maximum word error rate.
+        min_cer (float): Maximum character error rate.
+        z (float): Width of the confidence interval in standard deviations.
+        min_windows (int): Windows decoded before the first decision.
+        step (int): Windows decoded per following round.
+        seed (int): Seed of the window order.
+
+    Returns:
+        dict: `accepted`, `early` (decided before decoding everything), `wer`,
+        `cer`, `windows_decoded` and `windows_total`.
+    """
+    order = list(range(num_windows))
+    random.Random(seed).shuffle(order)
+    wer_estimate, cer_estimate = RatioEstimate(), RatioEstimate()
+
+    decoded = 0
+    accepted = False
+    while decoded < num_windows:
+        batch = order[decoded:decoded + (min_windows if decoded == 0 else step)]
+        for word_errors, ref_words, char_errors, ref_chars in score_windows(batch):
+            wer_estimate.add(word_errors, ref_words)
+            cer_estimate.add(char_errors, ref_chars)
+        decoded += len(batch)
+
+        wer, wer_low, wer_high = wer_estimate.bounds(num_windows, z)
+        cer, cer_low, cer_high = cer_estimate.bounds(num_windows, z)
+        if wer_low >= min_wer or cer_low >= min_cer:
+            accepted = False
+            break
+        if wer_high < min_wer and cer_high < min_cer:
+            accepted = True
+            break
+
+    return {
+        "accepted": accepted,
+        "early": decoded < num_windows,
+        "wer": wer_estimate.bounds(num_windows, z)[0] if decoded else "",
+        "cer": cer_estimate.bounds(num_windows, z)[0] if decoded else "",
+        "windows_decoded": decoded,
+        "windows_total": num_windows,
+    }
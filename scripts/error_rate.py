@@ -0,0 +1,131 @@
+import math
+import re
+
+try:
+    from rapidfuzz.distance import Levenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+MULTIPLE_SPACES_RE = re.compile(r"\s\s+")
+
+
+def words_of(text):
+    """Word tokens exactly as jiwer's default WER transform produces them."""
+    return [w for w in MULTIPLE_SPACES_RE.sub(" ", text).strip().split(" ") if w]
+
+
+def chars_of(text):
+    """Character tokens exactly as jiwer's default CER transform produces them (spaces included)."""
+    return list(text.strip())
+
+
+def _bit_parallel_distance(a, b, max_distance=None):
+    """
+    Levenshtein distance of two sequences with Hyyrö's bit-parallel algorithm.
+
+    One column of the DP matrix is held as bit vectors in Python integers, so
+    memory is O(len(a)) bits and every element of `b` costs a handful of big
+    integer operations. The score at the bottom of the column can drop by at
+    most one per remaining element of `b`; once even that cannot bring it
+    back to `max_distance`, the computation stops.
+    """
+    # A shared prefix and suffix never add to the distance
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    a, b = a[prefix:], b[prefix:]
+    suffix = 0
+    while suffix < len(a) and suffix < len(b) and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    if suffix:
+        a, b = a[:-suffix], b[:-suffix]
+    m, n = len(a), len(b)
+    if m == 0:
+        return n
+    peq = {}
+    for i, token in enumerate(a):
+        peq[token] = peq.get(token, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for j, token in enumerate(b):
+        eq = peq.get(token, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+    return score
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Levenshtein distance between two token sequences.
+
+    With `max_distance`, the result is exact when it is at most
+    `max_distance`, and `max_distance + 1` as soon as the distance is known to
+    be larger. Uses rapidfuzz (installed with jiwer) when available, else a
+    pure Python bit-parallel implementation.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if RAPIDFUZZ_AVAILABLE:
+        return Levenshtein.distance(a, b, score_cutoff=max_distance)
+    return _bit_parallel_distance(a, b, max_distance)
+
+
+def max_errors_below(rate, length):
+    """Largest number of errors `e` with `e / length < rate`."""
+    k = math.ceil(rate * length) - 1
+    # Guard against float rounding at the boundary
+    while (k + 1) / length < rate:
+        k += 1
+    while k >= 0 and k / length >= rate:
+        k -= 1
+    return k
+
+
+def bounded_error_rate(reference, hypothesis, max_rate=None):
+    """
+    Error rate of token sequences, computed only as far as `max_rate` requires.
+
+    Args:
+        reference (list): Reference tokens (words or characters); must not be empty.
+        hypothesis (list): Hypothesis tokens.
+        max_rate (float): Rates at or above this are not computed exactly; None for the exact rate.
+
+    Returns:
+        tuple: (rate, exact). When the rate is below `max_rate` it is exact and
+        equal to jiwer's. Otherwise `exact` is False and `rate` is a lower bound
+        that is at least `max_rate`.
+    """
+    if not reference:
+        raise ValueError("one or more references are empty strings")
+    n = len(reference)
+    if max_rate is None:
+        return edit_distance(reference, hypothesis) / n, True
+    k = max_errors_below(max_rate, n)
+    if k < 0:
+        return max(abs(n - len(hypothesis)) / n, max_rate), False
+    distance = edit_distance(reference, hypothesis, max_distance=k)
+    return distance / n, distance <= k
+
+
+def fast_wer(reference, hypothesis, max_wer=None):
+    """Word error rate of two strings, like jiwer.wer; see bounded_error_rate for `max_wer`."""
+    return bounded_error_rate(words_of(reference), words_of(hypothesis), max_wer)
+
+
+def fast_cer(reference, hypothesis, max_cer=None):
+    """Character error rate of two strings, like jiwer.cer; see bounded_error_rate for `max_cer`."""
+    return bounded_error_rate(chars_of(reference), chars_of(hypothesis), max_cer)
@@ -0,0 +1,172 @@
+import multiprocessing
+import random
+import time
+
+BOT_MESSAGES = ("Sign in to confirm you’re not a bot", "Sign in to confirm you're not a bot")
+THROTTLE_MESSAGES = ("HTTP Error 429", "429 Client Error", "Too Many Requests")
+
+# Slots of the shared state array
+TOKENS, UPDATED, RATE, PAUSED_UNTIL, COOLING_UNTIL, THROTTLES, TRIPS, SUCCESSES, OPEN, REQUESTS, THROTTLED, BOTS = range(12)
+
+
+class CircuitOpenError(Exception):
+    """YouTube kept blocking requests after every cooldown; stop, save progress and try again later."""
+
+
+def classify(error):
+    """'bot', 'throttle' or 'error' for an exception raised by a YouTube request."""
+    message = str(error)
+    if any(m in message for m in BOT_MESSAGES):
+        return "bot"
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429 or any(m in message for m in THROTTLE_MESSAGES):
+        return "throttle"
+    return "error"
+
+
+class RequestGovernor:
+    """
+    Request pacing shared by every worker thread and process of a run.
+
+    Every YouTube request goes through `call`. A token bucket limits the
+    request rate, and the rate adapts AIMD-style: it grows by `increase`
+    requests/s per second's worth of successful requests and is multiplied
+    by `decrease` on every throttle (HTTP 429). A throttle also pauses all
+    workers with exponential backoff and jitter. A bot check ("Sign in to
+    confirm you're not a bot"), or `trip_after` throttles in a row, trips the
+    circuit breaker: all workers pause for `cooldown` seconds (doubling with
+    each trip) and restart at `min_rate`. After `max_trips` trips without
+    recovering, `call` raises CircuitOpenError so the scripts can save their
+    progress and stop instead of losing the session. Failed requests are
+    retried after the pause, so throttled videos are not recorded as missing.
+
+    The state lives in a multiprocessing Array, so a governor passed to pool
+    workers through their initializer paces all of them together.
+
+    Attributes:
+        min_rate (float): Lowest request rate in requests/s.
+        max_rate (float): Highest request rate in requests/s.
+        burst (float): Token bucket capacity.
+        max_trips (int): Breaker trips tolerated before giving up.
+    """
+
+    def __init__(self, rate=5.0, min_rate=0.2, max_rate=20.0, burst=None, increase=0.05, decrease=0.5,
+                 backoff_base=2.0, backoff_max=120.0, trip_after=5, cooldown=600.0, max_trips=3,
+                 recover_after=50, clock=time.monotonic, sleep=time.sleep):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.trip_after = trip_after
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.recover_after = recover_after
+        self.clock = clock
+        self.sleep = sleep
+        self.state = multiprocessing.Array("d", 12)
+        self.state[TOKENS] = self.burst
+        self.state[UPDATED] = clock()
+        self.state[RATE] = min(max(rate, min_rate), max_rate)
+
+    @property
+    def rate(self):
+        return self.state[RATE]
+
+    def acquire(self):
+        """Wait for a request slot; raises CircuitOpenError once the breaker has given up."""
+        while True:
+            with self.state.get_lock():
+                s = self.state
+                if s[OPEN]:
+                    raise CircuitOpenError(f"circuit breaker open after {int(s[TRIPS])} trips")
+                now = self.clock()
+                if now < s[PAUSED_UNTIL]:
+                    wait = s[PAUSED_UNTIL] - now
+                else:
+                    s[TOKENS] = min(self.burst, s[TOKENS] + (now - max(s[UPDATED], s[PAUSED_UNTIL])) * s[RATE])
+                    s[UPDATED] = now
+                    # Tolerance: a refill of exactly the missing fraction can round to just below 1
+                    if s[TOKENS] >= 1 - 1e-9:
+                        s[TOKENS] = max(0.0, s[TOKENS] - 1)
+                        s[REQUESTS] += 1
+                        return
+                    wait = (1 - s[TOKENS]) / s[RATE]
+            # Wake up at least every second so an opened breaker is noticed
+            self.sleep(min(wait, 1.0))
+
+    def record(self, outcome):
+        """Adapt to the outcome of a request: 'ok', 'throttle', 'bot' or 'error' (no signal)."""
+        with self.state.get_lock():
+            s = self.state
+            now = self.clock()
+            if outcome == "ok":
+                s[THROTTLES] = 0
+                s[RATE] = min(self.max_rate, s[RATE] + self.increase / s[RATE])
+                s[SUCCESSES] += 1
+                if s[SUCCESSES] >= self.recover_after:
+                    s[TRIPS] = 0
+            elif outcome == "throttle":
+                s[THROTTLED] += 1
+                if now < s[PAUSED_UNTIL]:
+                    # Requests already in flight when the pause began; one signal is enough
+                    return
+                s[THROTTLES] += 1
+                s[SUCCESSES] = 0
+                s[RATE] = max(self.min_rate, s[RATE] * self.decrease)
+                if s[THROTTLES] >= self.trip_after:
+                    self._trip(now)
+                else:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (s[THROTTLES] - 1))
+                    s[PAUSED_UNTIL] = max(s[PAUSED_UNTIL], now + delay / 2 + random.uniform(0, delay / 2))
+                    s[TOKENS] = 0
+            elif outcome == "bot":
+                s[BOTS] += 1
+                s[SUCCESSES] = 0
+                if now >= s[COOLING_UNTIL]:
+                    self._trip(now)
+
+    def _trip(self, now):
+        s = self.state
+        s[TRIPS] += 1
+        s[THROTTLES] = 0
+        if s[TRIPS] > self.max_trips:
+            s[OPEN] = 1
+            return
+        pause = self.cooldown * 2 ** (s[TRIPS] - 1)
+        s[PAUSED_UNTIL] = s[COOLING_UNTIL] = max(s[PAUSED_UNTIL], now + pause * random.uniform(1.0, 1.2))
+        s[RATE] = self.min_rate
+        s[TOKENS] = 0
+        print(f"❌ YouTube is blocking requests; pausing all workers for {pause / 60:.0f} min (trip {int(s[TRIPS])}/{self.max_trips})")
+
+    def call(self, func, *args, **kwargs):
+        """
+        Run one request under the governor.
+
+        Throttled and bot-checked requests are retried once the pause is over,
+        until they succeed or the breaker gives up (CircuitOpenError). Other
+        errors are raised at once.
+        """
+        while True:
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                outcome = classify(e)
+                self.record(outcome)
+                if outcome == "error":
+                    raise
+                continue
+            self.record("ok")
+            return result
+
+    def wrap(self, func):
+        """`func` with every call going through the governor."""
+        return lambda *args, **kwargs: self.call(func, *args, **kwargs)
+
+    def report(self):
+        s = self.state
+        return (f"Requests: {int(s[REQUESTS])}, throttled {int(s[THROTTLED])}, bot checks {int(s[BOTS])}, "
+                f"final rate {s[RATE]:.2f}/s")
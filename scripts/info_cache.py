@@ -0,0 +1,168 @@
+import argparse
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from scripts.ydl_pool import YDL_POOL
+
+# Large parts of an info dict that no pipeline step reads again
+DROPPED_KEYS = ("formats", "thumbnails", "heatmap", "requested_formats", "requested_downloads", "requested_subtitles")
+
+
+def slim_info(info):
+    """Copy of a yt-dlp info dict without the bulky keys nobody reads back."""
+    return {key: value for key, value in info.items() if key not in DROPPED_KEYS}
+
+
+class InfoCache:
+    """
+    Persistent cache of yt-dlp info dicts keyed by video ID.
+
+    Extract calls are the slowest and most ban-prone requests of the
+    pipeline, and retrieve_metadata and retrieve_subtitled_videos make the same
+    ones. Both read through this cache, so a video is extracted once per
+    `ttl_seconds` no matter how many scripts, reruns or threshold sweeps look
+    at it. Info dicts are stored as zlib-compressed JSON in SQLite (WAL mode,
+    so worker processes on one machine can share the file). Once the cache
+    grows past `max_bytes` the least recently used entries are evicted.
+
+    Attributes:
+        path (Path): Location of the SQLite database.
+        ttl_seconds (float): Age after which an entry is fetched again.
+        max_bytes (int): Compressed size the cache is trimmed to.
+        hits (int): Lookups answered from the cache by this instance.
+        misses (int): Lookups that were missing or expired.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_bytes=2 * 1024 ** 3, evict_every=100):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        # One connection shared by the threads of the staged pipeline
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS info ("
+            "video_id TEXT PRIMARY KEY, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+            "size INTEGER NOT NULL, data BLOB NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS info_lru ON info (accessed_at)")
+        self.conn.commit()
+
+    def get(self, video_id):
+        """Return the cached info dict of a video, or None if it is missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT fetched_at, data FROM info WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None or now - row[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE info SET accessed_at = ? WHERE video_id = ?", (now, video_id))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[1]))
+
+    def put(self, video_id, info):
+        data = zlib.compress(json.dumps(slim_info(info), separators=(",", ":"), default=str).encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO info (video_id, fetched_at, accessed_at, size, data) VALUES (?, ?, ?, ?, ?)",
+                    (video_id, now, now, len(data), data),
+                )
+            self.puts += 1
+            if (self.puts - 1) % self.evict_every == 0:
+                self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM info").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so eviction does not run on every put
+        excess = total - int(self.max_bytes * 0.9)
+        with self.conn:
+            self.conn.execute("DELETE FROM info WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            for video_id, size in self.conn.execute("SELECT video_id, size FROM info ORDER BY accessed_at").fetchall():
+                if excess <= 0:
+                    break
+                self.conn.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+                excess -= size
+
+    def invalidate(self, video_id):
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return f"Info cache: {self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.1%})"
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def youtube_extract(ydl_opts, pool=None):
+    """Default extractor: a full yt-dlp extract_info call without downloading, on a pooled client."""
+    pool = pool or YDL_POOL
+
+    def extract(video_url):
+        with pool.client(ydl_opts) as ydl:
+            return ydl.extract_info(video_url, download=False)
+    return extract
+
+
+def cached_extract_info(video_id, extract, cache=None, refresh=False):
+    """
+    Info dict of a video, from the cache when possible.
+
+    Args:
+        video_id (str): YouTube video ID.
+        extract (callable): Takes a video URL and returns its info dict (see youtube_extract).
+        cache (InfoCache): Cache to read through, or None to always extract.
+        refresh (bool): Ignore a cached entry, e.g. after its caption URLs expired.
+
+    Returns:
+        tuple: (info, cached) where `cached` tells whether the cache answered.
+    """
+    if cache and not refresh:
+        info = cache.get(video_id)
+        if info is not None:
+            return info, True
+    info = extract(f"https://www.youtube.com/watch?v={video_id}")
+    if cache and info:
+        cache.put(video_id, info)
+    return info, False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show the size of an info-dict cache.')
+    parser.add_argument('cache', type=str, help='Path to the info cache.')
+    parser.add_argument('--ttl_hours', type=float, default=7 * 24, help='Entries older than this are counted as expired.')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.cache)
+    cutoff = time.time() - args.ttl_hours * 3600
+    count, size, expired = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(fetched_at < ?), 0) FROM info", (cutoff,)
+    ).fetchone()
+    print(f"{count} videos, {size / 1024 ** 2:.1f} MB compressed, {expired} expired")
@@ -0,0 +1,257 @@
+import argparse
+import csv
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    SQLite-backed work queue shared by any number of pipeline workers.
+
+    Items (video IDs or search words) are enqueued once per stage. Workers
+    claim batches under a time-limited lease; a lease that expires because its
+    worker died is handed to the next worker that asks for work, so no shard
+    is ever stranded and workers naturally balance the load. Every item keeps
+    its stage status and attempt count; after `max_attempts` failed leases it
+    is parked as failed.
+
+    The database uses SQLite's default rollback journal rather than WAL so it
+    can live on a shared filesystem and be drained from several machines.
+
+    Attributes:
+        path (Path): Location of the SQLite database.
+        max_attempts (int): Number of leases an item gets before it is marked failed.
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(str(self.path), timeout=120, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "stage TEXT NOT NULL, item_id TEXT NOT NULL, payload TEXT, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "worker TEXT, lease_expires REAL, error TEXT, updated_at REAL, "
+            "PRIMARY KEY (stage, item_id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (stage, status, lease_expires)")
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+    def enqueue(self, stage, items):
+        """
+        Add (item_id, payload) pairs to a stage. Items already queued are left untouched.
+
+        Returns:
+            int: Number of newly enqueued items.
+        """
+        now = time.time()
+        with self._transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (stage, item_id, payload, updated_at) VALUES (?, ?, ?, ?)",
+                ((stage, item_id, payload, now) for item_id, payload in items),
+            )
+            return self.conn.total_changes - before
+
+    def claim(self, stage, worker, batch_size=10, lease_seconds=600):
+        """
+        Lease up to `batch_size` pending or expired items of a stage to `worker`.
+
+        Returns:
+            list: (item_id, payload) pairs now owned by the worker.
+        """
+        now = time.time()
+        with self._transaction():
+            # Expired leases that used up their attempts are parked as failed.
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, error = 'lease expired', updated_at = ? "
+                "WHERE stage = ? AND status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, stage, LEASED, now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT item_id, payload FROM jobs WHERE stage = ? AND "
+                "(status = ? OR (status = ? AND lease_expires < ?)) LIMIT ?",
+                (stage, PENDING, LEASED, now, batch_size),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE stage = ? AND item_id = ?",
+                ((LEASED, worker, now + lease_seconds, now, stage, item_id) for item_id, _ in rows),
+            )
+        return rows
+
+    def renew(self, stage, worker, item_ids, lease_seconds=600):
+        """Extend the lease of items the worker still holds."""
+        now = time.time()
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE stage = ? AND item_id = ? AND worker = ? AND status = ?",
+                ((now + lease_seconds, now, stage, item_id, worker, LEASED) for item_id in item_ids),
+            )
+
+    def complete(self, stage, worker, item_ids):
+        """Mark items done. Items whose lease was taken over by another worker are left alone."""
+        now = time.time()
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE stage = ? AND item_id = ? AND worker = ? AND status = ?",
+                ((DONE, now, stage, item_id, worker, LEASED) for item_id in item_ids),
+            )
+
+    def fail(self, stage, worker, item_id, error=""):
+        """Return an item to the queue, or park it as failed once it has used up its attempts."""
+        now = time.time()
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE stage = ? AND item_id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, now, stage, item_id, worker, LEASED),
+            )
+
+    def status(self, stage=None):
+        """Count items per stage and status, with expired leases reported separately."""
+        now = time.time()
+        query = (
+            "SELECT stage, CASE WHEN status = ? AND lease_expires < ? THEN 'expired' ELSE status END AS s, "
+            "COUNT(*), SUM(attempts) FROM jobs"
+        )
+        params = [LEASED, now]
+        if stage:
+            query += " WHERE stage = ?"
+            params.append(stage)
+        query += " GROUP BY stage, s ORDER BY stage, s"
+        counts = {}
+        for stage_name, status, count, attempts in self.conn.execute(query, params):
+            counts.setdefault(stage_name, {})[status] = (count, attempts)
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LeaseHeartbeat:
+    """
+    Background thread that keeps renewing the leases of the batch a worker is working on.
+
+    A batch can take far longer than one lease, for example a multi-hour video
+    or videos waiting behind a slow ASR stage. Every `lease_seconds / 3` the
+    heartbeat renews the items set with `hold`, so a lease only expires when
+    its worker is gone. It has its own connection to the queue, since a SQLite
+    connection may only be used by the thread that opened it.
+    """
+
+    def __init__(self, path, stage, worker, lease_seconds=600):
+        self.path = path
+        self.stage = stage
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.items = []
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+        self.thread.start()
+
+    def hold(self, item_ids):
+        """Renew these items from now on, instead of the previous ones."""
+        with self.lock:
+            self.items = list(item_ids)
+
+    def _run(self):
+        with JobQueue(self.path) as queue:
+            while not self.stop.wait(self.lease_seconds / 3):
+                with self.lock:
+                    items = self.items
+                if not items:
+                    continue
+                try:
+                    queue.renew(self.stage, self.worker, items, lease_seconds=self.lease_seconds)
+                except sqlite3.Error as e:
+                    # A busy shared filesystem; the next beat is still well within the lease
+                    print(f"❌ Could not renew {len(items)} leases: {e}")
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE so concurrent claims from several processes never hand out the same item."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def iter_csv_items(fn_csv, id_column, payload_column=None):
+    with open(fn_csv, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row[id_column], row[payload_column] if payload_column else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the shared job queue of the pipeline.')
+    parser.add_argument('--db', type=str, required=True, help='Path to the job queue database (may live on a shared filesystem).')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Enqueue the items of a CSV file for a stage.')
+    enqueue_parser.add_argument('--stage', type=str, required=True, help='Stage name, e.g. retrieve_subtitled_videos.')
+    enqueue_parser.add_argument('--csv', type=str, required=True, help='CSV file with the items to enqueue.')
+    enqueue_parser.add_argument('--id_column', type=str, default='video_id', help='Column holding the item ID.')
+    enqueue_parser.add_argument('--payload_column', type=str, default='word', help='Column stored alongside the ID (e.g. the query phrase).')
+
+    status_parser = subparsers.add_parser('status', help='Show progress per stage.')
+    status_parser.add_argument('--stage', type=str, default=None, help='Only show this stage.')
+
+    args = parser.parse_args()
+
+    with JobQueue(args.db) as queue:
+        if args.command == 'enqueue':
+            added = queue.enqueue(args.stage, iter_csv_items(args.csv, args.id_column, args.payload_column))
+            print(f"Enqueued {added} new items for {args.stage}.")
+        else:
+            for stage, counts in queue.status(args.stage).items():
+                total = sum(count for count, _ in counts.values())
+                done = counts.get(DONE, (0, 0))[0]
+                print(f"{stage}: {done}/{total} done ({done / total:.1%})")
+                for status, (count, attempts) in counts.items():
+                    print(f"  {status:<8} {count:>10} items, {attempts or 0:>10} attempts")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,20 @@
-import requests
 import bz2
 import argparse
 import sys
 import re
-from scripts.utils import make_dump_url
+import heapq
+import tempfile
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from scripts.dump_fetcher import fetch_dump
+from scripts.utils import make_dump_url, make_checksum_url
 from pathlib import Path
 from tqdm import tqdm
 
+# Every bz2 stream starts with "BZh" + block size digit + the block magic (pi in BCD).
+BZ2_BLOCK_MAGIC = b"\x31\x41\x59\x26\x53\x59"
+BZ2_READ_SIZE = 1024 * 1024
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Making search words from Wikipedia",
@@ -14,6 +22,10 @@ def parse_args():
     )
     parser.add_argument("lang", type=str, help="language code (ja, en, ...)")
     parser.add_argument("--outdir", type=str, default="word", help="dirname to save words")
+    parser.add_argument("--streaming", action="store_true", default=False, help="Decompress the multistream index in parallel with bounded memory.")
+    parser.add_argument("--processes", type=int, default=cpu_count(), help="Number of parallel processes to use")
+    parser.add_argument("--segment_mb", type=int, default=4, help="Size of the compressed segment handed to each worker in streaming mode (MB)")
+    parser.add_argument("--max_words_in_memory", type=int, default=2_000_000, help="Number of unique words kept in memory before spilling a sorted run to disk")
     return parser.parse_args(sys.argv[1:])
 
 def clean_line(line, lang=None):
@@ -43,24 +55,210 @@ def clean_line(line, lang=None):
             return ""
     return line
 
-def make_search_word(lang, outdir="word"):
-    # download wikipedia index
+# Steps 1-2 of clean_line in one pass. Entities are removed before extensions
+# are looked for, so an extension may be interleaved with entities.
+ENTITY_OR_EXTENSION_RE = re.compile(r'&\w+;|\.(?:&\w+;)*\w(?:\w|&\w+;)*')
+HAS_ENGLISH_RE = re.compile(r'[A-Za-z]')
+ONLY_ENGLISH_RE = re.compile(r'[A-Za-z0-9 ]*')
+
+class CharCleanTable(dict):
+    """
+    str.translate table for the character-level steps 3-6 of clean_line.
+
+    Removing digits and punctuation (and with them parenthesised integers and
+    ZWNJ-like marks) only depends on each character, so the outcome for a code
+    point is computed once with the original regexes and cached.
+    """
+
+    def __missing__(self, key):
+        ch = chr(key)
+        ch = re.sub(r'\d+', '', ch)
+        ch = re.sub(r'[^\w\s]', '', ch)
+        ch = re.sub('[\u200C\u200D\u200E\u200F]', ' ', ch)
+        value = ch or None
+        self[key] = value
+        return value
+
+CHAR_CLEAN_TABLE = CharCleanTable()
+
+def filter_language(line, lang=None):
+    if lang == "en":
+        # Remove lines that don't contain any English letters
+        if not HAS_ENGLISH_RE.search(line):
+            return ""
+    else:
+        # Remove lines that are all English letters or digits (no non-English chars)
+        if ONLY_ENGLISH_RE.fullmatch(line):
+            return ""
+    return line
+
+def clean_lines(lines, lang=None):
+    """
+    Batch version of clean_line with identical output.
+
+    The block is joined into one string so the fused regex and the translate
+    table run once per block instead of nine regex passes per title.
+    """
+    lines = list(lines)
+    if not lines:
+        return []
+    block = "\n".join(lines)
+    if block.count("\n") != max(len(lines) - 1, 0):
+        # A title contains a newline itself; clean titles one by one.
+        return [clean_line(line, lang=lang) for line in lines]
+
+    block = ENTITY_OR_EXTENSION_RE.sub('', block)
+    block = block.translate(CHAR_CLEAN_TABLE)
+    return [filter_language(' '.join(line.split()), lang=lang) for line in block.split("\n")]
+
+def clean_lines_parallel(lines, lang=None, processes=None, block_size=10000):
+    """Clean titles in blocks across a process pool, preserving order."""
+    blocks = [lines[i:i + block_size] for i in range(0, len(lines), block_size)]
+    cleaned = []
+    with Pool(processes or cpu_count()) as pool:
+        for block in tqdm(pool.imap(partial(clean_lines, lang=lang), blocks), total=len(blocks), desc="Cleaning words"):
+            cleaned.extend(block)
+    return cleaned
+
+def download_dump(lang, outdir="word"):
+    # download wikipedia index, resuming partial downloads and skipping unchanged dumps
     url = make_dump_url(lang)
     fn_index = Path(outdir) / "dump" / lang / Path(url).name  # xxx.txt.bz2
-    fn_index.parent.mkdir(parents=True, exist_ok=True)
+    return fetch_dump(url, fn_index, checksum_url=make_checksum_url(lang))
 
-    if not fn_index.exists():
-        response = requests.get(url, stream=True)
-        total_size = int(response.headers.get('content-length', 0))  # total file size in bytes
-        chunk_size = 1024 * 1024  # 1 MB chunks
+def find_stream_candidates(f, start, end):
+    """Yield offsets in [start, end) that look like the start of a bz2 stream."""
+    header_size = 4 + len(BZ2_BLOCK_MAGIC)
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        buf = f.read(min(BZ2_READ_SIZE, end - pos) + header_size - 1)
+        if not buf:
+            return
+        idx = buf.find(b"BZh")
+        while idx != -1 and pos + idx < end:
+            header = buf[idx:idx + header_size]
+            if len(header) == header_size and header[3:4] in b"123456789" and header[4:] == BZ2_BLOCK_MAGIC:
+                yield pos + idx
+            idx = buf.find(b"BZh", idx + 1)
+        pos += BZ2_READ_SIZE
 
-        with open(fn_index, "wb") as f, tqdm(
-            total=total_size, unit='B', unit_scale=True, desc="Downloading"
-        ) as pbar:
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:  # filter out keep-alive new chunks
-                    f.write(chunk)
-                    pbar.update(len(chunk))
+def iter_stream_lines(f, offset, end):
+    """
+    Decompress consecutive bz2 streams starting at `offset` and yield their lines.
+
+    Streams are read one after another, so once the first one decodes every
+    following boundary is exact. Reading stops after the last stream that
+    starts before `end`; the worker of the next segment picks up from there.
+    The multistream index ends each stream on a line boundary.
+    """
+    f.seek(offset)
+    stream_start = offset
+    unused = b""
+    while stream_start < end:
+        decompressor = bz2.BZ2Decompressor()
+        data = unused
+        consumed = 0
+        chunks = []
+        while True:
+            if not data:
+                data = f.read(BZ2_READ_SIZE)
+                if not data:
+                    break
+            consumed += len(data)
+            chunks.append(decompressor.decompress(data))
+            data = b""
+            if decompressor.eof:
+                break
+        if not chunks:
+            return
+        unused = decompressor.unused_data
+        stream_start += consumed - len(unused)
+        text = b"".join(chunks).decode("utf-8")
+        yield from text.split("\n")
+        if not decompressor.eof:
+            return
+
+def extract_segment_words(args):
+    """Return the cleaned, deduplicated words of every bz2 stream starting inside a segment."""
+    fn_index, start, end, lang = args
+    words = set()
+    with open(fn_index, "rb") as f:
+        for candidate in find_stream_candidates(f, start, end):
+            try:
+                for line in iter_stream_lines(f, candidate, end):
+                    if line:
+                        words.add(line.split(":")[-1])
+            except (OSError, EOFError):
+                # False positive: the magic bytes occurred inside compressed data.
+                words.clear()
+                continue
+            break
+
+    return [w for w in clean_lines(words, lang=lang) if len(w) > 0]
+
+def write_sorted_run(words, tmpdir):
+    run = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=tmpdir, suffix=".run", delete=False)
+    with run:
+        run.writelines(w + "\n" for w in sorted(words))
+    return run.name
+
+def iter_run(fn_run):
+    with open(fn_run, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def make_search_word_streaming(lang, outdir="word", processes=None, segment_mb=4, max_words_in_memory=2_000_000):
+    """
+    Build the word list without holding the whole index in memory.
+
+    The multistream index is a concatenation of independent bz2 streams, so the
+    compressed file is cut into fixed-size segments that are decompressed,
+    split and cleaned in a process pool. Unique words are buffered up to
+    `max_words_in_memory` and spilled to sorted runs that are merged at the end.
+    """
+    fn_index = download_dump(lang, outdir)
+
+    fn_word = Path(outdir) / "word" / lang / fn_index.stem
+    fn_word.parent.mkdir(parents=True, exist_ok=True)
+
+    segment_size = segment_mb * 1024 * 1024
+    file_size = fn_index.stat().st_size
+    segments = [(str(fn_index), start, min(start + segment_size, file_size), lang)
+                for start in range(0, file_size, segment_size)]
+
+    num_words = 0
+    with tempfile.TemporaryDirectory(dir=fn_word.parent) as tmpdir:
+        runs = []
+        buffer = set()
+        with Pool(processes or cpu_count()) as pool:
+            for words in tqdm(pool.imap(extract_segment_words, segments), total=len(segments), desc="Extracting words"):
+                buffer.update(words)
+                if len(buffer) >= max_words_in_memory:
+                    runs.append(write_sorted_run(buffer, tmpdir))
+                    buffer = set()
+
+        if runs:
+            if buffer:
+                runs.append(write_sorted_run(buffer, tmpdir))
+                buffer = set()
+            merged = heapq.merge(*[iter_run(fn_run) for fn_run in runs])
+        else:
+            merged = sorted(buffer)
+
+        with open(fn_word, "w", encoding="utf-8") as f:
+            previous = None
+            for w in merged:
+                if w != previous:
+                    f.write(w + "\n")
+                    num_words += 1
+                    previous = w
+
+    print(f"Obtained {num_words} unique words for {lang}.")
+    return fn_word
+
+def make_search_word(lang, outdir="word", processes=None):
+    fn_index = download_dump(lang, outdir)
 
     # obtain words
     fn_word = Path(outdir) / "word" / lang / fn_index.stem
@@ -71,7 +269,7 @@ def make_search_word(lang, outdir="word"):
         words = [line.strip("\n").split(":")[-1] for line in tqdm(lines, desc="Extracting words")]
 
     # Clean each word using the new cleaners
-    words = [clean_line(w, lang=lang) for w in tqdm(set(words), desc="Cleaning words")]
+    words = clean_lines_parallel(list(set(words)), lang=lang, processes=processes)
     words = [w for w in words if len(w) > 0]
     words = list(set(words))
     words.sort()
@@ -84,5 +282,8 @@ def make_search_word(lang, outdir="word"):
 
 if __name__ == "__main__":
     args = parse_args()
-    filename = make_search_word(args.lang, args.outdir)
+    if args.streaming:
+        filename = make_search_word_streaming(args.lang, args.outdir, args.processes, args.segment_mb, args.max_words_in_memory)
+    else:
+        filename = make_search_word(args.lang, args.outdir, args.processes)
     print(f"save {args.lang.upper()} words to {filename}.")
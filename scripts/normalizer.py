@@ -1,4 +1,7 @@
 # normalizer.py
+import re
+import threading
+from collections import OrderedDict
 
 # Attempt to import language-specific dependencies and set availability flags.
 try:
@@ -14,6 +17,27 @@ try:
 except ImportError:
     NEMO_AVAILABLE = False
 
+# Sentence ends and line breaks, for TextNormalizer(split_sentences=True). A period
+# after an abbreviation ("Dr. Smith", "No. 5") is cut too, which can change the output.
+UNIT_BOUNDARY_RE = re.compile(r'(?<=[.!?؟])\s+|\s*\n\s*')
+
+
+def split_units(text: str) -> list:
+    """Split text into the sentence-sized units normalize_batch works on with `split_sentences`."""
+    return [unit for unit in UNIT_BOUNDARY_RE.split(text) if unit.strip()]
+
+
+_worker_normalizer = None
+
+
+def _init_worker(lang):
+    global _worker_normalizer
+    _worker_normalizer = TextNormalizer(lang)
+
+
+def _normalize_in_worker(text):
+    return _worker_normalizer.normalize(text)
+
 
 class TextNormalizer:
     """
@@ -22,16 +46,35 @@ class TextNormalizer:
     This class provides a simple interface to normalize text for different languages.
     It uses ParsNorm for Farsi ('fa') and NVIDIA's NeMo toolkit for English ('en').
     
+    Many texts can go through `normalize_batch`, which serves repeated texts
+    (cue lines, rolling captions) from an LRU cache and normalizes the rest in
+    a pool of worker processes. Each text is normalized whole, so the results
+    are exactly those of `normalize`. That only saves time for short texts that
+    repeat, such as the per-cue texts of `--asr_mode cues`/`sequential`; a whole
+    transcript is longer than `max_cached_len` and never repeats, so it skips
+    the cache and costs what `normalize` costs. With `split_sentences` texts are
+    cut into sentences first, so repeated sentences (intros, sign-offs) hit the
+    cache too, at the cost of possibly different output around abbreviations.
+
     Attributes:
         lang (str): The language code for the normalizer instance.
+        split_sentences (bool): Whether normalize_batch cuts texts at sentence ends.
+        hits (int): Units answered from the cache or repeated within a batch.
+        misses (int): Units that had to be normalized.
     """
 
-    def __init__(self, lang: str):
+    def __init__(self, lang: str, cache_size: int = 100000, workers: int = 0, min_pool_units: int = 16,
+                 split_sentences: bool = False, max_cached_len: int = 1000):
         """
         Initializes the normalizer for a specified language.
 
         Args:
             lang (str): The language code, either 'en' for English or 'fa' for Farsi.
+            cache_size (int): Normalized units kept in the LRU cache; 0 disables it.
+            workers (int): Worker processes for cache misses; 0 normalizes in this process.
+            min_pool_units (int): Batches with fewer misses than this skip the pool.
+            split_sentences (bool): Normalize one sentence at a time in normalize_batch (see `split_units`).
+            max_cached_len (int): Longer units, such as whole transcripts, are not cached.
         
         Raises:
             ValueError: If the specified language is not supported.
@@ -59,6 +102,18 @@ class TextNormalizer:
         else:
             raise ValueError(f"Language '{lang}' is not supported. Available languages: 'en', 'fa'.")
 
+        self.cache_size = cache_size
+        self.workers = workers
+        self.min_pool_units = min_pool_units
+        self.split_sentences = split_sentences
+        self.max_cached_len = max_cached_len
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        # The pipeline normalizes from several threads at once
+        self._lock = threading.Lock()
+        self._pool = None
+
     def normalize(self, text: str) -> str:
         """
         Normalizes the input text string.
@@ -71,6 +126,72 @@ class TextNormalizer:
         """
         return self._normalize_func(text)
 
+    def normalize_batch(self, texts: list) -> list:
+        """
+        Normalizes many texts, each one as a single unit.
+
+        Units seen before come from the cache and the remaining distinct units
+        are normalized once each (in the worker pool if there are enough of
+        them), so every result is exactly what `normalize` returns for the text.
+        With `split_sentences` each text is split with `split_units` instead and
+        put back together from its units joined with spaces.
+
+        Args:
+            texts (list): The texts to be normalized.
+
+        Returns:
+            list: The normalized texts, in the order of `texts`.
+        """
+        units = [split_units(text) if self.split_sentences else [text] for text in texts]
+        normalized = {}
+        with self._lock:
+            for text_units in units:
+                for unit in text_units:
+                    if unit in normalized:
+                        continue
+                    # Long units are never cached, so they are not looked up either
+                    cached = self._cache.get(unit) if len(unit) <= self.max_cached_len else None
+                    if cached is None:
+                        normalized[unit] = None
+                    else:
+                        self._cache.move_to_end(unit)
+                        normalized[unit] = cached
+        missing = [unit for unit, value in normalized.items() if value is None]
+        for unit, value in zip(missing, self._normalize_units(missing)):
+            normalized[unit] = value
+        with self._lock:
+            self.hits += sum(len(text_units) for text_units in units) - len(missing)
+            self.misses += len(missing)
+            if self.cache_size:
+                for unit in missing:
+                    if len(unit) <= self.max_cached_len:
+                        self._cache[unit] = normalized[unit]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [' '.join(normalized[unit] for unit in text_units) for text_units in units]
+
+    def _normalize_units(self, units):
+        if not units:
+            return []
+        if self.workers <= 0 or len(units) < self.min_pool_units:
+            return [self._normalize_func(unit) for unit in units]
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Spawned, not forked: the parent holds CUDA state and pipeline threads
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_worker, initargs=(self.lang,))
+        chunksize = max(1, len(units) // (self.workers * 4))
+        return list(self._pool.map(_normalize_in_worker, units, chunksize=chunksize))
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
 
 # --- Example Usage ---
 if __name__ == '__main__':
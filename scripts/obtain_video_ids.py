@@ -1,14 +1,26 @@
 import time
+import asyncio
 import requests
 import argparse
 import re
 import sys
+from functools import partial
 from pathlib import Path
+from scripts.seen_index import SeenIndex
 from scripts.utils import make_query_url
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 import csv
 
+# The async engine is optional and only needs aiohttp when selected.
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+YOUTUBE_BASE_URL = "https://www.youtube.com"
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -18,28 +30,42 @@ def parse_args():
     parser.add_argument("wordlist", type=str, help="filename of word list")
     parser.add_argument("--outdir", type=str, default="videoid", help="dirname to save video IDs")
     parser.add_argument("--processes", type=int, default=cpu_count(), help="Number of parallel processes to use")
+    parser.add_argument("--engine", type=str, choices=["pool", "async"], default="pool", help="Process pool of blocking requests, or one asyncio event loop with a shared keep-alive client")
+    parser.add_argument("--concurrency", type=int, default=200, help="Maximum number of in-flight queries for the async engine")
+    parser.add_argument("--seen_index", type=str, default=None, help="SQLite index of video IDs already found, shared across word splits and sessions")
+    parser.add_argument("--base_url", type=str, default=YOUTUBE_BASE_URL, help="Search host, e.g. a local stub for benchmarking")
     return parser.parse_args(sys.argv[1:])
 
 
-def process_word(word):
+def extract_video_ids(html):
+    # Find video IDs
+    videoids_found = [x.split(":")[1].strip("\"").strip(" ") for x in re.findall(r"\"videoId\":\"[\w\_\-]+?\"", str(html))]
+    return list(set(videoids_found))
+
+
+def process_word(word, base_url=YOUTUBE_BASE_URL):
     try:
         # Download search results
-        url = make_query_url(word)
+        url = make_query_url(word, base_url=base_url)
         html = requests.get(url).content
-
-        # Find video IDs
-        videoids_found = [x.split(":")[1].strip("\"").strip(" ") for x in re.findall(r"\"videoId\":\"[\w\_\-]+?\"", str(html))]
-        return word, list(set(videoids_found))
+        return word, extract_video_ids(html)
     except Exception:
         print(f"No video found for {word}.")
         return word, []
 
 
-# Instead of one open() for the whole run, do:
-def obtain_video_id(fn_word, outdir, processes):
-    fn_videoid = Path(outdir) / f"{Path(fn_word).stem}.csv"
-    fn_videoid.parent.mkdir(parents=True, exist_ok=True)
+async def async_process_word(session, word, base_url=YOUTUBE_BASE_URL):
+    try:
+        url = make_query_url(word, base_url=base_url)
+        async with session.get(url) as response:
+            html = await response.read()
+        return word, extract_video_ids(html)
+    except Exception:
+        print(f"No video found for {word}.")
+        return word, []
+
 
+def load_words_to_process(fn_word, fn_videoid):
     processed_words = set()
     if fn_videoid.exists():
         with open(fn_videoid, "r", newline="") as f:
@@ -49,23 +75,91 @@ def obtain_video_id(fn_word, outdir, processes):
                 processed_words.add(row[0])
 
     words = [w.strip() for w in open(fn_word).readlines()]
-    words_to_process = [w for w in words if w not in processed_words]
+    return [w for w in words if w not in processed_words]
+
+
+def write_video_ids(writer, word, videoids):
+    for videoid in videoids:
+        video_link = f"https://www.youtube.com/watch?v={videoid}"
+        writer.writerow([word, videoid, video_link])
+
+
+# Instead of one open() for the whole run, do:
+def obtain_video_id(fn_word, outdir, processes, base_url=YOUTUBE_BASE_URL, seen_index=None):
+    fn_videoid = Path(outdir) / f"{Path(fn_word).stem}.csv"
+    fn_videoid.parent.mkdir(parents=True, exist_ok=True)
+
+    words_to_process = load_words_to_process(fn_word, fn_videoid)
 
     if not words_to_process:
         print("All words already processed!")
         return fn_videoid
 
+    index = SeenIndex(seen_index, "obtain_video_ids") if seen_index else None
     with Pool(processes) as pool:
-        for word, videoids in tqdm(pool.imap_unordered(process_word, words_to_process), total=len(words_to_process)):
+        for word, videoids in tqdm(pool.imap_unordered(partial(process_word, base_url=base_url), words_to_process), total=len(words_to_process)):
+            if index:
+                videoids = index.filter_unseen(videoids)
             with open(fn_videoid, "a", newline="") as f:
                 writer = csv.writer(f)
                 if f.tell() == 0:
                     writer.writerow(["word", "video_id", "video_link"])
-                for videoid in videoids:
-                    video_link = f"https://www.youtube.com/watch?v={videoid}"
-                    writer.writerow([word, videoid, video_link])
+                write_video_ids(writer, word, videoids)
                 f.flush()
-    
+            if index:
+                index.add(videoids)
+
+    return fn_videoid
+
+
+async def crawl_words(words, fn_videoid, concurrency, base_url=YOUTUBE_BASE_URL, index=None):
+    """
+    Query every word from a single event loop.
+
+    `concurrency` workers pull words from a shared iterator, so at most that
+    many requests are in flight, and all of them share one keep-alive
+    connection pool instead of paying TCP/TLS setup per query.
+    """
+    total = len(words)
+    words = iter(words)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    with open(fn_videoid, "a", newline="") as f, tqdm(total=total) as pbar:
+        writer = csv.writer(f)
+        if f.tell() == 0:
+            writer.writerow(["word", "video_id", "video_link"])
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def worker():
+                for word in words:
+                    word, videoids = await async_process_word(session, word, base_url=base_url)
+                    if index:
+                        videoids = index.filter_unseen(videoids)
+                    write_video_ids(writer, word, videoids)
+                    f.flush()
+                    if index:
+                        index.add(videoids)
+                    pbar.update(1)
+
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+
+def async_obtain_video_id(fn_word, outdir, concurrency, base_url=YOUTUBE_BASE_URL, seen_index=None):
+    if not AIOHTTP_AVAILABLE:
+        raise ImportError("The async engine requires aiohttp. Please install it with: pip install aiohttp")
+
+    fn_videoid = Path(outdir) / f"{Path(fn_word).stem}.csv"
+    fn_videoid.parent.mkdir(parents=True, exist_ok=True)
+
+    words_to_process = load_words_to_process(fn_word, fn_videoid)
+
+    if not words_to_process:
+        print("All words already processed!")
+        return fn_videoid
+
+    index = SeenIndex(seen_index, "obtain_video_ids") if seen_index else None
+    asyncio.run(crawl_words(words_to_process, fn_videoid, concurrency, base_url=base_url, index=index))
     return fn_videoid
 
 
@@ -73,9 +167,20 @@ def obtain_video_id(fn_word, outdir, processes):
 if __name__ == "__main__":
     args = parse_args()
 
-    filename = obtain_video_id(
-        args.wordlist,
-        args.outdir,
-        args.processes
-    )
+    if args.engine == "async":
+        filename = async_obtain_video_id(
+            args.wordlist,
+            args.outdir,
+            args.concurrency,
+            args.base_url,
+            args.seen_index
+        )
+    else:
+        filename = obtain_video_id(
+            args.wordlist,
+            args.outdir,
+            args.processes,
+            args.base_url,
+            args.seen_index
+        )
     print(f"Saved video IDs to {filename}.")
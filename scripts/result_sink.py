@@ -0,0 +1,108 @@
+import csv
+import os
+import time
+from pathlib import Path
+
+
+def read_column(path, column):
+    """Read one column of a CSV file into a set without keeping whole rows in memory."""
+    values = set()
+    if not Path(path).exists():
+        return values
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or column not in header:
+            return values
+        idx = header.index(column)
+        for row in reader:
+            if len(row) > idx:
+                values.add(row[idx])
+    return values
+
+
+def truncate_torn_tail(path):
+    """Drop a partially written last line left behind by a crash."""
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = size
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            idx = chunk.rfind(b"\n")
+            if idx != -1:
+                f.truncate(pos + idx + 1)
+                return
+        f.truncate(0)
+
+
+class CsvResultSink:
+    """
+    Append-only CSV writer for pipeline results.
+
+    Records are buffered and appended in batches, and each batch is fsynced,
+    so the cost per row stays constant no matter how large the output grows.
+    A batch is written when it reaches `batch_size` rows or when
+    `flush_seconds` have passed since the last write, so a crash loses at most
+    one batch. A torn last line from an earlier crash is dropped on open.
+
+    Attributes:
+        path (Path): The output CSV file.
+        fieldnames (list): Column order of the output.
+        on_flush (callable): Optional callback receiving each batch once it is on disk.
+    """
+
+    def __init__(self, path, fieldnames, batch_size=50, flush_seconds=30.0, resume=True, on_flush=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fieldnames = fieldnames
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.on_flush = on_flush
+        self.buffer = []
+        self.num_written = 0
+        self.last_flush = time.monotonic()
+
+        if resume and self.path.exists():
+            truncate_torn_tail(self.path)
+        self.f = open(self.path, "a" if resume else "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.f, fieldnames=fieldnames)
+        if self.f.tell() == 0:
+            self.writer.writeheader()
+            self.f.flush()
+
+    def write(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        self.writer.writerows(self.buffer)
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        batch, self.buffer = self.buffer, []
+        self.num_written += len(batch)
+        if self.on_flush:
+            self.on_flush(batch)
+
+    def close(self):
+        if self.f.closed:
+            return
+        self.flush()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
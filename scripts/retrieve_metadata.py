@@ -1,24 +1,37 @@
 import os
-import yt_dlp
 import argparse
 import pandas as pd
 from tqdm import tqdm
 import time
 import random
 from multiprocessing import Pool, cpu_count
+from scripts.governor import CircuitOpenError, RequestGovernor
+from scripts.info_cache import InfoCache, cached_extract_info, youtube_extract
+from scripts.result_sink import CsvResultSink, read_column
+from scripts.seen_index import SeenIndex
 
+REQUIRED_FIELDS = [
+    'title',
+    'channel_id',
+    'duration',
+    'categories',
+    'language'
+]
+FIELDNAMES = REQUIRED_FIELDS + ['subtitles', 'video_id']
 
-def get_video_info(video_id):
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
+# Info cache and request governor of each worker process, set by init_worker
+_info_cache = None
+_governor = None
 
-    required_fields = [
-        'title',
-        'channel_id',
-        'duration',
-        'categories',
-        'language'
-    ]
 
+def init_worker(info_cache=None, ttl_hours=168, governor=None):
+    global _info_cache, _governor
+    _info_cache = InfoCache(info_cache, ttl_seconds=ttl_hours * 3600) if info_cache else None
+    # The governor's state is shared memory, so every worker paces against the same budget
+    _governor = governor
+
+
+def get_video_info(video_id, info_cache=None, governor=None):
     ydl_opts = {
         'skip_download': True,
         'cookies': 'cookies.txt',
@@ -27,42 +40,58 @@ def get_video_info(video_id):
     }
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=False)
+        extract = youtube_extract(ydl_opts)
+        if governor:
+            extract = governor.wrap(extract)
+        info, _ = cached_extract_info(video_id, extract, info_cache)
 
         if not info:
             return None
 
-        required_info = {field: info.get(field) for field in required_fields}
+        required_info = {field: info.get(field) for field in REQUIRED_FIELDS}
         subtitles = list(info.get('subtitles', {}).keys())
         return {**required_info, 'subtitles': subtitles, 'video_id': video_id}
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Unexpected error processing video {video_id}: {str(e)}")
         if "Sign in to confirm you’re not a bot" in str(e):
-            print("❌ Too many bot errors, exiting.")
-            exit(1)
+            raise CircuitOpenError("YouTube asked to sign in") from e
         return None
 
 
+def fetch_video_info(video_id):
+    """get_video_info through the worker's info cache; returns (info, answered from cache)."""
+    hits = _info_cache.hits if _info_cache else 0
+    info = get_video_info(video_id, _info_cache, _governor)
+    return info, bool(_info_cache) and _info_cache.hits > hits
+
+
 def main():
     parser = argparse.ArgumentParser(description='Retrieve video information from YouTube.')
     parser.add_argument('--input_csv', type=str, required=True, help='Path to the input CSV file containing video IDs.')
     parser.add_argument('--output_csv', type=str, required=True, help='Path to the output CSV file to save video information.')
     parser.add_argument('--save_frequency', type=int, default=100, help='How often to save the results to the output CSV.')
     parser.add_argument('--num_workers', type=int, default=cpu_count(), help='Number of worker processes to use.')
+    parser.add_argument('--seen_index', type=str, default=None, help='SQLite index of video IDs already retrieved, shared across input files and sessions.')
+    parser.add_argument('--info_cache', type=str, default=None, help='On-disk cache of video info dicts shared with retrieve_subtitled_videos.')
+    parser.add_argument('--info_cache_ttl_hours', type=float, default=168, help='Age after which a cached info dict is extracted again.')
+    parser.add_argument('--rate', type=float, default=5.0, help='Initial YouTube requests per second, shared by all workers; adapts to throttling.')
+    parser.add_argument('--max_rate', type=float, default=20.0, help='Highest YouTube requests per second.')
+    parser.add_argument('--cooldown_minutes', type=float, default=10, help='Pause after YouTube asks to sign in (doubles each time).')
+    parser.add_argument('--max_trips', type=int, default=3, help='Sign-in pauses tolerated before saving progress and stopping.')
     parser.add_argument('--max_hours', type=float, default=11, help='Maximum number of hours to run before stopping.')
 
     args = parser.parse_args()
     start_time = time.time()
     max_seconds = args.max_hours * 3600  # 11 hours by default
 
-    # Load existing data if output file exists
-    if os.path.exists(args.output_csv):
+    # Resume from the existing output file, reading back only the video IDs
+    resume = os.path.exists(args.output_csv)
+    if resume:
         print(f"Resuming from existing file: {args.output_csv}")
-        df_out = pd.read_csv(args.output_csv)
-        processed_videos = set(df_out['video_id'])
+        processed_videos = read_column(args.output_csv, 'video_id')
     else:
-        df_out = pd.DataFrame()
         processed_videos = set()
     output_dir = os.path.dirname(args.output_csv)
     if output_dir:  # only make dir if a directory path is specified
@@ -73,38 +102,47 @@ def main():
     video_ids = df_in['video_id'].unique()
 
     videos_to_process = [vid for vid in video_ids if vid not in processed_videos]
+    index = SeenIndex(args.seen_index, "retrieve_metadata") if args.seen_index else None
+    if index:
+        videos_to_process = index.filter_unseen(videos_to_process)
     # shuffle
     random.shuffle(videos_to_process)
 
-    results = []
-    with Pool(processes=args.num_workers) as pool:
+    def on_flush(batch):
+        if index:
+            index.add(r['video_id'] for r in batch)
+        print(f"\nSaved {len(processed_videos) + sink.num_written} results to {args.output_csv}")
+
+    sink = CsvResultSink(args.output_csv, FIELDNAMES, batch_size=args.save_frequency, resume=resume, on_flush=on_flush)
+    cache_hits = 0
+    governor = RequestGovernor(rate=args.rate, max_rate=args.max_rate, cooldown=args.cooldown_minutes * 60, max_trips=args.max_trips)
+    with Pool(processes=args.num_workers, initializer=init_worker, initargs=(args.info_cache, args.info_cache_ttl_hours, governor)) as pool:
         with tqdm(total=len(videos_to_process), desc="Processing videos") as pbar:
-            for info in pool.imap_unordered(get_video_info, videos_to_process):
-                elapsed = time.time() - start_time
-                if elapsed > max_seconds:
-                    print("\n⏰ Time limit reached (11 hours). Saving progress and exiting...")
-                    pool.terminate()
-                    pool.join()
-                    break
-                
-                if info:
-                    results.append(info)
-
-                if len(results) >= args.save_frequency:
-                    temp_df = pd.DataFrame(results)
-                    df_out = pd.concat([df_out, temp_df], ignore_index=True)
-                    df_out.to_csv(args.output_csv, index=False)
-                    results = []
-                    print(f"\nSaved {len(df_out)} results to {args.output_csv}")
-                
-                pbar.update(1)
+            try:
+                for info, cached in pool.imap_unordered(fetch_video_info, videos_to_process):
+                    elapsed = time.time() - start_time
+                    if elapsed > max_seconds:
+                        print("\n⏰ Time limit reached (11 hours). Saving progress and exiting...")
+                        pool.terminate()
+                        pool.join()
+                        break
+
+                    if info:
+                        sink.write(info)
+                    cache_hits += cached
+
+                    pbar.update(1)
+            except CircuitOpenError as e:
+                # Videos still in flight are not written, so the next run retries them
+                print(f"\n❌ Stopping: {e}. Saving progress and exiting...")
+                pool.terminate()
+                pool.join()
 
     # Save any remaining results
-    if results:
-        temp_df = pd.DataFrame(results)
-        df_out = pd.concat([df_out, temp_df], ignore_index=True)
-        df_out.to_csv(args.output_csv, index=False)
-        print(f"\nSaved final {len(df_out)} results to {args.output_csv}")
+    sink.close()
+    print(governor.report())
+    if args.info_cache:
+        print(f"Info cache: {cache_hits}/{pbar.n} hits ({cache_hits / max(pbar.n, 1):.1%})")
 
     print("Processing complete.")
 
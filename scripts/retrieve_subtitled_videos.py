@@ -4,15 +4,59 @@ import argparse
 import sys
 import re
 import os
-import yt_dlp
 import subprocess
-import string
 import re
+import shutil
 from pathlib import Path
+from scripts.asr_backends import BACKENDS, load_backend
+from scripts.asr_batching import BatchedTranscriber
+from scripts.audio_fetch import RemoteAudio, open_audio, read_spans, smallest_audio_selector
+from scripts.audio_stream import stream_audio
+from scripts.early_reject import group_cues, sequential_verify
+from scripts.error_rate import fast_cer, fast_wer
+from scripts.governor import CircuitOpenError, RequestGovernor
+from scripts.info_cache import InfoCache, cached_extract_info, youtube_extract
+from scripts.job_queue import JobQueue, LeaseHeartbeat, default_worker_id
+from scripts.result_sink import CsvResultSink, read_column
+from scripts.seen_index import SeenIndex
+from scripts.staged_pipeline import DROP, Stage, StagedPipeline
+from scripts.subtitles import Cues, parse_subtitles
+from scripts.text_stats import SCRIPTS, TextFilter, text_stats
+from scripts.vad import vad_chunks
 from scripts.utils import make_video_url
+from scripts.ydl_pool import YDL_POOL
 from tqdm import tqdm
 
+QUEUE_STAGE = "retrieve_subtitled_videos"
+
+# Define fieldnames for CSV
+FIELDNAMES = ["videoid", 
+              "videourl", 
+              "language",
+              "title", 
+              "good_sub", 
+              "sub",
+              "wer", 
+              "cer",
+              "channel", 
+              "channel_id", 
+              "channel_url",
+              "channel_follower_count", 
+              "view_count", 
+              "like_count", 
+              "uploader_id",
+              "uploader_url",
+              "upload_date", 
+              "duration", 
+              "punctuation_count", 
+              "subtitle_duration",
+              "query_phrase",
+              "categories", 
+              ]
+
 def load_audio(file_path):
+    import librosa
+
     waveform, sample_rate = librosa.load(file_path, sr=16000)
     # convert to mono
     waveform = librosa.to_mono(waveform)
@@ -29,13 +73,10 @@ def load_audio(file_path):
 
     return waveform, sample_rate
 
-def load_model(model_path: str):
+def load_model(model_path: str, backend="nemo", threads=None):
+    """Load the ASR model with the chosen backend (see scripts.asr_backends); exits on failure."""
     try:
-        if os.path.exists(model_path):
-            model = ASRModel.restore_from(restore_path=model_path)
-        else:
-            model = ASRModel.from_pretrained(model_path)
-        return model
+        return load_backend(backend, model_path, threads=threads)
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         exit(1)
@@ -45,39 +86,92 @@ def transcribe_chunk(audio_chunk, model):
     transcription = model.transcribe([audio_chunk], batch_size=1, verbose=False)
     return transcription[0].text
 
-def transcribe_audio(file_path, model, normalizer, chunk_size=30*16000):
-    waveform, _ = load_audio(file_path)
-    transcriptions = []
-    for start in range(0, len(waveform), chunk_size):
-        end = min(len(waveform), start + chunk_size)
-        if end - start < 512:
-            continue
-        transcription = transcribe_chunk(waveform[start:end], model)
-        transcriptions.append(transcription)
-
-    # Combine all transcriptions and normalize the final result
-    final_transcription = ' '.join(transcriptions)
-    final_transcription = re.sub(' +', ' ', final_transcription)
-    final_transcription = normalizer.normalize(final_transcription)
-    
-    return final_transcription
-
-def count_common_punctuations(text, lang):
-    """Count common punctuation marks in text."""
-    if lang == 'fa':
-        common_punctuation_marks = r'[؟،]'
-    else:
-        common_punctuation_marks = r'[,?]'
-    matches = re.findall(common_punctuation_marks, text)
-    return len(matches)
-
-def count_other_punctuations(text, lang):
-    if lang == 'fa':
-        other_punctuation_marks = r'[!؛:]'
-    else:
-        other_punctuation_marks = r'[.:;!]'
-    matches = re.findall(other_punctuation_marks, text)
-    return len(matches)
+def join_transcriptions(file_transcriptions, normalizer):
+    """Join the window transcripts of each file and normalize all files in one batch."""
+    texts = [re.sub(' +', ' ', ' '.join(transcriptions)) for transcriptions in file_transcriptions]
+    return normalizer.normalize_batch(texts)
+
+def normalize_hypotheses(texts, normalizer):
+    """Normalize ASR hypotheses in one batch; blank ones stay '' without going through the normalizer."""
+    normalized = iter(normalizer.normalize_batch([text for text in texts if text.strip()]))
+    return [next(normalized).strip() if text.strip() else '' for text in texts]
+
+def transcribe_audio(file_path, model, normalizer, chunk_size=30*16000, batch_size=8, vad=False):
+    return transcribe_audio_files([file_path], model, normalizer, chunk_size=chunk_size, batch_size=batch_size, vad=vad)[0]
+
+def transcribe_audio_files(file_paths, model, normalizer, chunk_size=30*16000, batch_size=8, vad=False):
+    """
+    Transcribe several audio files, batching their 30 s windows together.
+
+    The audio is streamed from ffmpeg one window at a time and a batch goes to
+    the model as soon as it is full, so memory does not grow with video length
+    and ASR runs while the rest of the file is still being decoded. With
+    `vad`, silence is skipped and windows are cut at pauses (see vad_chunks)
+    instead of every `chunk_size` samples.
+    """
+    transcriber = BatchedTranscriber(model, batch_size=batch_size, chunk_size=chunk_size)
+    transcriptions = {file_path: [] for file_path in file_paths}
+
+    def flush():
+        for key, texts in transcriber.flush().items():
+            transcriptions[key].extend(texts)
+
+    for file_path in file_paths:
+        frames = stream_audio(file_path, frame_size=chunk_size)
+        if vad:
+            frames = (chunk for _, chunk in vad_chunks(frames, max_seconds=chunk_size / 16000))
+        for frame in frames:
+            transcriber.add(file_path, frame)
+            if len(transcriber.windows) >= batch_size:
+                flush()
+    flush()
+    return join_transcriptions([transcriptions[file_path] for file_path in file_paths], normalizer)
+
+def transcribe_cues(file_paths, cue_lists, model, normalizer, batch_size=8):
+    """
+    Transcribe only the audio under each subtitle cue.
+
+    Every cue span is cut out of the audio and batched with the spans of all
+    other files, so intros, music and credits without subtitles are never
+    decoded. `file_paths` may hold downloaded files or RemoteAudio sources,
+    for which only the cue spans are fetched.
+
+    Returns:
+        list: For each file, the normalized hypothesis of each of its cues.
+    """
+    transcriber = BatchedTranscriber(model, batch_size=batch_size)
+    for file_path, cues in zip(file_paths, cue_lists):
+        spans = read_spans(open_audio(file_path), [(start, end) for start, end, _ in cues])
+        for idx, samples in enumerate(spans):
+            transcriber.add((file_path, idx), samples)
+    transcriptions = transcriber.flush()
+
+    texts = []
+    for file_path, cues in zip(file_paths, cue_lists):
+        texts.extend(re.sub(' +', ' ', ' '.join(transcriptions.get((file_path, idx), []))) for idx in range(len(cues)))
+    normalized = iter(normalize_hypotheses(texts, normalizer))
+    return [[next(normalized) for _ in cues] for cues in cue_lists]
+
+def score_cues(cues, hypotheses, normalizer):
+    """WER/CER of every cue against its own ASR hypothesis. Cues without speech text are left unscored."""
+    from jiwer import wer, cer
+
+    references = clean_subtitle_texts([text for _, _, text in cues], normalizer)
+    rows = []
+    for (start, end, text), hypothesis, reference in zip(cues, hypotheses, references):
+        row = {"start": start, "end": end, "reference": reference, "hypothesis": hypothesis, "wer": "", "cer": ""}
+        if reference:
+            row["wer"] = wer(reference, hypothesis)
+            row["cer"] = cer(reference, hypothesis)
+        rows.append(row)
+    return rows
+
+def save_cue_scores(videoid, rows):
+    os.makedirs('transcripts', exist_ok=True)
+    with open(os.path.join('transcripts', f'{videoid}.cues.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=["start", "end", "reference", "hypothesis", "wer", "cer"])
+        writer.writeheader()
+        writer.writerows(rows)
 
 def parse_timestamp(timestamp: str) -> float:
     """Convert WebVTT or SRT timestamp to seconds."""
@@ -97,86 +191,43 @@ def parse_timestamp(timestamp: str) -> float:
     return total_seconds
 
 
-def calculate_subtitle_duration(subtitle_file: str) -> float:
-    """Calculate total duration covered by subtitles (VTT or SRT)."""
-    total_duration = 0.0
-    try:
-        with open(subtitle_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # For VTT, skip header lines
-        if subtitle_file.lower().endswith(".vtt"):
-            lines = lines[3:]
-
-        for line in lines:
-            if '-->' in line:
-                # Extract start and end times
-                start, end = line.strip().split(' --> ')
-                start_time = parse_timestamp(start)
-                end_time = parse_timestamp(end)
-                duration = end_time - start_time
-                total_duration += duration
+def parse_subtitle_cues(subtitles) -> Cues:
+    """Parse a VTT or SRT file (or caption bytes) into cues; already parsed Cues are returned as they are."""
+    return subtitles if isinstance(subtitles, Cues) else parse_subtitles(subtitles)
 
+def calculate_subtitle_duration(subtitle_file) -> float:
+    """Calculate total duration covered by subtitles (VTT or SRT), counting overlapping cues once."""
+    try:
+        return round(parse_subtitle_cues(subtitle_file).duration(), 2)
     except Exception as e:
         print(f"❌ Error calculating subtitle duration in {subtitle_file}: {e}")
         return 0.0
 
-    return round(total_duration, 2)
-
 def extract_text_from_subtitle(subtitle_file):
     """Extract plain text from subtitle file (VTT or SRT), removing timings and indexes."""
-    text = ""
     try:
-        ext = os.path.splitext(subtitle_file)[1].lower()
-
-        with open(subtitle_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # VTT has a header we should skip
-        if ext == ".vtt":
-            lines = lines[3:]
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if re.match(r'^\d+$', line):  # subtitle index in SRT
-                continue
-            if '-->' in line:  # timestamp line
-                continue
-            text += line + " "
-
+        return parse_subtitle_cues(subtitle_file).text()
     except Exception as e:
         print(f"❌ Error reading subtitle file: {e}")
         return ""
 
-    return text.strip()
-
-def extract_subtitle_text(subtitle_file: str, normalizer) -> str:
-    if not subtitle_file or not os.path.exists(subtitle_file):
+def extract_subtitle_text(subtitle_file, normalizer) -> str:
+    if not subtitle_file:
         return None
+    if not isinstance(subtitle_file, Cues) and not os.path.exists(subtitle_file):
+        return None
+    return clean_subtitle_text(parse_subtitle_cues(subtitle_file).text(), normalizer)
+
+def clean_subtitle_text(text: str, normalizer) -> str:
+    """Drop non-speech annotations, emails and URLs from subtitle text and normalize it."""
+    return clean_subtitle_texts([text], normalizer)[0]
 
-    with open(subtitle_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    text_lines = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        # Skip VTT header
-        if line.startswith("WEBVTT"):
-            continue
-        # Skip SRT indexes (lines that are only numbers)
-        if re.match(r'^\d+$', line):
-            continue
-        # Skip timestamp lines
-        if '-->' in line:
-            continue
-        text_lines.append(line)
-
-    text = " ".join(text_lines)
+def clean_subtitle_texts(texts, normalizer) -> list:
+    """clean_subtitle_text for many texts, normalized in one batch."""
+    return [text.strip() for text in normalizer.normalize_batch([strip_annotations(text) for text in texts])]
 
+def strip_annotations(text: str) -> str:
+    """Drop non-speech annotations, emails and URLs from subtitle text."""
     # Remove text between parentheses
     text = re.sub(r'\([^)]*\)', '', text)
 
@@ -192,34 +243,87 @@ def extract_subtitle_text(subtitle_file: str, normalizer) -> str:
     # Remove URLs
     text = re.sub(r'\b(?:http[s]?://|www\.)\S+\b', '', text)
 
-    # Normalize text (assuming normalizer is defined elsewhere)
-    text = normalizer.normalize(text)
+    return text
 
-    return text.strip()
-
-def download_video(video_id: str):
+def download_video(video_id: str, audio_format="best", pool=None):
     video_url = f"https://www.youtube.com/watch?v={video_id}"
     os.makedirs('videos', exist_ok=True)
-    output_template = f"videos/{video_id}.%(ext)s"
+    # Same options for every video, so the pooled client is reused
+    output_template = "videos/%(id)s.%(ext)s"
     ydl_opts = {
-        'format': 'bestaudio/best',         # Download best audio quality
+        # Best audio quality, or the smallest audio-only format that is still fine for 16 kHz ASR
+        'format': smallest_audio_selector() if audio_format == "smallest" else 'bestaudio/best',
         'outtmpl': output_template,
         'skip_download': False,             # Download the audio
         'quiet': True,
         'no_warnings': True,
     }
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with (pool or YDL_POOL).client(ydl_opts) as ydl:
         info = ydl.extract_info(video_url, download=True)
         audio_file = ydl.prepare_filename(info).replace('.%(ext)s', info['ext'])
 
         return audio_file
 
-def download_captions(video_id, lang, use_auto=True):
+def locate_audio(video_id: str, audio_format="smallest", pool=None):
+    """Resolve the media URL of a video's audio without downloading it, for time-range reads."""
     video_url = f"https://www.youtube.com/watch?v={video_id}"
+    ydl_opts = {
+        'format': smallest_audio_selector() if audio_format == "smallest" else 'bestaudio/best',
+        'quiet': True,
+        'no_warnings': True,
+    }
+
+    with (pool or YDL_POOL).client(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+        return RemoteAudio(info['url'], info.get('http_headers'))
+
+def acquire_audio(video_id, asr_mode="full", audio_format="best", audio_fetch="full"):
+    """
+    Get the audio of a video for ASR.
+
+    With `audio_fetch="ranges"`, modes that only decode subtitle-covered spans
+    ("cues" and "sequential") get a RemoteAudio that fetches those spans on
+    demand. Otherwise the whole audio is downloaded.
+    """
+    if audio_fetch == "ranges" and asr_mode in ("cues", "sequential"):
+        return locate_audio(video_id, audio_format)
+    return download_video(video_id, audio_format)
+
+def fetch_caption(tracks, subtitle_file, ext, ydl_opts, pool=None):
+    """
+    Download the caption track with extension `ext` (else the first one) to `subtitle_file`; returns (file, bytes).
+
+    The track is fetched by the pooled yt-dlp client for `ydl_opts`, so it uses
+    the same cookies, headers, proxy, socket timeout and connections as the extraction.
+    """
+    chosen = next((c for c in tracks if c["ext"] == ext), tracks[0])
+    subtitle_file = f"{subtitle_file}.{chosen['ext']}"
+    with (pool or YDL_POOL).client(ydl_opts) as ydl:
+        with ydl.urlopen(chosen["url"]) as response:
+            content = response.read()
+    with open(subtitle_file, "wb") as f:
+        f.write(content)
+    return subtitle_file, content
+
+def download_captions(video_id, lang, use_auto=True, info_cache=None, extract=None, governor=None):
+    """
+    Get the info dict of a video and its captions in `lang`.
+
+    The info dict comes from `info_cache` when it holds a fresh copy, so a
+    video seen by retrieve_metadata or an earlier run is not extracted again.
+    Caption URLs from a cached info dict may have expired; in that case the
+    video is extracted once more.
+    `extract` replaces the yt-dlp extractor (see youtube_extract), e.g. with a stub.
+    With a `governor`, extraction and caption downloads are paced and retried by it.
+
+    Returns:
+        tuple: (subtitle file, caption bytes, info dict); the first two are None without captions.
+    """
+    from yt_dlp.networking.exceptions import RequestError
+
     os.makedirs('subtitles', exist_ok=True)
-    output_template = f"subtitles/{video_id}.%(ext)s"
-    
+
     # yt-dlp language handling
     if lang == 'fa':
         lang_list = ['fa', 'fa-IR']
@@ -227,64 +331,57 @@ def download_captions(video_id, lang, use_auto=True):
         lang_list = [lang]
 
     ydl_opts = {
-        'outtmpl': output_template,
-        'writesubtitles': not use_auto,   # Only download manual captions
-        'writeautomaticsubs': use_auto,   # Only download auto captions
-        'subtitleslangs': lang_list,
         'skip_download': True,
         'cookies': 'cookies.txt',
         'quiet': True,
         'no_warnings': True,
     }
+    extract = extract or youtube_extract(ydl_opts)
+    fetch = lambda tracks, subtitle_file, ext: fetch_caption(tracks, subtitle_file, ext, ydl_opts)
+    if governor:
+        extract, fetch = governor.wrap(extract), governor.wrap(fetch)
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(video_url, download=True)
-
-        subtitle_file = None
-
-        if use_auto:
-            # --- Get AUTO captions ---
-            auto_caps = info.get("automatic_captions", {})
-            if lang in auto_caps:
-                # Prefer .srt format
-                chosen = next((c for c in auto_caps[lang] if c["ext"] == "srt"), auto_caps[lang][0])
-                url = chosen["url"]
-                subtitle_file = f"subtitles/{video_id}.auto.{lang}.{chosen['ext']}"
-                try:
-                    import requests
-                    r = requests.get(url)
-                    r.raise_for_status()
-                    with open(subtitle_file, "wb") as f:
-                        f.write(r.content)
-                except Exception as e:
-                    subtitle_file = None
-        else:
-            # --- Get MANUAL captions ---
-            for i in lang_list:
-                potential_file = f"subtitles/{video_id}.{i}.vtt"
-                if os.path.exists(potential_file):
-                    subtitle_file = potential_file
-                    break
-
-        return subtitle_file, info
-
-def check_language_ratio(text, no_english, english, max_lang_ratio, min_lang_ratio):
-    english_chars = sum(1 for char in text if char in string.ascii_letters)
-    total_chars = len(text)
-    if total_chars == 0:
+    info, cached = cached_extract_info(video_id, extract, info_cache)
+    while True:
+        try:
+            if use_auto:
+                # --- Get AUTO captions ---
+                auto_caps = info.get("automatic_captions", {})
+                if lang in auto_caps:
+                    # Prefer .srt format
+                    return (*fetch(auto_caps[lang], f"subtitles/{video_id}.auto.{lang}", "srt"), info)
+            else:
+                # --- Get MANUAL captions ---
+                manual_caps = info.get("subtitles", {})
+                for i in lang_list:
+                    potential_file = f"subtitles/{video_id}.{i}.vtt"
+                    if os.path.exists(potential_file):
+                        return potential_file, None, info
+                    if i in manual_caps:
+                        return (*fetch(manual_caps[i], f"subtitles/{video_id}.{i}", "vtt"), info)
+            return None, None, info
+        except (RequestError, OSError):
+            # Only a failed caption request is retried; anything else is a real error
+            if not cached:
+                return None, None, info
+            # The cached caption URL has probably expired
+            info, cached = cached_extract_info(video_id, extract, info_cache, refresh=True)
+
+def check_language_ratio(stats, no_english, english, max_lang_ratio, min_lang_ratio):
+    """Check the share of English letters among all characters, from text_stats."""
+    if stats["chars"] == 0:
         return True  # No text to check
 
-    ratio = english_chars / total_chars
+    ratio = stats["ascii_ratio"]
     if no_english and ratio > max_lang_ratio:
         return False
     if english and ratio < min_lang_ratio:
         return False
     return True
 
-def process_video(videoid, query_phrase, lang, model, normalizer, no_english, english, max_lang_ratio, min_lang_ratio, min_duration, min_wer, min_cer, min_punct, use_auto, use_asr):
-    """Process a single video to get metadata, download subtitles, and analyze punctuation."""
+def new_entry(videoid, query_phrase):
     url = make_video_url(videoid)
-    entry = {
+    return {
         "videoid": videoid,
         "videourl": url,
         "language": "",
@@ -307,98 +404,395 @@ def process_video(videoid, query_phrase, lang, model, normalizer, no_english, en
         "wer": "",
     }
 
-
+def fetch_and_prefilter(entry, lang, no_english, english, max_lang_ratio, min_lang_ratio, min_duration, min_punct, use_auto, info_cache=None, text_filter=None, governor=None):
+    """
+    Download subtitles and metadata into `entry` and run the cheap subtitle checks.
+
+    Returns:
+        Cues: The parsed subtitles if the video passed the checks and is worth an ASR pass, else None.
+    """
+    videoid = entry["videoid"]
+    # First request: Get subtitle info
+    subtitle_filename, subtitle_content, metadata = download_captions(videoid, lang, use_auto=use_auto, info_cache=info_cache, governor=governor)
+    if "language" in metadata:
+        entry["language"] = metadata["language"]
+        if metadata["language"] != lang:
+            return None   # stop further processing
+    manu_lang = list(metadata['automatic_captions'].keys())
+    has_subtitle = lang in manu_lang
+    entry["sub"] = str(has_subtitle)
     try:
-        # First request: Get subtitle info
-        subtitle_filename, metadata = download_captions(videoid, lang, use_auto=use_auto)
-        if "language" in metadata:
-            entry["language"] = metadata["language"]
-            if metadata["language"] != lang:
-                return entry   # stop further processing
-        manu_lang = list(metadata['automatic_captions'].keys())
-        has_subtitle = lang in manu_lang
-        entry["sub"] = str(has_subtitle)
-        try:
-            entry.update({
-                'title': metadata.get('title', ''),
-                'channel': metadata.get('channel', ''),
-                'channel_id': metadata.get('channel_id', ''),
-                'channel_url': metadata.get('channel_url', ''),
-                'channel_follower_count': metadata.get('channel_follower_count', ''),
-                'upload_date': metadata.get('upload_date', ''),
-                'uploader_id': metadata.get('uploader_id', ''),
-                'uploader_url': metadata.get('uploader_url', ''),
-                'duration': metadata.get('duration', ''),
-                'view_count': metadata.get('view_count', ''),
-                'categories': metadata.get('categories', []),
-                'like_count': metadata.get('like_count', '')
-            })
-        except Exception as e:
-            print(f"❌ Error updating metadata: {e}") 
-
-        if has_subtitle and subtitle_filename:
-            print(f"❕ Downloaded subtitle for video {videoid} to {subtitle_filename}")
-
-            # Extract text and count punctuations
-            if Path(subtitle_filename).exists():
-                subtitle_text = extract_text_from_subtitle(subtitle_filename)
-                common_punct = count_common_punctuations(subtitle_text, lang)
-                other_punct = count_other_punctuations(subtitle_text, lang)
-                punct_count = common_punct + other_punct
-                entry["punctuation_count"] = punct_count
-                
-                # Calculate total subtitle duration
-                subtitle_duration = calculate_subtitle_duration(subtitle_filename)
-                entry["subtitle_duration"] = round(subtitle_duration, 2)
-                
-                if not check_language_ratio(subtitle_text, no_english, english, max_lang_ratio, min_lang_ratio):
-                    return entry
-
-                if (entry["subtitle_duration"] > min_duration) and (common_punct > min_punct or other_punct > min_punct):
-                    if use_asr:
-                        print(f"❕ Downloading and processing audio for video {videoid}")
-                        print(url)
-                        audio_file = download_video(videoid)
-                        auto_transcription = transcribe_audio(audio_file, model, normalizer)
-                        
-                        # Save ASR transcript to a text file
-                        os.makedirs('transcripts', exist_ok=True)
-                        transcript_filepath = os.path.join('transcripts', f'{videoid}.txt')
-                        with open(transcript_filepath, 'w', encoding='utf-8') as f:
-                            f.write(auto_transcription)
-                        
-                        manual_transcription = extract_subtitle_text(subtitle_filename, normalizer)
-                        word_error_rate = wer(manual_transcription, auto_transcription)
-                        character_error_rate = cer(manual_transcription, auto_transcription)
-                        entry["wer"] = word_error_rate
-                        entry["cer"] = character_error_rate
-                        if word_error_rate < min_wer and character_error_rate < min_cer:
-                            entry["good_sub"] = str(True)
-
-
-    except subprocess.CalledProcessError as e:
+        entry.update({
+            'title': metadata.get('title', ''),
+            'channel': metadata.get('channel', ''),
+            'channel_id': metadata.get('channel_id', ''),
+            'channel_url': metadata.get('channel_url', ''),
+            'channel_follower_count': metadata.get('channel_follower_count', ''),
+            'upload_date': metadata.get('upload_date', ''),
+            'uploader_id': metadata.get('uploader_id', ''),
+            'uploader_url': metadata.get('uploader_url', ''),
+            'duration': metadata.get('duration', ''),
+            'view_count': metadata.get('view_count', ''),
+            'categories': metadata.get('categories', []),
+            'like_count': metadata.get('like_count', '')
+        })
+    except Exception as e:
+        print(f"❌ Error updating metadata: {e}") 
+
+    if has_subtitle and subtitle_filename:
+        print(f"❕ Downloaded subtitle for video {videoid} to {subtitle_filename}")
+
+        # Parse once (from memory when the captions were just fetched) and derive everything from the cues
+        if subtitle_content is not None or Path(subtitle_filename).exists():
+            cues = parse_subtitle_cues(subtitle_content if subtitle_content is not None else subtitle_filename)
+            subtitle_text = extract_text_from_subtitle(cues)
+            # Every text statistic in one pass over the code points
+            stats = text_stats(subtitle_text, lang, cues.texts)
+            common_punct, other_punct = stats["common_punct"], stats["other_punct"]
+            punct_count = common_punct + other_punct
+            entry["punctuation_count"] = punct_count
+            
+            # Calculate total subtitle duration
+            subtitle_duration = calculate_subtitle_duration(cues)
+            entry["subtitle_duration"] = round(subtitle_duration, 2)
+            
+            if not check_language_ratio(stats, no_english, english, max_lang_ratio, min_lang_ratio):
+                return None
+            rejection = text_filter.rejection(stats) if text_filter else None
+            if rejection:
+                print(f"❕ Skipping {videoid}: {rejection}")
+                return None
+
+            if (entry["subtitle_duration"] > min_duration) and (common_punct > min_punct or other_punct > min_punct):
+                return cues
+    return None
+
+def save_transcript(videoid, auto_transcription):
+    # Save ASR transcript to a text file
+    os.makedirs('transcripts', exist_ok=True)
+    transcript_filepath = os.path.join('transcripts', f'{videoid}.txt')
+    with open(transcript_filepath, 'w', encoding='utf-8') as f:
+        f.write(auto_transcription)
+
+def transcribe_videos(videos, model, normalizer, asr_mode="full", batch_size=8, vad=False):
+    """
+    Transcribe (videoid, audio_file, subtitles) triples and save their transcripts.
+
+    In "full" mode the whole audio is decoded. In "cues" mode only the spans
+    under subtitle cues are decoded, and per-cue WER/CER are saved to
+    `transcripts/<videoid>.cues.csv`; the returned transcript is the cue
+    hypotheses joined in order.
+
+    Returns:
+        list: The normalized ASR transcript of each video.
+    """
+    audio_files = [audio_file for _, audio_file, _ in videos]
+    if asr_mode == "cues":
+        cue_lists = [parse_subtitle_cues(subtitle_file) for _, _, subtitle_file in videos]
+        hypotheses = transcribe_cues(audio_files, cue_lists, model, normalizer, batch_size=batch_size)
+        transcripts = []
+        for (videoid, _, _), cues, cue_hypotheses in zip(videos, cue_lists, hypotheses):
+            save_cue_scores(videoid, score_cues(cues, cue_hypotheses, normalizer))
+            transcripts.append(' '.join(h for h in cue_hypotheses if h))
+    else:
+        transcripts = transcribe_audio_files(audio_files, model, normalizer, batch_size=batch_size, vad=vad)
+
+    for (videoid, _, _), auto_transcription in zip(videos, transcripts):
+        save_transcript(videoid, auto_transcription)
+    return transcripts
+
+def window_errors(reference, hypothesis):
+    """(word_errors, ref_words, char_errors, ref_chars) of one window, the counts behind jiwer's wer/cer."""
+    import jiwer
+
+    if not reference:
+        # Everything the model heard here is an insertion
+        return len(hypothesis.split()), 0, len(hypothesis), 0
+    words = jiwer.process_words(reference, hypothesis)
+    chars = jiwer.process_characters(reference, hypothesis)
+    return (words.substitutions + words.deletions + words.insertions,
+            words.substitutions + words.deletions + words.hits,
+            chars.substitutions + chars.deletions + chars.insertions,
+            chars.substitutions + chars.deletions + chars.hits)
+
+def verify_sequentially(videoid, audio_file, subtitle_file, model, normalizer, min_wer, min_cer, batch_size=8):
+    """
+    Accept or reject a video from a random sample of subtitle-covered windows.
+
+    Cues are grouped into windows of up to 30 s that are decoded in random
+    order until the WER/CER confidence bounds clear the thresholds (see
+    sequential_verify). The decoded windows are saved as the transcript. With
+    a RemoteAudio source only the sampled windows are ever fetched.
+    """
+    cues = parse_subtitle_cues(subtitle_file)
+    windows = group_cues(cues)
+    source = open_audio(audio_file)
+    hypotheses = {}
+
+    def score_windows(batch):
+        transcriber = BatchedTranscriber(model, batch_size=batch_size)
+        for w in batch:
+            spans = read_spans(source, [cues[idx][:2] for idx in windows[w]])
+            for idx, samples in zip(windows[w], spans):
+                transcriber.add((w, idx), samples)
+        transcriptions = transcriber.flush()
+
+        texts = [' '.join(' '.join(transcriptions.get((w, idx), [])) for idx in windows[w]) for w in batch]
+        normalized = normalize_hypotheses([re.sub(' +', ' ', text).strip() for text in texts], normalizer)
+        references = clean_subtitle_texts([' '.join(cues[idx][2] for idx in windows[w]) for w in batch], normalizer)
+        scores = []
+        for w, hypothesis, reference in zip(batch, normalized, references):
+            hypotheses[w] = hypothesis
+            scores.append(window_errors(reference, hypotheses[w]))
+        return scores
+
+    result = sequential_verify(len(windows), score_windows, min_wer, min_cer, seed=videoid)
+    save_transcript(videoid, ' '.join(hypotheses[w] for w in sorted(hypotheses) if hypotheses[w]))
+    print(f"❕ Verified {videoid} from {result['windows_decoded']}/{result['windows_total']} windows: "
+          f"{'accepted' if result['accepted'] else 'rejected'}{' early' if result['early'] else ''}")
+    return result
+
+def apply_verification(entry, result):
+    entry["wer"] = result["wer"]
+    entry["cer"] = result["cer"]
+    if result["accepted"]:
+        entry["good_sub"] = str(True)
+
+def score_transcription(entry, subtitles, auto_transcription, normalizer, min_wer, min_cer, exact_scores=False):
+    """
+    Compare the ASR transcript with the subtitles and mark the video good if both error rates are low enough.
+
+    Error rates are exact (and equal to jiwer's) below the thresholds. Above
+    them the edit distance stops as soon as the video is known to fail, and a
+    lower bound that is still above the threshold is recorded, unless
+    `exact_scores` is set.
+    """
+    manual_transcription = extract_subtitle_text(subtitles, normalizer)
+    word_error_rate, _ = fast_wer(manual_transcription, auto_transcription, None if exact_scores else min_wer)
+    character_error_rate, _ = fast_cer(manual_transcription, auto_transcription, None if exact_scores else min_cer)
+    entry["wer"] = word_error_rate
+    entry["cer"] = character_error_rate
+    if word_error_rate < min_wer and character_error_rate < min_cer:
+        entry["good_sub"] = str(True)
+
+def report_video_error(videoid, e):
+    """Print a processing error. Returns True if YouTube asked us to prove we are not a bot (and no governor handled it)."""
+    if isinstance(e, subprocess.CalledProcessError):
         print(f"❌ Error processing video {videoid}. stdout: {e.stdout}, stderr: {e.stderr}")
+        return False
+    print(f"Unexpected error processing video {videoid}: {str(e)}")
+    return "Sign in to confirm you’re not a bot" in str(e)
+
+def process_video(videoid, query_phrase, lang, model, normalizer, no_english, english, max_lang_ratio, min_lang_ratio, min_duration, min_wer, min_cer, min_punct, use_auto, use_asr, asr_batch_size=8, asr_mode="full", audio_format="best", audio_fetch="full", vad=False, info_cache=None, exact_scores=False, text_filter=None, governor=None):
+    """
+    Process a single video to get metadata, download subtitles, and analyze punctuation.
+
+    Raises CircuitOpenError instead of returning an entry when YouTube blocks
+    the run, so the video is retried by the next run.
+    """
+    entry = new_entry(videoid, query_phrase)
+
+    try:
+        subtitles = fetch_and_prefilter(entry, lang, no_english, english, max_lang_ratio, min_lang_ratio, min_duration, min_punct, use_auto, info_cache=info_cache, text_filter=text_filter, governor=governor)
+        if subtitles and use_asr:
+            print(f"❕ Downloading and processing audio for video {videoid}")
+            print(entry["videourl"])
+            audio_file = governed(governor, acquire_audio, videoid, asr_mode, audio_format, audio_fetch)
+            if asr_mode == "sequential":
+                result = verify_sequentially(videoid, audio_file, subtitles, model, normalizer, min_wer, min_cer, batch_size=asr_batch_size)
+                apply_verification(entry, result)
+            else:
+                auto_transcription = transcribe_videos([(videoid, audio_file, subtitles)], model, normalizer, asr_mode=asr_mode, batch_size=asr_batch_size, vad=vad)[0]
+                score_transcription(entry, subtitles, auto_transcription, normalizer, min_wer, min_cer, exact_scores)
+
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Unexpected error processing video {videoid}: {str(e)}")
-        if "Sign in to confirm you’re not a bot" in str(e):
-            print("❌ Too many bot errors, exiting.")
-            exit(1)
+        if report_video_error(videoid, e):
+            raise CircuitOpenError("YouTube asked to sign in") from e
 
     return entry
 
-def retrieve_subtitle_exists(lang, fn_videoid, model, normalizer, outdir="sub", wait_sec=0.2, fn_checkpoint=None, no_english=False, english=False, max_lang_ratio=0.5, min_lang_ratio=0.5, min_duration=10, min_wer=0.8, min_cer=0.2, min_punct=5, use_auto=True, use_asr=True):
+def governed(governor, func, *args):
+    """Call `func` through the request governor, if there is one."""
+    return governor.call(func, *args) if governor else func(*args)
+
+def run_video_pipeline(video_ids, video_kwargs, on_entry, wait_sec=0.2, caption_workers=4, audio_workers=2, score_workers=1, queue_size=8, asr_videos=4):
+    """
+    Run process_video as overlapping stages connected by bounded queues.
+
+    Caption fetch + prefilter and audio download run in I/O thread pools, decode
+    + ASR runs in a single worker that owns the model, and WER/CER scoring runs
+    in its own pool, so downloads continue while the model is busy. The ASR
+    worker takes up to `asr_videos` downloaded videos at once and batches their
+    windows together. Every video goes through exactly the steps of
+    process_video and yields the same entry; entries are passed to `on_entry`
+    in completion order. If YouTube blocks the run, the videos still in flight
+    are dropped (not passed to `on_entry`) and CircuitOpenError is raised.
+    """
+    kwargs = dict(video_kwargs)
+    model, normalizer = kwargs.pop("model"), kwargs.pop("normalizer")
+    min_wer, min_cer, use_asr = kwargs.pop("min_wer"), kwargs.pop("min_cer"), kwargs.pop("use_asr")
+    asr_batch_size, vad = kwargs.pop("asr_batch_size", 8), kwargs.pop("vad", False)
+    asr_mode, exact_scores = kwargs.pop("asr_mode", "full"), kwargs.pop("exact_scores", False)
+    audio_format, audio_fetch = kwargs.pop("audio_format", "best"), kwargs.pop("audio_fetch", "full")
+    governor = kwargs.get("governor")
+
+    def guarded(step):
+        def run(job):
+            try:
+                return step(job)
+            except Exception as e:
+                if isinstance(e, CircuitOpenError) or report_video_error(job["entry"]["videoid"], e):
+                    # Stop the feed; this video and every other one in flight are dropped, not written
+                    pipeline.stop.set()
+                    return DROP
+                return None
+        return run
+
+    def captions(job):
+        try:
+            job["subtitle"] = fetch_and_prefilter(job["entry"], **kwargs)
+        finally:
+            if wait_sec > 0.01 and not governor:
+                time.sleep(wait_sec)
+        return job if job["subtitle"] and use_asr else None
+
+    def audio(job):
+        videoid = job["entry"]["videoid"]
+        print(f"❕ Downloading and processing audio for video {videoid}")
+        print(job["entry"]["videourl"])
+        job["audio"] = governed(governor, acquire_audio, videoid, asr_mode, audio_format, audio_fetch)
+        return job
+
+    def asr(job):
+        videoid = job["entry"]["videoid"]
+        if asr_mode == "sequential":
+            job["verification"] = verify_sequentially(videoid, job["audio"], job["subtitle"], model, normalizer, min_wer, min_cer, batch_size=asr_batch_size)
+        else:
+            job["transcript"] = transcribe_videos([(videoid, job["audio"], job["subtitle"])], model, normalizer, asr_mode=asr_mode, batch_size=asr_batch_size, vad=vad)[0]
+        return job
+
+    def asr_batch(jobs):
+        if asr_mode == "sequential":
+            # Each video decides on its own how many windows to decode
+            return [guarded(asr)(job) for job in jobs]
+        try:
+            videos = [(job["entry"]["videoid"], job["audio"], job["subtitle"]) for job in jobs]
+            transcripts = transcribe_videos(videos, model, normalizer, asr_mode=asr_mode, batch_size=asr_batch_size, vad=vad)
+        except Exception:
+            # Find the video that broke the batch by transcribing them one by one
+            return [guarded(asr)(job) for job in jobs]
+        for job, transcript in zip(jobs, transcripts):
+            job["transcript"] = transcript
+        return jobs
+
+    def score(job):
+        if "verification" in job:
+            apply_verification(job["entry"], job["verification"])
+        else:
+            score_transcription(job["entry"], job["subtitle"], job["transcript"], normalizer, min_wer, min_cer, exact_scores)
+        return None
+
+    pipeline = StagedPipeline([
+        Stage("captions", guarded(captions), caption_workers),
+        Stage("audio", guarded(audio), audio_workers),
+        Stage("asr", asr_batch, 1, batch_size=asr_videos),
+        Stage("score", guarded(score), score_workers),
+    ], queue_size=queue_size)
+
+    jobs = ({"entry": new_entry(videoid, query_phrase)} for videoid, query_phrase in video_ids)
+    for job in pipeline.run(jobs):
+        on_entry(job["entry"])
+
+    if pipeline.stop.is_set():
+        raise CircuitOpenError("YouTube kept blocking requests")
+
+def process_videos(video_ids, video_kwargs, on_entry, wait_sec=0.2, pipeline=None):
+    """Run process_video over (videoid, query_phrase) pairs, one by one or through the staged pipeline."""
+    if pipeline:
+        run_video_pipeline(video_ids, video_kwargs, on_entry, wait_sec=wait_sec, **pipeline)
+        return
+
+    for videoid, query_phrase in video_ids:
+        entry = process_video(videoid=videoid, query_phrase=query_phrase, **video_kwargs)
+        on_entry(entry)
+
+        # The governor paces requests itself
+        if wait_sec > 0.01 and not video_kwargs.get("governor"):
+            time.sleep(wait_sec)
+
+def drain_queue(fn_queue, worker_id, video_ids, sink, video_kwargs, wait_sec=0.2, processed_videoids=(), pipeline=None, batch_size=10, lease_seconds=900):
+    """
+    Process videos claimed from a shared job queue until it is empty.
+
+    The video list is enqueued first (already queued IDs are ignored), so every
+    worker can be started with the same arguments. Results of a claimed batch
+    are flushed to disk before the batch is marked done. While the batch is in
+    flight a heartbeat keeps its leases alive, however long its videos take;
+    if the worker dies, its lease expires and another worker picks the batch up.
+    """
+    if pipeline:
+        # Claim enough videos to keep every stage of the pipeline busy
+        batch_size = max(batch_size, 4 * (pipeline["caption_workers"] + pipeline["audio_workers"]))
+
+    with JobQueue(fn_queue) as queue, LeaseHeartbeat(fn_queue, QUEUE_STAGE, worker_id, lease_seconds) as heartbeat:
+        queue.enqueue(QUEUE_STAGE, video_ids)
+        pbar = tqdm()
+        while True:
+            batch = queue.claim(QUEUE_STAGE, worker_id, batch_size=batch_size, lease_seconds=lease_seconds)
+            if not batch:
+                break
+            # Finished videos stay leased too until they are flushed and marked done
+            heartbeat.hold(videoid for videoid, _ in batch)
+            remaining = {videoid for videoid, _ in batch}
+
+            def on_entry(entry):
+                sink.write(entry)
+                remaining.discard(entry["videoid"])
+                pbar.update(1)
+
+            todo = [(videoid, query_phrase) for videoid, query_phrase in batch if videoid not in processed_videoids]
+            try:
+                process_videos(todo, video_kwargs, on_entry, wait_sec=wait_sec, pipeline=pipeline)
+            except CircuitOpenError:
+                # Keep what was finished; the rest of the batch goes to another worker when its lease expires
+                sink.flush()
+                queue.complete(QUEUE_STAGE, worker_id, [videoid for videoid, _ in batch if videoid not in remaining or videoid in processed_videoids])
+                heartbeat.hold(())
+                raise
+            sink.flush()
+            queue.complete(QUEUE_STAGE, worker_id, [videoid for videoid, _ in batch])
+            heartbeat.hold(())
+        pbar.close()
+
+def retrieve_subtitle_exists(lang, fn_videoid, model, normalizer, outdir="sub", wait_sec=0.2, fn_checkpoint=None, no_english=False, english=False, max_lang_ratio=0.5, min_lang_ratio=0.5, min_duration=10, min_wer=0.8, min_cer=0.2, min_punct=5, use_auto=True, use_asr=True, seen_index=None, fn_queue=None, worker_id=None, lease_seconds=900, pipeline=None, asr_batch_size=8, asr_mode="full", audio_format="best", audio_fetch="full", vad=False, info_cache=None, info_cache_ttl_hours=168, exact_scores=False, text_filter=None, governor=None):
+    """
+    Process every video of a video ID list and append the results to `<outdir>/<name>.csv`.
+
+    With `fn_queue`, videos are claimed from that shared job queue under
+    leases of `lease_seconds` (see drain_queue).
+    `pipeline` is None to process videos one at a time, or a dict with the
+    `caption_workers`, `audio_workers`, `score_workers`, `queue_size` and
+    `asr_videos` of the staged pipeline (see run_video_pipeline).
+    `info_cache` is the path of an InfoCache shared with retrieve_metadata.
+    `text_filter` is a TextFilter checked on the subtitle text before any audio is fetched.
+    `governor` is a RequestGovernor that paces YouTube requests instead of sleeping `wait_sec`
+    after every video; when it gives up, progress is saved and the run stops.
+    """
     fn_sub = Path(outdir) / f"{Path(fn_videoid).stem}.csv"
+    if fn_queue:
+        # Workers sharing a queue each append to their own output file
+        worker_id = worker_id or default_worker_id()
+        worker_name = re.sub(r'[^\w.-]', '-', worker_id)
+        fn_sub = Path(outdir) / f"{Path(fn_videoid).stem}.{worker_name}.csv"
     fn_sub.parent.mkdir(parents=True, exist_ok=True)
 
-    # Load checkpoint if provided
-    subtitle_exists = []
-    processed_videoids = set()
-    if fn_checkpoint and Path(fn_checkpoint).exists():
-        with open(fn_checkpoint, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                subtitle_exists.append(row)
-                processed_videoids.add(row["videoid"])
+    # Resume from the checkpoint if provided, reading back only the video IDs
+    resume = bool(fn_checkpoint and Path(fn_checkpoint).exists())
+    if resume and Path(fn_checkpoint).resolve() != fn_sub.resolve():
+        shutil.copyfile(fn_checkpoint, fn_sub)
+    processed_videoids = read_column(fn_sub, "videoid") if resume else set()
 
     # Load video ID list
     video_ids = []
@@ -407,69 +801,66 @@ def retrieve_subtitle_exists(lang, fn_videoid, model, normalizer, outdir="sub",
         for row in reader:
             video_ids.append((row["video_id"], row['word']))
 
-    # Define fieldnames for CSV
-    fieldnames = ["videoid", 
-                  "videourl", 
-                  "language",
-                  "title", 
-                  "good_sub", 
-                  "sub",
-                  "wer", 
-                  "cer",
-                  "channel", 
-                  "channel_id", 
-                  "channel_url",
-                  "channel_follower_count", 
-                  "view_count", 
-                  "like_count", 
-                  "uploader_id",
-                  "uploader_url",
-                  "upload_date", 
-                  "duration", 
-                  "punctuation_count", 
-                  "subtitle_duration",
-                  "query_phrase",
-                  "categories", 
-                  ]
+    # Skip videos already processed by any earlier run sharing the index
+    index = SeenIndex(seen_index, "retrieve_subtitled_videos") if seen_index else None
+    if index:
+        query_phrases = dict(reversed(video_ids))
+        video_ids = [(v, query_phrases[v]) for v in index.filter_unseen(v for v, _ in video_ids)]
 
+    # Append results every 50 videos (or 30 seconds) instead of rewriting the file
+    on_flush = (lambda batch: index.add(e["videoid"] for e in batch)) if index else None
+    sink = CsvResultSink(fn_sub, FIELDNAMES, batch_size=50, resume=resume, on_flush=on_flush)
+    cache = InfoCache(info_cache, ttl_seconds=info_cache_ttl_hours * 3600) if info_cache else None
 
     # Process videos
-    for videoid, query_phrase in tqdm(video_ids):
-        if videoid in processed_videoids:
-            continue
-
-        entry = process_video(videoid=videoid,
-                              query_phrase=query_phrase,
-                              lang=lang,
-                              model=model,
-                              normalizer=normalizer,
-                              no_english=no_english,
-                              english=english,
-                              max_lang_ratio=max_lang_ratio,
-                              min_lang_ratio=min_lang_ratio,
-                              min_duration=min_duration,
-                              min_wer=min_wer,
-                              min_cer=min_cer,
-                              min_punct=min_punct,
-                              use_auto=use_auto,
-                              use_asr=use_asr)
-        subtitle_exists.append(entry)
-
-        if wait_sec > 0.01:
-            time.sleep(wait_sec)
-
-        # Write current result every 50 videos
-        if len(subtitle_exists) % 50 == 0:
-            with open(fn_sub, "w", newline="", encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(subtitle_exists)
-
-    # Final write
-    with open(fn_sub, "w", newline="", encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(subtitle_exists)
+    video_kwargs = dict(lang=lang,
+                        model=model,
+                        normalizer=normalizer,
+                        no_english=no_english,
+                        english=english,
+                        max_lang_ratio=max_lang_ratio,
+                        min_lang_ratio=min_lang_ratio,
+                        min_duration=min_duration,
+                        min_wer=min_wer,
+                        min_cer=min_cer,
+                        min_punct=min_punct,
+                        use_auto=use_auto,
+                        use_asr=use_asr,
+                        asr_batch_size=asr_batch_size,
+                        asr_mode=asr_mode,
+                        audio_format=audio_format,
+                        audio_fetch=audio_fetch,
+                        vad=vad,
+                        info_cache=cache,
+                        exact_scores=exact_scores,
+                        text_filter=text_filter,
+                        governor=governor)
+    try:
+        if fn_queue:
+            drain_queue(fn_queue, worker_id, video_ids, sink, video_kwargs, wait_sec=wait_sec, processed_videoids=processed_videoids, pipeline=pipeline, lease_seconds=lease_seconds)
+        else:
+            video_ids = [(videoid, query_phrase) for videoid, query_phrase in video_ids if videoid not in processed_videoids]
+            pbar = tqdm(total=len(video_ids))
+
+            def on_entry(entry):
+                sink.write(entry)
+                pbar.update(1)
+
+            process_videos(video_ids, video_kwargs, on_entry, wait_sec=wait_sec, pipeline=pipeline)
+            pbar.close()
+    except CircuitOpenError as e:
+        print(f"❌ Stopping: {e}. Progress is saved; resume later with --checkpoint {fn_sub}")
+    finally:
+        # Final write, also when stopping on bot detection
+        sink.close()
+        if governor:
+            print(governor.report())
+        if index:
+            index.close()
+        if cache:
+            print(cache.report())
+            cache.close()
+        YDL_POOL.close()
 
     return fn_sub
 
@@ -482,13 +873,44 @@ def main():
     parser.add_argument("--lang", type=str, required=True, help="language code (ja, en, ...)")
     parser.add_argument("--videoidlist", type=str, required=True, help="filename of video ID list")
     parser.add_argument("--model", type=str, default=None, help="Path to local .nemo model or Hugging Face model name")
+    parser.add_argument("--asr_backend", type=str, choices=BACKENDS, default="nemo", help="'nemo' runs --model with NeMo; 'onnx' runs a model directory written by 'python -m scripts.asr_backends' with onnxruntime (int8, CPU)")
+    parser.add_argument("--asr_threads", type=int, default=None, help="CPU threads for the onnx backend (default: onnxruntime decides)")
+    parser.add_argument("--asr_server", type=str, default=None, help="URL of a running scripts.asr_server to send audio to instead of loading --model, e.g. http://127.0.0.1:8765")
     parser.add_argument("--outdir", type=str, default="output", help="dirname to save results")
     parser.add_argument("--use_auto", action='store_true', default=False, help="Whether to download automatic subtitles (default: False).")
     parser.add_argument("--use_asr", action='store_true', default=False, help="Whether to download video and pass through ASR (default: False).")
     parser.add_argument("--checkpoint", type=str, default=None, help="filename of list checkpoint (for restart retrieving)")
+    parser.add_argument("--seen_index", type=str, default=None, help="SQLite index of video IDs already processed, shared across shards and sessions")
+    parser.add_argument("--queue", type=str, default=None, help="Shared job queue database; workers on any machine drain the same video list")
+    parser.add_argument("--worker_id", type=str, default=None, help="Name of this worker in the job queue (default: hostname:pid)")
+    parser.add_argument("--lease_minutes", type=float, default=15, help="Lease on claimed videos; renewed while the worker runs, so it only bounds how long a dead worker's videos wait")
+    parser.add_argument("--info_cache", type=str, default=None, help="On-disk cache of video info dicts shared with retrieve_metadata, so reruns skip extraction")
+    parser.add_argument("--info_cache_ttl_hours", type=float, default=168, help="Age after which a cached info dict is extracted again")
+    parser.add_argument("--rate", type=float, default=5.0, help="Initial YouTube requests per second, shared by all workers; adapts to throttling")
+    parser.add_argument("--max_rate", type=float, default=20.0, help="Highest YouTube requests per second")
+    parser.add_argument("--cooldown_minutes", type=float, default=10, help="Pause after YouTube asks to sign in (doubles each time)")
+    parser.add_argument("--max_trips", type=int, default=3, help="Sign-in pauses tolerated before saving progress and stopping")
+    parser.add_argument("--pipeline", action='store_true', default=False, help="Overlap caption fetch, audio download, ASR and scoring in concurrent stages")
+    parser.add_argument("--caption_workers", type=int, default=4, help="Threads fetching and prefiltering captions in --pipeline mode")
+    parser.add_argument("--audio_workers", type=int, default=2, help="Threads downloading audio in --pipeline mode")
+    parser.add_argument("--score_workers", type=int, default=1, help="Threads computing WER/CER in --pipeline mode")
+    parser.add_argument("--asr_videos", type=int, default=4, help="Videos whose windows are batched together by the ASR stage in --pipeline mode")
+    parser.add_argument("--asr_batch_size", type=int, default=8, help="Number of 30 s audio windows per ASR model call")
+    parser.add_argument("--asr_mode", type=str, choices=["full", "cues", "sequential"], default="full", help="Decode the whole audio, only the spans under subtitle cues (also saves per-cue WER/CER), or random cue windows until the WER/CER confidence bounds clear the thresholds")
+    parser.add_argument("--vad", action='store_true', default=False, help="With --asr_mode full, skip silence and cut ASR windows at pauses instead of every 30 s")
+    parser.add_argument("--audio_format", type=str, choices=["best", "smallest"], default="best", help="Download the best audio, or the smallest audio-only format that is still fine for 16 kHz ASR")
+    parser.add_argument("--audio_fetch", type=str, choices=["full", "ranges"], default="full", help="Download the whole audio, or with --asr_mode cues/sequential fetch only the time ranges that are decoded (needs ffmpeg)")
+    parser.add_argument("--queue_size", type=int, default=8, help="Capacity of the queues between pipeline stages")
+    parser.add_argument("--min_script_ratio", type=float, default=0.0, help="Minimum share of subtitle letters in the scripts of --lang, e.g. 0.5 (default 0: off)")
+    parser.add_argument("--scripts", type=str, default=None, help=f"Comma-separated scripts of --lang, for languages without a default ({', '.join(SCRIPTS)})")
+    parser.add_argument("--max_digit_ratio", type=float, default=1.0, help="Maximum share of digits among non-space subtitle characters, e.g. 0.3 (default 1: off)")
+    parser.add_argument("--max_repeat_ratio", type=float, default=1.0, help="Maximum share of subtitle lines that repeat an earlier line, e.g. 0.5 (default 1: off)")
     parser.add_argument("--min_duration", type=float, default=10.0, help="Minimum subtitle duration in seconds.")
     parser.add_argument("--min_wer", type=float, default=0.3, help="Maximum word error rate.")
     parser.add_argument("--min_cer", type=float, default=0.2, help="Maximum character error rate.")
+    parser.add_argument("--norm_workers", type=int, default=0, help="Worker processes for text normalization cache misses (0 to normalize in the main process); only used by batches of 16 or more texts, as with --asr_mode cues or --norm_split_sentences")
+    parser.add_argument("--norm_split_sentences", action='store_true', default=False, help="Normalize one sentence at a time so repeated sentences come from the cache. Without it, --asr_mode full gets no normalization speedup (each video is one transcript and one subtitle text). Faster, but may change the normalization of abbreviations such as 'Dr.' or 'No. 5' and hence WER/CER")
+    parser.add_argument("--exact_scores", action='store_true', default=False, help="Compute exact WER/CER for rejected videos too, instead of stopping once they exceed the thresholds")
     parser.add_argument("--min_punct", type=int, default=0, help="Minimum common punctuation count.")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--no_english", action='store_true', help="Check if text has less than max_lang_ratio of English characters")
@@ -503,18 +925,24 @@ def main():
     if not args.no_english and '--max_lang_ratio' in sys.argv:
         parser.error("--max_lang_ratio can only be used with --no_english")
 
-    if args.use_asr and not args.model:
-        parser.error("--model is required when --use_asr is set.")
+    if args.use_asr and not (args.model or args.asr_server):
+        parser.error("--model or --asr_server is required when --use_asr is set.")
+
+    text_filter = TextFilter(min_script_ratio=args.min_script_ratio, max_digit_ratio=args.max_digit_ratio,
+                             max_repeat_ratio=args.max_repeat_ratio,
+                             scripts=args.scripts.split(",") if args.scripts else None)
 
     model = None
     normalizer = None
     if args.use_asr:
-        from nemo.collections.asr.models import ASRModel
-        import librosa
-        from jiwer import wer, cer
         from scripts.normalizer import TextNormalizer
-        model = load_model(args.model)
-        normalizer = TextNormalizer(lang=args.lang)
+        if args.asr_server:
+            from scripts.asr_server import RemoteASRModel
+            model = RemoteASRModel(args.asr_server)
+            print(f"❕ Using ASR server at {args.asr_server}: {model.status()}")
+        else:
+            model = load_model(args.model, backend=args.asr_backend, threads=args.asr_threads)
+        normalizer = TextNormalizer(lang=args.lang, workers=args.norm_workers, split_sentences=args.norm_split_sentences)
     filename = retrieve_subtitle_exists(
         lang=args.lang,
         fn_videoid=args.videoidlist,
@@ -531,8 +959,31 @@ def main():
         min_cer=args.min_cer,
         min_punct=args.min_punct,
         use_auto=args.use_auto,
-        use_asr=args.use_asr
+        use_asr=args.use_asr,
+        seen_index=args.seen_index,
+        fn_queue=args.queue,
+        worker_id=args.worker_id,
+        lease_seconds=args.lease_minutes * 60,
+        pipeline=dict(caption_workers=args.caption_workers,
+                      audio_workers=args.audio_workers,
+                      score_workers=args.score_workers,
+                      queue_size=args.queue_size,
+                      asr_videos=args.asr_videos) if args.pipeline else None,
+        asr_batch_size=args.asr_batch_size,
+        asr_mode=args.asr_mode,
+        audio_format=args.audio_format,
+        audio_fetch=args.audio_fetch,
+        vad=args.vad,
+        info_cache=args.info_cache,
+        info_cache_ttl_hours=args.info_cache_ttl_hours,
+        exact_scores=args.exact_scores,
+        text_filter=text_filter if text_filter.enabled else None,
+        governor=RequestGovernor(rate=args.rate, max_rate=args.max_rate, cooldown=args.cooldown_minutes * 60,
+                                 max_trips=args.max_trips)
     )
+    if normalizer:
+        print(f"❕ {normalizer.hits}/{normalizer.hits + normalizer.misses} normalizations served from the cache")
+        normalizer.close()
     print(f"Saved {args.lang.upper()} subtitle info, metadata, and punctuation counts to {filename}.")
 
 
@@ -0,0 +1,87 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+# SQLite limits the number of host parameters per statement (999 on older builds).
+QUERY_CHUNK_SIZE = 900
+
+
+class SeenIndex:
+    """
+    Persistent set of video IDs already handled by a pipeline stage.
+
+    Every stage (obtain_video_ids, retrieve_subtitled_videos, retrieve_metadata)
+    keeps its own namespace in one SQLite file, so a video found by the search
+    step is still processed once by each later step, but never twice by the
+    same step across word splits, shards or sessions. Writes are committed in
+    a single transaction, and WAL mode lets several processes on one machine
+    share the file.
+
+    Attributes:
+        path (Path): Location of the SQLite database.
+        stage (str): Name of the stage whose IDs this instance reads and writes.
+    """
+
+    def __init__(self, path, stage):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stage = stage
+        self.conn = sqlite3.connect(str(self.path), timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "stage TEXT NOT NULL, video_id TEXT NOT NULL, "
+            "PRIMARY KEY (stage, video_id)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def __contains__(self, video_id):
+        row = self.conn.execute(
+            "SELECT 1 FROM seen WHERE stage = ? AND video_id = ?", (self.stage, video_id)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seen WHERE stage = ?", (self.stage,)).fetchone()[0]
+
+    def filter_unseen(self, video_ids):
+        """Return the IDs not yet recorded for this stage, deduplicated and in input order."""
+        video_ids = list(dict.fromkeys(video_ids))
+        seen = set()
+        for i in range(0, len(video_ids), QUERY_CHUNK_SIZE):
+            chunk = video_ids[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT video_id FROM seen WHERE stage = ? AND video_id IN ({placeholders})",
+                (self.stage, *chunk),
+            )
+            seen.update(row[0] for row in rows)
+        return [v for v in video_ids if v not in seen]
+
+    def add(self, video_ids):
+        """Record IDs as done for this stage in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (stage, video_id) VALUES (?, ?)",
+                ((self.stage, v) for v in video_ids),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show how many video IDs each stage has recorded in a seen-ID index.')
+    parser.add_argument('index', type=str, help='Path to the seen-ID index.')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.index)
+    for stage, count in conn.execute("SELECT stage, COUNT(*) FROM seen GROUP BY stage ORDER BY stage"):
+        print(f"{stage}: {count} video IDs")
@@ -1,50 +1,195 @@
 import argparse
+import csv
+import hashlib
+import heapq
 import os
-import random
+import tempfile
+from pathlib import Path
 
-def split_words(txt_path, num_splits, output_dir):
+def stable_hash(text):
+    """64-bit hash of `text` that, unlike hash(), is the same in every process and on every machine."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def jump_hash(key, num_buckets):
+    """
+    Bucket of a 64-bit key with jump consistent hashing (Lamping & Veach).
+
+    Going from n to n + 1 buckets moves only 1/(n + 1) of the keys, all of
+    them into the new bucket, so shards stay aligned when more are added.
+    """
+    bucket, j = -1, 0
+    while j < num_buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+def shard_of(key, num_splits):
+    """Shard a key (word or video ID) always lands in for `num_splits` shards."""
+    return jump_hash(stable_hash(key), num_splits)
+
+def mix64(x):
+    """SplitMix64 finalizer: a bijective scramble of a 64-bit integer."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+def write_sorted_run(items, tmpdir):
+    run = tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", dir=tmpdir, suffix=".run", delete=False)
+    with run:
+        writer = csv.writer(run)
+        writer.writerows(sorted(items))
+    return run.name
+
+def iter_run(fn_run):
+    with open(fn_run, "r", encoding="utf-8", newline="") as f:
+        for order, *row in csv.reader(f):
+            yield (int(order), *row)
+
+def shard_and_shuffle(items, num_splits, tmpdir, seed=0, max_lines_in_memory=1_000_000):
+    """
+    Assign items to shards by a stable hash of their key and shuffle each shard in bounded memory.
+
+    Each shard is shuffled by sorting on a seeded scramble of the key's hash,
+    which is a random order that does not depend on the other items: the same
+    key keeps its shard and its place relative to the other keys when the list
+    grows. Only the order depends on `seed`, the shards do not.
+    Items are buffered up to `max_lines_in_memory` and spilled to sorted runs
+    in `tmpdir`, which are merged per shard, so the input may be larger than RAM.
+
+    Args:
+        items (iterable): (key, row) pairs; row is a sequence of fields.
+        num_splits (int): The number of shards.
+        tmpdir (str): Directory for the sorted runs.
+        seed (int): Seed of the order within a shard.
+        max_lines_in_memory (int): Items buffered before spilling to disk.
+
+    Yields:
+        iterator: The rows of each shard in shuffled order, for shard 0 to num_splits - 1.
     """
-    Reads a text file, shuffles its lines, and splits them into multiple files.
+    salt = mix64(seed)
+    buffers = [[] for _ in range(num_splits)]
+    runs = [[] for _ in range(num_splits)]
+    buffered = 0
+    for key, row in items:
+        h = stable_hash(key)
+        # Flat (order, *fields) tuples: one object per buffered item
+        buffers[jump_hash(h, num_splits)].append((mix64(h ^ salt), *row))
+        buffered += 1
+        if buffered >= max_lines_in_memory:
+            for shard, buffer in enumerate(buffers):
+                if buffer:
+                    runs[shard].append(write_sorted_run(buffer, tmpdir))
+            buffers = [[] for _ in range(num_splits)]
+            buffered = 0
+
+    for shard in range(num_splits):
+        buffer, buffers[shard] = buffers[shard], None
+        buffer.sort()
+        merged = heapq.merge(*[iter_run(fn_run) for fn_run in runs[shard]], buffer)
+        yield (item[1:] for item in merged)
+        for fn_run in runs[shard]:
+            os.remove(fn_run)
+
+def split_words(txt_path, num_splits, output_dir, seed=0, max_lines_in_memory=1_000_000):
+    """
+    Splits a text file into multiple files by a stable hash of each line and shuffles every split.
+
+    A line always lands in the same split for a given `num_splits`, and the
+    splits come out the same on every run, so shards of a grown word list
+    line up with the progress made on the old ones. Memory stays bounded
+    by `max_lines_in_memory` no matter how large the file is.
 
     Args:
         txt_path (str): Path to the input text file (one phrase per line).
         num_splits (int): The number of files to split the lines into.
         output_dir (str): The directory to save the output files.
+        seed (int): Seed of the order of the lines within each split.
+        max_lines_in_memory (int): Lines buffered before spilling to disk.
     """
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    # Read lines from the input file
-    with open(txt_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    def lines():
+        with open(txt_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if line:
+                    yield line, [line]
+
+    sizes = []
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        shards = shard_and_shuffle(lines(), num_splits, tmpdir, seed, max_lines_in_memory)
+        for i, rows in enumerate(shards):
+            output_filename = os.path.join(output_dir, f'split_{i+1:04d}.txt')
+            with open(output_filename, 'w', encoding='utf-8') as f:
+                sizes.append(0)
+                for row in rows:
+                    f.write(row[0] + '\n')
+                    sizes[-1] += 1
+
+    print(f"Successfully split '{txt_path}' into {num_splits} files in '{output_dir}' ({min(sizes)}-{max(sizes)} lines each).")
+
+def split_csv(csv_path, num_splits, output_dir, key_column='video_id', seed=0, max_lines_in_memory=1_000_000):
+    """
+    Splits a CSV file (e.g. the video IDs from obtain_video_ids) into multiple CSV files by a stable hash of one column.
+
+    Rows with the same key, such as a video found by several search words,
+    end up next to each other in the same split. See split_words.
+
+    Args:
+        csv_path (str): Path to the input CSV file with a header row.
+        num_splits (int): The number of files to split the rows into.
+        output_dir (str): The directory to save the output files.
+        key_column (str): Column to shard by.
+        seed (int): Seed of the order of the rows within each split.
+        max_lines_in_memory (int): Rows buffered before spilling to disk.
+    """
+    os.makedirs(output_dir, exist_ok=True)
 
-    # Shuffle the lines
-    random.shuffle(lines)
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), None)
+    if not header or key_column not in header:
+        raise ValueError(f"'{csv_path}' has no '{key_column}' column.")
+    idx = header.index(key_column)
 
-    # Determine the size of each split
-    split_size = len(lines) // num_splits
-    extra = len(lines) % num_splits
+    def rows():
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                if len(row) > idx:
+                    yield row[idx], row
 
-    # Split the lines and write to output files
-    start_index = 0
-    for i in range(num_splits):
-        end_index = start_index + split_size + (1 if i < extra else 0)
-        split_lines = lines[start_index:end_index]
-        
-        output_filename = os.path.join(output_dir, f'split_{i+1:04d}.txt')
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.writelines(split_lines)
-            
-        start_index = end_index
+    sizes = []
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        shards = shard_and_shuffle(rows(), num_splits, tmpdir, seed, max_lines_in_memory)
+        for i, shard_rows in enumerate(shards):
+            output_filename = Path(output_dir) / f'split_{i+1:04d}.csv'
+            with open(output_filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                sizes.append(0)
+                for row in shard_rows:
+                    writer.writerow(row)
+                    sizes[-1] += 1
 
-    print(f"Successfully split '{txt_path}' into {num_splits} files in '{output_dir}'.")
+    print(f"Successfully split '{csv_path}' by {key_column} into {num_splits} files in '{output_dir}' ({min(sizes)}-{max(sizes)} rows each).")
 
 if __name__ == '__main__':
-    parser = argparse.ArgumentParser(description='Shuffle and split a text file into multiple parts.')
-    parser.add_argument('--txt_path', type=str, required=True, help='Path to the input text file (one phrase per line).')
+    parser = argparse.ArgumentParser(description='Split a word list or video ID CSV into shards by a stable hash and shuffle each shard.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--txt_path', type=str, help='Path to the input text file (one phrase per line).')
+    source.add_argument('--csv_path', type=str, help='Path to a CSV file to shard by --key_column, e.g. the output of obtain_video_ids.')
     parser.add_argument('--num_splits', type=int, required=True, help='The number of files to split the lines into.')
     parser.add_argument('--output_dir', type=str, required=True, help='The directory to save the output files.')
+    parser.add_argument('--key_column', type=str, default='video_id', help='Column of --csv_path to shard by.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the order within each split; the same seed gives the same splits.')
+    parser.add_argument('--max_lines_in_memory', type=int, default=1_000_000, help='Lines buffered before spilling sorted runs to disk.')
 
     args = parser.parse_args()
 
-    split_words(args.txt_path, args.num_splits, args.output_dir)
+    if args.csv_path:
+        split_csv(args.csv_path, args.num_splits, args.output_dir, args.key_column, args.seed, args.max_lines_in_memory)
+    else:
+        split_words(args.txt_path, args.num_splits, args.output_dir, args.seed, args.max_lines_in_memory)
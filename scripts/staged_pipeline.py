@@ -0,0 +1,128 @@
+import queue
+import threading
+
+_SENTINEL = object()
+
+# Returned by a stage to discard a job: it is neither passed on nor output
+DROP = object()
+
+
+class Stage:
+    """
+    One step of a StagedPipeline.
+
+    Attributes:
+        name (str): Name used for the worker threads.
+        func (callable): Called with a job; returns the job to pass on, None
+            when the job is finished and should go straight to the output, or
+            DROP when the job must not reach the output at all.
+        workers (int): Number of threads running this stage.
+        batch_size (int): If greater than 1, `func` is called with a list of up to
+            this many jobs that are already waiting, and returns a list of results.
+    """
+
+    def __init__(self, name, func, workers=1, batch_size=1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+
+
+class StagedPipeline:
+    """
+    Chain of stages connected by bounded queues.
+
+    Each stage runs in its own pool of threads, so slow network stages and a
+    compute stage that owns a model overlap instead of running one after the
+    other. The bounded queues apply back-pressure: a stage that falls behind
+    blocks the one feeding it, so at most `queue_size` jobs wait between any
+    two stages. Setting `stop` ends the feed and drops every job that is still
+    waiting for a stage, so no half-processed job reaches the output.
+
+    Args:
+        stages (list): Stage objects in order.
+        queue_size (int): Capacity of each queue between stages.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.output = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+
+    def _run_stage(self, idx, remaining, lock):
+        stage = self.stages[idx]
+        in_queue = self.queues[idx]
+        next_queue = self.queues[idx + 1] if idx + 1 < len(self.stages) else self.output
+        finished = False
+        while not finished:
+            job = in_queue.get()
+            if job is _SENTINEL:
+                break
+            if stage.batch_size > 1:
+                # Take whatever else is already waiting, without blocking for more.
+                jobs = [job]
+                while len(jobs) < stage.batch_size:
+                    try:
+                        job = in_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _SENTINEL:
+                        finished = True
+                        break
+                    jobs.append(job)
+            else:
+                jobs = [job]
+            if self.stop.is_set():
+                results = [DROP] * len(jobs)
+            elif stage.batch_size > 1:
+                results = stage.func(jobs)
+            else:
+                results = [stage.func(job)]
+
+            for job, result in zip(jobs, results):
+                if result is DROP:
+                    continue
+                if result is None or next_queue is self.output:
+                    self.output.put(job if result is None else result)
+                else:
+                    next_queue.put(result)
+
+        with lock:
+            remaining[idx] -= 1
+            last = remaining[idx] == 0
+        if last:
+            # The last worker of a stage shuts the next stage down.
+            if idx + 1 < len(self.stages):
+                for _ in range(self.stages[idx + 1].workers):
+                    next_queue.put(_SENTINEL)
+            else:
+                self.output.put(_SENTINEL)
+
+    def _feed(self, jobs):
+        for job in jobs:
+            if self.stop.is_set():
+                break
+            self.queues[0].put(job)
+        for _ in range(self.stages[0].workers):
+            self.queues[0].put(_SENTINEL)
+
+    def run(self, jobs):
+        """Push jobs through every stage and yield finished jobs as they complete (unordered)."""
+        lock = threading.Lock()
+        remaining = [stage.workers for stage in self.stages]
+        threads = [threading.Thread(target=self._feed, args=(jobs,), name="feed", daemon=True)]
+        for idx, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(target=self._run_stage, args=(idx, remaining, lock), name=f"{stage.name}-{n}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            job = self.output.get()
+            if job is _SENTINEL:
+                break
+            yield job
+
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,127 @@
+import html
+import re
+from array import array
+from pathlib import Path
+
+TAG_RE = re.compile(r'<[^>]*>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def timestamp_seconds(timestamp: str) -> float:
+    """Convert a WebVTT or SRT timestamp (HH:MM:SS.mmm, HH:MM:SS,mmm or MM:SS.mmm) to seconds."""
+    parts = timestamp.replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    if len(parts) > 1:
+        seconds += int(parts[-2]) * 60
+    if len(parts) > 2:
+        seconds += int(parts[-3]) * 3600
+    return seconds
+
+
+class Cues:
+    """
+    Compact list of subtitle cues.
+
+    Start and end times live in two float arrays and the texts in a list, so
+    a cue costs a few dozen bytes instead of a tuple of three objects. Indexing
+    and iteration still give (start, end, text) tuples.
+    """
+
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.texts = []
+
+    def append(self, start, end, text):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, idx):
+        return self.starts[idx], self.ends[idx], self.texts[idx]
+
+    def __iter__(self):
+        return zip(self.starts, self.ends, self.texts)
+
+    def text(self):
+        """All cue texts joined with spaces."""
+        return " ".join(t for t in self.texts if t)
+
+    def duration(self):
+        """Seconds covered by at least one cue; overlapping cues are counted once."""
+        total = 0.0
+        cur_start = cur_end = None
+        for start, end in sorted(zip(self.starts, self.ends)):
+            if cur_end is None or start > cur_end:
+                if cur_end is not None:
+                    total += cur_end - cur_start
+                cur_start, cur_end = start, end
+            elif end > cur_end:
+                cur_end = end
+        if cur_end is not None:
+            total += cur_end - cur_start
+        return total
+
+
+def parse_subtitles(source) -> Cues:
+    r"""
+    Parse VTT or SRT subtitles in a single pass.
+
+    Headers, NOTE/STYLE blocks and SRT indexes are skipped. Inline tags
+    (`<c>`, `<i>`, word timings) and HTML entities are removed from the text.
+    Rolling auto-captions repeat the previous line at the top of every cue,
+    which starts where the previous cue ends. In such a continuation, lines
+    that already appeared in the previous cue are dropped, and cues that are
+    nothing but a repeat are skipped. A line repeated after a gap is speech
+    and is kept:
+
+    >>> parse_subtitles(b"00:01.000 --> 00:02.000\nNo.\n\n00:03.000 --> 00:04.000\nNo.\n\n00:05.000 --> 00:06.000\nPlease stop.\n").texts
+    ['No.', 'No.', 'Please stop.']
+
+    Args:
+        source (str | Path | bytes): A subtitle file, or its content as bytes.
+
+    Returns:
+        Cues: The cues in file order.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        content = bytes(source).decode('utf-8-sig', errors='replace')
+    else:
+        content = Path(source).read_text(encoding='utf-8-sig')
+    lines = content.splitlines()
+
+    cues = Cues()
+    previous, previous_end = (), None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if '-->' not in line:
+            continue
+        start, end = line.split('-->', 1)
+        # VTT cue settings (align:start position:0%) follow the end time
+        start, end = timestamp_seconds(start.strip()), timestamp_seconds(end.split()[0])
+
+        text_lines = []
+        # Rolling auto-captions put a line holding a single space above the text
+        if i < len(lines) and lines[i] and not lines[i].strip():
+            i += 1
+        while i < len(lines) and lines[i].strip():
+            text = SPACE_RE.sub(' ', html.unescape(TAG_RE.sub('', lines[i]))).strip()
+            if text:
+                text_lines.append(text)
+            i += 1
+
+        if previous_end is not None and previous_end >= start:
+            new_lines = [t for t in text_lines if t not in previous]
+        else:
+            new_lines = text_lines
+        previous, previous_end = text_lines, end
+        if new_lines:
+            cues.append(start, end, " ".join(new_lines))
+    return cues
@@ -0,0 +1,167 @@
+import numpy as np
+
+# Unicode blocks of the scripts we can tell apart; letters outside them count as "Other"
+SCRIPT_RANGES = {
+    "Latin": [(0x41, 0x5A), (0x61, 0x7A), (0xC0, 0xD6), (0xD8, 0xF6), (0xF8, 0x24F), (0x1E00, 0x1EFF)],
+    "Greek": [(0x370, 0x3FF), (0x1F00, 0x1FFF)],
+    "Cyrillic": [(0x400, 0x52F)],
+    "Armenian": [(0x530, 0x58F)],
+    "Hebrew": [(0x590, 0x5FF)],
+    "Arabic": [(0x600, 0x6FF), (0x750, 0x77F), (0x8A0, 0x8FF), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)],
+    "Devanagari": [(0x900, 0x97F)],
+    "Bengali": [(0x980, 0x9FF)],
+    "Tamil": [(0xB80, 0xBFF)],
+    "Thai": [(0xE00, 0xE7F)],
+    "Georgian": [(0x10A0, 0x10FF)],
+    "Hangul": [(0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)],
+    "Hiragana": [(0x3040, 0x309F)],
+    "Katakana": [(0x30A0, 0x30FF)],
+    "Han": [(0x3400, 0x4DBF), (0x4E00, 0x9FFF)],
+}
+
+# Digits are taken out of the script blocks they sit in
+DIGIT_RANGES = [(0x30, 0x39), (0x660, 0x669), (0x6F0, 0x6F9), (0x966, 0x96F), (0x9E6, 0x9EF), (0xE50, 0xE59), (0xFF10, 0xFF19)]
+
+# Scripts a language is written in, for the target-script ratio
+LANG_SCRIPTS = {
+    "en": ("Latin",), "de": ("Latin",), "es": ("Latin",), "fr": ("Latin",), "it": ("Latin",), "nl": ("Latin",),
+    "pt": ("Latin",), "pl": ("Latin",), "tr": ("Latin",), "id": ("Latin",), "vi": ("Latin",),
+    "fa": ("Arabic",), "ar": ("Arabic",), "ur": ("Arabic",), "ps": ("Arabic",),
+    "ru": ("Cyrillic",), "uk": ("Cyrillic",), "bg": ("Cyrillic",), "el": ("Greek",), "he": ("Hebrew",),
+    "hy": ("Armenian",), "ka": ("Georgian",), "hi": ("Devanagari",), "mr": ("Devanagari",), "ne": ("Devanagari",),
+    "bn": ("Bengali",), "ta": ("Tamil",), "th": ("Thai",), "ko": ("Hangul",),
+    "ja": ("Han", "Hiragana", "Katakana"), "zh": ("Han",),
+}
+
+# (common, other) punctuation marks per language, as counted for --min_punct
+PUNCTUATION = {
+    "fa": ("؟،", "!؛:"),
+    "ar": ("؟،", "!؛:"),
+    "ur": ("؟،", "!؛:۔"),
+    "zh": ("，？、", "。：；！"),
+    "ja": ("，？、", "。：；！"),
+}
+DEFAULT_PUNCTUATION = (",?", ".:;!")
+
+SCRIPTS = list(SCRIPT_RANGES)
+OTHER, SPACE, DIGIT = 0, 1, 2
+SCRIPT_CLASS = {name: DIGIT + 1 + i for i, name in enumerate(SCRIPTS)}
+
+
+def _class_table():
+    """Class of every BMP code point; code points above it are looked up as U+FFFF (Other)."""
+    table = np.full(0x10000, OTHER, dtype=np.uint8)
+    for name, ranges in SCRIPT_RANGES.items():
+        for start, end in ranges:
+            table[start:end + 1] = SCRIPT_CLASS[name]
+    # Letter-free parts of the script blocks: punctuation and symbols
+    for code in "\u00d7\u00f7\u060c\u061b\u061f\u06d4":
+        table[ord(code)] = OTHER
+    for start, end in DIGIT_RANGES:
+        table[start:end + 1] = DIGIT
+    for code in " \t\n\r\f\v\u00a0\u200c\u200d\u3000":
+        table[ord(code)] = SPACE
+    return table
+
+
+CLASS_TABLE = _class_table()
+
+
+def punctuation_marks(lang):
+    """(common, other) punctuation marks counted for `lang`."""
+    return PUNCTUATION.get(lang, DEFAULT_PUNCTUATION)
+
+
+def text_stats(text, lang, lines=None):
+    """
+    Statistics of subtitle text for the prefilter, in one vectorised pass over its code points.
+
+    The text is viewed as a NumPy array of code points and every code point
+    is classified with a single table lookup, instead of one Python loop and
+    one regex scan per statistic. Punctuation marks are counted with
+    str.count, which is faster still for a handful of characters.
+
+    Args:
+        text (str): Subtitle text.
+        lang (str): Target language code; selects the punctuation marks and target scripts.
+        lines (list): Cue texts, for the repeated-line ratio.
+
+    Returns:
+        dict: Counts and ratios:
+            chars: all code points; letters: code points of a known script;
+            scripts: script name -> letter count; script_ratio: share of the
+            letters in the scripts of `lang` (None if `lang` has no entry in
+            LANG_SCRIPTS); ascii_ratio: ASCII letters over all characters;
+            digit_ratio: digits over non-space characters; common_punct and
+            other_punct: punctuation counts; repeat_ratio: share of lines that
+            repeat an earlier line.
+    """
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+    classes = np.take(CLASS_TABLE, codes, mode="clip")
+    counts = np.bincount(classes, minlength=DIGIT + 1 + len(SCRIPTS))
+    scripts = {name: int(counts[SCRIPT_CLASS[name]]) for name in SCRIPTS}
+    letters = sum(scripts.values())
+    target = LANG_SCRIPTS.get(lang)
+    non_space = len(codes) - int(counts[SPACE])
+    ascii_letters = int(np.count_nonzero((codes | 0x20) - 0x61 < 26))
+    common, other = punctuation_marks(lang)
+
+    repeat_ratio = 0.0
+    if lines:
+        keys = [key for key in (line.strip().lower() for line in lines) if key]
+        if keys:
+            repeat_ratio = 1 - len(set(keys)) / len(keys)
+
+    return {
+        "chars": len(codes),
+        "letters": letters,
+        "scripts": scripts,
+        "script_ratio": sum(scripts[name] for name in target) / letters if target and letters else None,
+        "ascii_ratio": ascii_letters / len(codes) if len(codes) else 0.0,
+        "digit_ratio": int(counts[DIGIT]) / non_space if non_space else 0.0,
+        "common_punct": sum(text.count(mark) for mark in common),
+        "other_punct": sum(text.count(mark) for mark in other),
+        "repeat_ratio": repeat_ratio,
+    }
+
+
+class TextFilter:
+    """
+    Thresholds on text_stats that reject a video before its audio is fetched.
+
+    Every check is off by default (0 for the minimum, 1 for the maximums), so
+    only the thresholds that are set reject anything.
+
+    Attributes:
+        min_script_ratio (float): Smallest share of letters in the target language's scripts.
+        max_digit_ratio (float): Largest share of digits among non-space characters.
+        max_repeat_ratio (float): Largest share of cue lines that repeat an earlier one.
+        scripts (tuple): Scripts of the target language; None looks them up in LANG_SCRIPTS.
+    """
+
+    def __init__(self, min_script_ratio=0.0, max_digit_ratio=1.0, max_repeat_ratio=1.0, scripts=None):
+        unknown = [name for name in scripts or () if name not in SCRIPT_RANGES]
+        if unknown:
+            raise ValueError(f"Unknown scripts {unknown}. Available scripts: {', '.join(SCRIPTS)}.")
+        self.min_script_ratio = min_script_ratio
+        self.max_digit_ratio = max_digit_ratio
+        self.max_repeat_ratio = max_repeat_ratio
+        self.scripts = tuple(scripts) if scripts else None
+
+    @property
+    def enabled(self):
+        """Whether any check can reject a video."""
+        return self.min_script_ratio > 0 or self.max_digit_ratio < 1 or self.max_repeat_ratio < 1
+
+    def rejection(self, stats):
+        """Why a video's subtitle text fails the filter, or None if it passes."""
+        script_ratio = stats["script_ratio"]
+        if self.scripts is not None and stats["letters"]:
+            script_ratio = sum(stats["scripts"][name] for name in self.scripts) / stats["letters"]
+        if script_ratio is not None and script_ratio < self.min_script_ratio:
+            return f"script ratio {script_ratio:.2f} < {self.min_script_ratio}"
+        if stats["digit_ratio"] > self.max_digit_ratio:
+            return f"digit ratio {stats['digit_ratio']:.2f} > {self.max_digit_ratio}"
+        if stats["repeat_ratio"] > self.max_repeat_ratio:
+            return f"repeated lines {stats['repeat_ratio']:.2f} > {self.max_repeat_ratio}"
+        return None
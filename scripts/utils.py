@@ -2,13 +2,17 @@
 def make_dump_url(lang: str) -> str:
   return f"https://dumps.wikimedia.org/{lang}wiki/latest/{lang}wiki-latest-pages-articles-multistream-index.txt.bz2"
 
+# Checksums published next to the Wikipedia dump files
+def make_checksum_url(lang: str) -> str:
+  return f"https://dumps.wikimedia.org/{lang}wiki/latest/{lang}wiki-latest-sha1sums.txt"
+
 # YouTube Search URL
-def make_query_url(query: str, cc: bool=True) -> str:
+def make_query_url(query: str, cc: bool=True, base_url: str="https://www.youtube.com") -> str:
   q = query.rstrip("\n").strip(" ").replace(" ", "+")
   if cc:
-    return f"https://www.youtube.com/results?search_query={q}&sp=EgQQATAB" # This is for cc videos
-    # return f"https://www.youtube.com/results?search_query={q}&sp=EgYQASgBMAE%253D" # This is for subtitled-cc videos
-  return f"https://www.youtube.com/results?search_query={q}&sp=EgQQASgB" # This is for subtitled videos
+    return f"{base_url}/results?search_query={q}&sp=EgQQATAB" # This is for cc videos
+    # return f"{base_url}/results?search_query={q}&sp=EgYQASgBMAE%253D" # This is for subtitled-cc videos
+  return f"{base_url}/results?search_query={q}&sp=EgQQASgB" # This is for subtitled videos
 
 # YouTube video URL
 def make_video_url(videoid: str) -> str:
@@ -0,0 +1,133 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def frame_energies(waveform, frame_size=480):
+    """Log energy in dB of consecutive `frame_size` frames (30 ms at 16 kHz); a partial last frame is dropped."""
+    n = len(waveform) // frame_size
+    frames = np.asarray(waveform[:n * frame_size], dtype="float32").reshape(n, frame_size)
+    return 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+
+def _runs(mask):
+    """(start, end) frame index pairs of the True runs of a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(waveform, sample_rate=SAMPLE_RATE, frame_ms=30, margin_db=12.0, range_db=25.0, floor_db=-55.0,
+                  min_speech=0.25, min_silence=0.3, pad=0.15):
+    """
+    Find speech in a waveform with an adaptive energy threshold.
+
+    A frame is speech if its energy is more than `margin_db` above the noise
+    floor (the 10th percentile of frame energies) and above `floor_db`. The
+    threshold never rises above `range_db` below the loud frames (the 95th
+    percentile), so audio that is speech throughout is not mistaken for noise.
+    Pauses shorter than `min_silence` are bridged, bursts shorter than
+    `min_speech` are dropped, and segments are padded by `pad` seconds.
+
+    Returns:
+        tuple: (segments, energies) where segments are (start, end) frame
+        index pairs and energies are the per-frame dB values.
+    """
+    frame_size = sample_rate * frame_ms // 1000
+    energies = frame_energies(waveform, frame_size)
+    if len(energies) == 0:
+        return [], energies
+    noise, loud = np.percentile(energies, [10, 95])
+    threshold = max(min(noise + margin_db, loud - range_db), floor_db)
+    speech = energies > threshold
+
+    per_second = 1000 / frame_ms
+    for start, end in _runs(~speech):
+        if start > 0 and end < len(speech) and end - start < min_silence * per_second:
+            speech[start:end] = True
+    segments = [(s, e) for s, e in _runs(speech) if e - s >= min_speech * per_second]
+
+    pad_frames = int(pad * per_second)
+    padded = []
+    for start, end in segments:
+        start, end = max(start - pad_frames, 0), min(end + pad_frames, len(energies))
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded, energies
+
+
+def pack_segments(segments, energies, max_frames, max_gap_frames):
+    """
+    Pack speech segments into chunks of at most `max_frames` frames.
+
+    A segment joins the current chunk if the pause before it is shorter than
+    `max_gap_frames` and the chunk stays under the limit; otherwise a new chunk
+    starts, so longer silences are never decoded. A segment longer than the
+    limit is cut at its quietest frame in the second half of each window.
+
+    Returns:
+        list: (start, end) frame index pairs.
+    """
+    chunks = []
+    for start, end in segments:
+        while end - start > max_frames:
+            lo = start + max_frames // 2
+            cut = lo + int(np.argmin(energies[lo:start + max_frames]))
+            chunks.append((start, cut))
+            start = cut
+        if chunks and start - chunks[-1][1] < max_gap_frames and end - chunks[-1][0] <= max_frames:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def vad_chunks(frames, sample_rate=SAMPLE_RATE, max_seconds=30.0, max_gap=1.0, frame_ms=30, **kwargs):
+    """
+    Turn a stream of audio frames into speech chunks for ASR.
+
+    Frames (e.g. from stream_audio) are buffered until there are two chunks'
+    worth of audio. Chunks that end before the last `max_seconds` of the
+    buffer are final and are yielded; the rest stays buffered, so a chunk is
+    never cut at a frame boundary, only at pauses or the quietest point of a
+    long run of speech. Memory stays bounded by the buffer.
+
+    Args:
+        frames (iterable): float32 arrays of consecutive audio.
+        sample_rate (int): Sample rate of the frames.
+        max_seconds (float): Maximum chunk length.
+        max_gap (float): Longest pause kept inside a chunk.
+        frame_ms (int): VAD frame length.
+        **kwargs: Passed to detect_speech.
+
+    Yields:
+        tuple: (start_seconds, samples) of each chunk.
+    """
+    frame_size = sample_rate * frame_ms // 1000
+    max_frames = int(max_seconds * 1000 / frame_ms)
+    max_gap_frames = int(max_gap * 1000 / frame_ms)
+    buffer = np.zeros(0, dtype="float32")
+    offset = 0  # samples before the buffer
+
+    def process(final):
+        nonlocal buffer, offset
+        segments, energies = detect_speech(buffer, sample_rate, frame_ms=frame_ms, **kwargs)
+        chunks = pack_segments(segments, energies, max_frames, max_gap_frames)
+        keep_from = len(buffer) // frame_size * frame_size if final else None
+        for start, end in chunks:
+            if not final and end > len(energies) - max_frames:
+                keep_from = start * frame_size
+                break
+            yield (offset + start * frame_size) / sample_rate, buffer[start * frame_size:end * frame_size]
+        if keep_from is None:
+            keep_from = max(len(energies) - max_frames, 0) * frame_size
+        buffer = buffer[keep_from:]
+        offset += keep_from
+
+    for frame in frames:
+        buffer = np.concatenate((buffer, frame))
+        if len(buffer) >= 2 * max_seconds * sample_rate:
+            yield from process(final=False)
+    if len(buffer):
+        yield from process(final=True)
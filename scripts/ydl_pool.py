@@ -0,0 +1,89 @@
+import threading
+from contextlib import contextmanager
+
+
+def default_factory(ydl_opts):
+    import yt_dlp
+
+    return yt_dlp.YoutubeDL(ydl_opts)
+
+
+def options_key(ydl_opts):
+    """Hashable key of an options dict; callables such as format selectors are keyed by identity."""
+    key = []
+    for name, value in sorted(ydl_opts.items()):
+        try:
+            hash(value)
+        except TypeError:
+            value = ("id", id(value))
+        key.append((name, value))
+    return tuple(key)
+
+
+class YdlPool:
+    """
+    Reusable YoutubeDL clients, one per thread and options set.
+
+    Building a YoutubeDL parses the cookie file, sets up extractors and opens
+    a fresh HTTP session, which used to happen for every video. A pool hands
+    each thread the client it built the first time it asked for those
+    options, so cookies, extractor state and keep-alive connections carry over
+    from one video to the next. Per-call changes go through `client(...,
+    **overrides)`, which patches the client's params only for the duration of
+    the call.
+
+    Attributes:
+        factory (callable): Builds a client from an options dict; swap it for a stub in tests.
+    """
+
+    def __init__(self, factory=default_factory):
+        self.factory = factory
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.clients = []
+
+    def get(self, ydl_opts):
+        """The calling thread's client for `ydl_opts`, built on first use."""
+        clients = getattr(self.local, "clients", None)
+        if clients is None:
+            clients = self.local.clients = {}
+        key = options_key(ydl_opts)
+        ydl = clients.get(key)
+        if ydl is None:
+            ydl = clients[key] = self.factory(dict(ydl_opts))
+            with self.lock:
+                self.clients.append(ydl)
+        return ydl
+
+    @contextmanager
+    def client(self, ydl_opts, **overrides):
+        """Borrow the thread's client for `ydl_opts`, with `overrides` applied to its params for this call only."""
+        ydl = self.get(ydl_opts)
+        if not overrides:
+            yield ydl
+            return
+        params = ydl.params
+        saved = {name: params[name] for name in overrides if name in params}
+        params.update(overrides)
+        try:
+            yield ydl
+        finally:
+            for name in overrides:
+                if name in saved:
+                    params[name] = saved[name]
+                else:
+                    params.pop(name, None)
+
+    def close(self):
+        """Close every client built by the pool (saves cookies and releases connections)."""
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for ydl in clients:
+            close = getattr(ydl, "close", None)
+            if close:
+                close()
+        self.local = threading.local()
+
+
+# Pool used by the pipeline scripts; each worker process gets its own copy
+YDL_POOL = YdlPool()